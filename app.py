@@ -1,14 +1,23 @@
 import time
+from functools import partial
 from pathlib import Path
-from xml.etree import ElementTree as ET
-from xml.etree.ElementTree import Element
+from typing import Any
 
 import streamlit as st
 from streamlit import session_state as ss
 
-from archiveflow.api import LAClient
+from archiveflow.api import LAClient, configure_logging
+from archiveflow.cache import DEFAULT_CACHE_PATH, TreeLevelCache
 from archiveflow.config import config
+from archiveflow.jobs import Job, JobManager
+from archiveflow.materialize import MaterializePlan
+from archiveflow.singleflight import SingleFlight
 from archiveflow.structure import TejedaExperiment
+from archiveflow.structure_cache import NotebookStructureCache
+from archiveflow.tree import TreeNode
+
+# a no-op on reruns, the root logger already has its handlers
+configure_logging()
 
 # Session state variables
 if "client" not in ss:
@@ -22,7 +31,7 @@ if "nbid_radio" not in ss:
 if "nbid" not in ss:
     ss.nbid = None
 if "experiments" not in ss:
-    experiments: dict[str, ET.Element] = {}
+    experiments: dict[str, TreeNode] = {}
     ss.experiments = experiments
 if "experiment_radio" not in ss:
     experiment_radio: str | None = None
@@ -42,6 +51,9 @@ if "folder_select" not in ss:
 if "method" not in ss:
     method: str | None = None
     ss.method = method
+if "job_id" not in ss:
+    job_id: str | None = None
+    ss.job_id = job_id
 if "app_host" not in ss:
     if config.app_host is not None:
         app_host: str = config.app_host
@@ -50,15 +62,98 @@ if "app_host" not in ss:
         raise ValueError("app_host is not set in config")
 
 
+@st.cache_resource
+def get_tree_cache() -> TreeLevelCache:
+    # one cache file per server, shared by every session and app reload
+    if isinstance(config.tree_cache, str):
+        return TreeLevelCache(Path(config.tree_cache))
+    return TreeLevelCache(DEFAULT_CACHE_PATH)
+
+
+@st.cache_resource
+def get_structure_cache() -> NotebookStructureCache:
+    # parsed tree levels shared by every session, keyed by uid and nbid
+    return NotebookStructureCache()
+
+
+@st.cache_resource
+def get_single_flight() -> SingleFlight:
+    # identical calls of concurrent sessions share one request
+    return SingleFlight()
+
+
+@st.cache_resource
+def get_job_manager() -> JobManager:
+    # one pool per server, jobs outlive reruns and are shared by sessions
+    return JobManager()
+
+
+def write_experiment_dirs(
+    job: Job,
+    client: LAClient,
+    nbid: str,
+    experiment: TreeNode,
+    folder_path: Path,
+    method: str,
+) -> tuple[dict[str, Any], list[str]]:
+    job.report(0, message="Fetching the experiment from LabArchives")
+    exp: TejedaExperiment = TejedaExperiment(
+        experiment_root_dir=folder_path,
+        client=client,
+        nbid=nbid,
+        experiment=experiment,
+        make_method=method,  # type: ignore
+    )
+    job.report(0, message="Comparing local directories")
+    plan: MaterializePlan = exp.plan()
+    job.report(
+        0, len(plan.renamed) + len(plan.missing), "Creating directories"
+    )
+    # taken before apply, which empties the plan
+    summary: dict[str, Any] = plan.summary()
+    plan.apply(progress=job.report)
+    return summary, plan.extra
+
+
+@st.fragment(run_every=1)
+def show_job() -> None:
+    job: Job | None = get_job_manager().get(ss.job_id)
+    if job is None:
+        return
+    if not job.finished:
+        st.progress(job.fraction or 0.0, text=f"{job.name}: {job.message}")
+        if st.button("Cancel", disabled=job.cancel_requested):
+            job.cancel()
+        return
+    if job.status == "failed":
+        st.error(f"{job.name} failed: {job.error}")
+    elif job.status == "cancelled":
+        st.warning(f"{job.name} was cancelled")
+    else:
+        summary, extra = job.result
+        done: list[str] = []
+        if summary["create_root"]:
+            done.append(f"created {summary['root']}")
+        if summary["rename"]:
+            done.append(f"renamed {summary['rename']} directories")
+        if summary["create"]:
+            done.append(f"created {summary['create']} directories")
+        if done:
+            st.success("Experiment directories: " + ", ".join(done) + "!")
+        else:
+            st.success("Experiment directories are up to date!")
+        if extra:
+            st.warning(
+                "Local directories not in LabArchives: " + ", ".join(extra)
+            )
+
+
 def get_experiment_nodes() -> None:
     assert ss.client.is_auth
-    experiment_nodes: list[ET.Element] = ss.client.get_dir_nodes(nbid=ss.nbid)
-    experiments: dict[str, Element] = {}
+    experiment_nodes: list[TreeNode] = ss.client.get_dir_nodes(nbid=ss.nbid)
+    experiments: dict[str, TreeNode] = {}
     for experiment_node in experiment_nodes:
-        experiment_name = experiment_node.findtext("display-text")
-        experiment_id = experiment_node.findtext("tree-id")
-        if isinstance(experiment_name, str) and isinstance(experiment_id, str):
-            experiments[experiment_name] = experiment_node
+        experiments[experiment_node.display_text] = experiment_node
     ss.experiments = experiments
 
 
@@ -75,15 +170,28 @@ if ss.client is None or not ss.client.is_auth:
         if cer_path.exists():
             # first try with the cert
             print("Using cert")
-            ss.client = LAClient(cer_filepath=cer_path)
+            ss.client = LAClient(
+                cer_filepath=cer_path,
+                cache=get_tree_cache(),
+                structure_cache=get_structure_cache(),
+                single_flight=get_single_flight(),
+            )
         else:
             # if the cert does not exist, try without it
             print("No cert found, using default client")
-            ss.client = LAClient()
+            ss.client = LAClient(
+                cache=get_tree_cache(),
+                structure_cache=get_structure_cache(),
+                single_flight=get_single_flight(),
+            )
     else:
         # if no cert in config can be found on machine
         print("No cert in config, using default client")
-        ss.client = LAClient()
+        ss.client = LAClient(
+            cache=get_tree_cache(),
+            structure_cache=get_structure_cache(),
+            single_flight=get_single_flight(),
+        )
 
     if "auth_code" in st.query_params and "email" in st.query_params:
         print("Attempting to login")
@@ -180,25 +288,31 @@ if ss.experiment_radio:
                     and ss.experiments[ss.experiment_radio]
                     and ss.method
                 ):
-                    exp: TejedaExperiment = TejedaExperiment(
-                        experiment_root_dir=ss.folder_path,
-                        client=ss.client,
-                        nbid=ss.nbid,
-                        experiment=ss.experiments[ss.experiment_radio],
-                        make_method=ss.method,  # type: ignore
+                    experiment: TreeNode = ss.experiments[
+                        ss.experiment_radio
+                    ]
+                    # a rerun or a second click joins the running job
+                    job: Job = get_job_manager().submit(
+                        f"Writing {experiment.display_text}",
+                        partial(
+                            write_experiment_dirs,
+                            client=ss.client,
+                            nbid=ss.nbid,
+                            experiment=experiment,
+                            folder_path=ss.folder_path,
+                            method=ss.method,
+                        ),
+                        owner=ss.client.ua_info["id"],
+                        key=(
+                            ss.client.ua_info["id"],
+                            ss.nbid,
+                            experiment.tree_id,
+                            str(ss.folder_path),
+                            ss.method,
+                        ),
                     )
-                    exp.create_experiment_dirs()
-                    if exp.behavior is not None:
-                        exp.behavior.create_cohorts()
-                    if exp.histology is not None:
-                        exp.histology.create_cohorts()
-                    if exp.surgeries is not None:
-                        exp.surgeries.create_cohorts()
-                    if exp.metadata is not None:
-                        exp.metadata.create_cohorts()
-                    if exp.photometry is not None:
-                        exp.photometry.create_cohorts()
-                    st.success("Experiment directories created!")
+                    ss.job_id = job.job_id
+            show_job()
 if st.button("Reset Experiment Selection"):
     # Clear the text input by changing its key
     st.text_input(
@@ -214,4 +328,5 @@ if st.button("Reset Experiment Selection"):
     ss.folder_str = None
     ss.nbid_radio = None
     ss.nbid = None
+    ss.job_id = None
     st.rerun()
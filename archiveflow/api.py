@@ -2,22 +2,38 @@ import base64
 import hmac
 import logging
 import re
-import threading
 import time
-import webbrowser
+from concurrent.futures import ThreadPoolExecutor
 from hashlib import sha512
-from http.server import BaseHTTPRequestHandler, HTTPServer
-from io import BytesIO
 from pathlib import Path
-from typing import Any, Union, Literal
+from typing import Any, Callable, TypeVar, Union, Literal
 from urllib.parse import parse_qs, quote_plus, urlencode, urlparse, urlunparse
-from xml.etree import ElementTree as ET
 
 import requests
 from requests import Response
+from requests.adapters import HTTPAdapter
 
+from .cache import TreeLevelCache
 from .config import config
-from .utils import parse_user_access_info_response
+from .dedup import DedupIndex
+from .metrics import ClientMetrics
+from .scheduler import RequestScheduler
+from .singleflight import SingleFlight
+from .structure_cache import NotebookStructureCache
+from .tree import (
+    TreeNode,
+    order_crawl,
+    parse_tree_level,
+    rebase_level,
+    root_node,
+)
+from .utils import (
+    ProgressReader,
+    parse_attachment_eid,
+    parse_user_access_info_response,
+)
+
+T = TypeVar("T")
 
 
 def mask_sensitive_url(
@@ -103,69 +119,48 @@ def mask_sensitive_url(
         return url
 
 
-logging.basicConfig(
-    level=logging.INFO,
-    format="%(asctime)s - %(name)s - %(levelname)s - %(message)s",
-    handlers=[
-        logging.FileHandler("app.log"),
-        logging.StreamHandler(),
-    ],
-)
-
-logging.getLogger("urllib3.connectionpool").setLevel(logging.WARNING)
 logger = logging.getLogger(__name__)
 
+LOG_FORMAT: str = "%(asctime)s - %(name)s - %(levelname)s - %(message)s"
 
-class CallbackHandler(BaseHTTPRequestHandler):
-    callback_responses: list[str] = []
-
-    @classmethod
-    def clear_responses(cls):
-        cls.callback_responses = []
-
-    def do_GET(self):
-        # Store the callback response
-        CallbackHandler.callback_responses.append(self.path)
-        # Send a nice HTML response that explicitly
-        # tells the user to close the window
-        self.send_response(200)
-        self.send_header("Content-type", "text/html")
-        self.end_headers()
-        html = """
-        <html>
-            <body style="
-                text-align: center;
-                font-family: Arial, sans-serif;
-                padding-top: 50px;
-            ">
-                <h2>Authentication Complete!</h2>
-                <p>Please close this window now. Do not refresh this page.</p>
-                <script>
-                    // Prevent back/forward navigation
-                    window.history.pushState(null, '', window.location.href);
-                    window.onpopstate = function () {
-                        window.history.pushState(
-                            null, '', window.location.href
-                        );
-                    };
-                </script>
-            </body>
-        </html>
-        """
-        self.wfile.write(html.encode())
 
-    def log_message(
-        self, format: str, *args: Union[str, tuple[str, ...]]
-    ) -> None:
-        pass
+def configure_logging(
+    level: Union[int, str] = logging.INFO,
+    log_file: Union[Path, str, None] = "app.log",
+) -> None:
+    """
+    Send log records to stderr and, unless log_file is None, to a file.
+
+    Importing archiveflow does not configure logging, applications call
+    this at startup. Once the root logger has handlers, e.g. on a
+    Streamlit rerun, this does nothing, so no handler is added twice.
+
+    Args:
+        level: Level of the root logger, e.g. logging.INFO or "INFO"
+        log_file: File to append the log to
+    """
+    if logging.getLogger().handlers:
+        return
+    handlers: list[logging.Handler] = [logging.StreamHandler()]
+    if log_file is not None:
+        handlers.append(logging.FileHandler(log_file))
+    logging.basicConfig(level=level, format=LOG_FORMAT, handlers=handlers)
+    logging.getLogger("urllib3.connectionpool").setLevel(logging.WARNING)
+
+
+def __getattr__(name: str) -> Any:
+    # CallbackHandler and start_callback_server moved to .callback, which
+    # imports http.server, so it is only imported when they are used
+    if name in ("CallbackHandler", "start_callback_server"):
+        from . import callback
 
+        return getattr(callback, name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
 
-def start_callback_server(port: int = 8000) -> HTTPServer:
-    server = HTTPServer(("localhost", port), CallbackHandler)
-    thread = threading.Thread(target=server.serve_forever)
-    thread.daemon = True
-    thread.start()
-    return server
+
+DEFAULT_POOL_CONNECTIONS: int = 10
+DEFAULT_POOL_MAXSIZE: int = 10
+DEFAULT_CRAWL_WORKERS: int = 8
 
 
 def generate_signature(
@@ -183,6 +178,161 @@ def generate_signature(
     return signature
 
 
+def build_api_url(
+    api_url: str,
+    path: str,
+    api_method: str,
+    params: dict[str, str],
+    access_key_id: str,
+    access_password: str,
+    expires: Union[int, None] = None,
+) -> str:
+    """
+    Build a signed LabArchives API URL.
+
+    Args:
+        api_url: Base URL of the LabArchives API
+        path: Endpoint path, e.g. "/api/tree_tools/get_tree_level"
+        api_method: API method name the signature is generated for
+        params: Query parameters, in order, before the auth parameters
+        access_key_id: API access key id
+        access_password: API access password
+        expires: Expiry in epoch milliseconds, defaults to now
+
+    Returns:
+        str: URL with the akid, expires and sig parameters appended
+    """
+    if expires is None:
+        expires = int(time.time()) * 1000
+    sig: str = generate_signature(
+        access_key_id, api_method, expires, access_password
+    )
+    query: str = "".join(
+        f"{key}={quote_plus(str(value))}&" for key, value in params.items()
+    )
+    return (
+        f"{api_url}{path}?{query}"
+        + f"akid={access_key_id}"
+        + f"&expires={expires}"
+        + f"&sig={sig}"
+    )
+
+
+def entries_for_page_params(
+    uid: str,
+    nbid: str,
+    page_tree_id: str,
+    entry_data: bool = False,
+    comment_data: bool = False,
+) -> dict[str, str]:
+    params: dict[str, str] = {
+        "uid": uid,
+        "page_tree_id": page_tree_id,
+        "nbid": nbid,
+    }
+    if entry_data:
+        params["entry_data"] = "true"
+    if comment_data:
+        params["comment_data"] = "true"
+    return params
+
+
+def attachment_params(
+    uid: str,
+    filename: str,
+    caption: Union[str, None] = None,
+    nbid: Union[str, None] = None,
+    pid: Union[str, None] = None,
+    change_description: Union[str, None] = None,
+    client_ip: Union[str, None] = None,
+) -> dict[str, str]:
+    params: dict[str, str] = {"uid": uid, "filename": filename}
+    # Add optional parameters if provided
+    if caption:
+        params["caption"] = caption
+    if nbid:
+        params["nbid"] = nbid
+    if pid:
+        params["pid"] = pid
+    if change_description:
+        params["change_description"] = change_description
+    if client_ip:
+        params["client_ip"] = client_ip
+    return params
+
+
+def build_session(
+    cer_filepath: Union[Path, None] = None,
+    pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+    pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+    pool_block: bool = False,
+    keep_alive: bool = True,
+) -> requests.Session:
+    """
+    Build a pooled HTTP session for the LabArchives API.
+
+    Args:
+        cer_filepath: Optional CA bundle, set once as the session verify path
+            if the file exists, default verification is used otherwise
+        pool_connections: Number of per-host connection pools to cache
+        pool_maxsize: Maximum number of connections kept open per host
+        pool_block: Block when the pool is exhausted instead of opening
+            extra, non-pooled connections
+        keep_alive: Whether connections are kept open between requests
+
+    Returns:
+        requests.Session: Session with the pooled adapter mounted
+    """
+    session: requests.Session = requests.Session()
+    adapter: HTTPAdapter = HTTPAdapter(
+        pool_connections=pool_connections,
+        pool_maxsize=pool_maxsize,
+        pool_block=pool_block,
+    )
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    if cer_filepath is not None and Path(cer_filepath).exists():
+        session.verify = str(cer_filepath)
+    session.headers["Connection"] = "keep-alive" if keep_alive else "close"
+    return session
+
+
+def _setting_from_config(value: Union[str, None], name: str) -> str:
+    # Load from config if no value is passed
+    if value is not None:
+        return value
+    config_value: Any = getattr(config, name)
+    if isinstance(config_value, str):
+        return config_value
+    elif config_value is None:
+        raise ValueError(f"{name} was not set in config nor LAClient init!")
+    else:
+        raise TypeError(
+            f"config.{name} type: {type(config_value)}"
+            + ", must be string or None"
+        )
+
+
+def resolve_credentials(
+    api_url: Union[str, None] = None,
+    access_key_id: Union[str, None] = None,
+    access_password: Union[str, None] = None,
+) -> tuple[str, str, str]:
+    """
+    Resolve the API url and credentials, falling back to config for any
+    value that is not passed.
+
+    Raises:
+        ValueError: If a value is neither passed nor set in config
+        TypeError: If a config value is not a string
+    """
+    return (
+        _setting_from_config(api_url, "api_url"),
+        _setting_from_config(access_key_id, "access_key_id"),
+        _setting_from_config(access_password, "access_password"),
+    )
+
+
 class LAClient:
     def __init__(
         self,
@@ -190,58 +340,203 @@ class LAClient:
         access_key_id: Union[str, None] = None,
         access_password: Union[str, None] = None,
         cer_filepath: Union[Path, None] = None,
+        pool_connections: int = DEFAULT_POOL_CONNECTIONS,
+        pool_maxsize: int = DEFAULT_POOL_MAXSIZE,
+        pool_block: bool = False,
+        keep_alive: bool = True,
+        cache: Union[TreeLevelCache, None] = None,
+        scheduler: Union[RequestScheduler, None] = None,
+        metrics: Union[ClientMetrics, None] = None,
+        dedup: Union[DedupIndex, None] = None,
+        structure_cache: Union[NotebookStructureCache, None] = None,
+        single_flight: Union[SingleFlight, None] = None,
     ) -> None:
-        # Load from config if no values are passed
-        if api_url is None:
-            if isinstance(config.api_url, str):
-                self.api_url = config.api_url
-            elif config.api_url is None:
-                raise ValueError(
-                    "api_url was not set in config nor LAClient init!"
-                )
-            else:
-                raise TypeError(
-                    f"config.api_url type: {type(config.api_url)}"
-                    + ", must be string or None"
-                )
-        else:
-            self.api_url = api_url
-
-        if access_key_id is None:
-            if isinstance(config.access_key_id, str):
-                self.access_key_id = config.access_key_id
-            elif config.access_key_id is None:
-                raise ValueError(
-                    "access_key_id was not set in config nor LAClient init!"
-                )
-            else:
-                raise TypeError(
-                    f"config.access_key_id type: {type(config.access_key_id)}"
-                    + ", must be string or None"
-                )
-        else:
-            self.access_key_id = access_key_id
-
-        if access_password is None:
-            if isinstance(config.access_password, str):
-                self.access_password = config.access_password
-            elif config.access_password is None:
-                raise ValueError(
-                    "access_password was not set in config nor LAClient init!"
-                )
-            else:
-                raise TypeError(
-                    "config.access_password"
-                    + f" type: {type(config.access_password)}"
-                    + ", must be string or None"
-                )
-        else:
-            self.access_password = access_password
+        """
+        Client for the LabArchives API.
+
+        All endpoints share one pooled ``requests.Session`` so that TCP/TLS
+        connections to the LabArchives host are reused across calls.
+
+        Args:
+            api_url: Base URL of the LabArchives API. Defaults to config.
+            access_key_id: API access key id. Defaults to config.
+            access_password: API access password. Defaults to config.
+            cer_filepath: Optional CA bundle used to verify the host, if it
+                exists.
+            pool_connections: Number of per-host connection pools to cache.
+            pool_maxsize: Maximum number of connections kept per host.
+            pool_block: Block when the pool is exhausted instead of
+                opening a throwaway connection.
+            keep_alive: Reuse connections between requests.
+            cache: Optional cache of get_tree_level responses, invalidated
+                by insert_node.
+            scheduler: Rate limits, concurrency cap, retries and timeouts
+                applied to every API call. Defaults to a RequestScheduler
+                with retries and timeouts but no rate limit.
+            metrics: Collects per-method request counts, latencies, bytes,
+                retries, cache hits and parse timings. Defaults to a new
+                ClientMetrics.
+            dedup: Optional index of uploaded file contents. add_attachment
+                skips files whose content was already attached to the page.
+            structure_cache: Optional in-memory cache of parsed tree levels
+                shared with other clients of the process, checked before
+                cache and invalidated by insert_node.
+            single_flight: Shares one call among concurrent identical
+                get_tree_level and get_entries_for_page calls, pass the
+                same instance to several clients to share across them.
+                Defaults to a new SingleFlight.
+        """
+        self.api_url, self.access_key_id, self.access_password = (
+            resolve_credentials(api_url, access_key_id, access_password)
+        )
         self.cer_filepath = cer_filepath
+        self.session: requests.Session = build_session(
+            cer_filepath=cer_filepath,
+            pool_connections=pool_connections,
+            pool_maxsize=pool_maxsize,
+            pool_block=pool_block,
+            keep_alive=keep_alive,
+        )
+        self.cache = cache
+        self.scheduler: RequestScheduler = (
+            scheduler
+            if scheduler is not None
+            else RequestScheduler(max_concurrency=pool_maxsize)
+        )
+        self.metrics: ClientMetrics = (
+            metrics if metrics is not None else ClientMetrics()
+        )
+        self.dedup = dedup
+        self.structure_cache = structure_cache
+        self.single_flight: SingleFlight = (
+            single_flight if single_flight is not None else SingleFlight()
+        )
         self.is_auth: bool = False
         self.email: Union[str, None] = None
         self.uid: Union[str, None] = None
 
+    def __enter__(self) -> "LAClient":
+        return self
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.close()
+
+    def close(self) -> None:
+        """
+        Close the pooled session and release all open connections.
+        """
+        self.session.close()
+
+    def _get(self, url: str, **kwargs: Any) -> Response:
+        return self.session.get(url, **kwargs)
+
+    def _api_request(
+        self,
+        http_method: Literal["GET", "POST"],
+        path: str,
+        api_method: str,
+        params: dict[str, str],
+        idempotent: bool,
+        **kwargs: Any,
+    ) -> Response:
+        def send() -> Response:
+            # signed per attempt, as expires is part of the signature
+            url: str = build_api_url(
+                self.api_url,
+                path,
+                api_method,
+                params,
+                self.access_key_id,
+                self.access_password,
+            )
+            start: float = time.perf_counter()
+            try:
+                response: Response = self.session.request(
+                    http_method, url, timeout=self.scheduler.timeout, **kwargs
+                )
+            except requests.RequestException as e:
+                self.metrics.record_request(
+                    api_method, type(e).__name__, time.perf_counter() - start
+                )
+                raise
+            latency: float = time.perf_counter() - start
+            # streamed bodies are not read yet, so fall back to the header
+            bytes_received: int = (
+                int(response.headers.get("Content-Length", 0))
+                if kwargs.get("stream")
+                else len(response.content)
+            )
+            bytes_sent: int = int(
+                response.request.headers.get("Content-Length", 0)
+            )
+            self.metrics.record_request(
+                api_method,
+                str(response.status_code),
+                latency,
+                bytes_sent=bytes_sent,
+                bytes_received=bytes_received,
+            )
+            logger.debug(
+                f"{api_method} {response.status_code} {latency:.3f}s"
+                + f" sent={bytes_sent}B received={bytes_received}B"
+            )
+            return response
+
+        return self.scheduler.execute(
+            api_method, send, idempotent, on_retry=self.metrics.record_retry
+        )
+
+    def _coalesce(
+        self, api_method: str, params: dict[str, str], call: Callable[[], T]
+    ) -> T:
+        """
+        Run call, or share the result of the identical call in flight.
+
+        The key is the API method and its params. akid, expires and sig are
+        only added when the URL is signed, so two calls signed at different
+        times still match.
+        """
+        key: tuple[Any, ...] = (
+            self.api_url,
+            self.access_key_id,
+            api_method,
+            tuple(sorted(params.items())),
+        )
+        led: list[bool] = []
+
+        def lead() -> T:
+            led.append(True)
+            return call()
+
+        result: T = self.single_flight.do(key, lead)
+        if not led:
+            self.metrics.record_coalesced(api_method)
+        return result
+
+    def _api_get(
+        self,
+        path: str,
+        api_method: str,
+        params: dict[str, str],
+        idempotent: bool = True,
+        **kwargs: Any,
+    ) -> Response:
+        return self._api_request(
+            "GET", path, api_method, params, idempotent, **kwargs
+        )
+
+    def _api_post(
+        self,
+        path: str,
+        api_method: str,
+        params: dict[str, str],
+        idempotent: bool = False,
+        **kwargs: Any,
+    ) -> Response:
+        return self._api_request(
+            "POST", path, api_method, params, idempotent, **kwargs
+        )
+
     def generate_login_url(self, redirect_uri: str, expires: int) -> str:
         url_encoded_uri: str = quote_plus(redirect_uri)
         # Generate the signature
@@ -266,6 +561,10 @@ class LAClient:
     def _get_auth_callback(
         self,
     ) -> tuple[Union[str, None], Union[str, None], list[str], Response]:
+        import webbrowser
+
+        from .callback import CallbackHandler, start_callback_server
+
         # Clear any previous responses
         CallbackHandler.clear_responses()
         server = start_callback_server()
@@ -302,15 +601,7 @@ class LAClient:
                 if email is None:
                     email = callback_param.get("email", [None])[0]
             # callback_response = CallbackHandler.callback_response
-            if (
-                isinstance(self.cer_filepath, Path)
-                and self.cer_filepath.exists()
-            ):
-                response: Response = requests.get(
-                    login_url, verify=str(self.cer_filepath)
-                )
-            else:
-                response = requests.get(login_url)
+            response: Response = self._get(login_url)
             server.shutdown()
             server.server_close()
             CallbackHandler.clear_responses()
@@ -349,31 +640,15 @@ class LAClient:
             ]
             logger.debug(f"auth_callbacks: {masked_callbacks}")
             logger.debug(f"auth_response: {auth_response}")
-            expires: int = int(time.time()) * 1000
-            sig: str = generate_signature(
-                self.access_key_id,
+            response: Response = self._api_get(
+                "/api/users/user_access_info",
                 "user_access_info",
-                expires,
-                self.access_password,
-            )
-            url: str = (
-                self.api_url
-                + "/api/users/user_access_info"
-                + f"?login_or_email={quote_plus(email)}"
-                + f"&password={quote_plus(auth_code)}"
-                + f"&akid={self.access_key_id}"
-                + f"&expires={expires}"
-                + f"&sig={sig}"
+                {"login_or_email": email, "password": auth_code},
             )
-            if self.cer_filepath is not None:
-                response: Response = requests.get(
-                    url, verify=str(self.cer_filepath)
+            with self.metrics.timer("parse_user_access_info"):
+                ua_info: dict[str, Any] = parse_user_access_info_response(
+                    response=response
                 )
-            else:
-                response = requests.get(url)
-            ua_info: dict[str, Any] = parse_user_access_info_response(
-                response=response
-            )
             self.ua_info = ua_info
             self.is_auth = True
             self.auth_code = auth_code
@@ -382,84 +657,162 @@ class LAClient:
         else:
             raise ValueError("No auth_code or email returned from get_auth")
 
+    def _get_tree_level(self, nbid: str, parent: TreeNode) -> list[TreeNode]:
+        """
+        Fetch one level of the notebook tree and return its node records,
+        from the caches if they hold a fresh copy. Not recursive.
+        """
+        if self.structure_cache is None:
+            return self._fetch_tree_level(nbid, parent)
+        uid: str = self.ua_info["id"]
+        nodes: Union[list[TreeNode], None] = self.structure_cache.get(
+            uid, nbid, parent
+        )
+        self.metrics.record_structure_cache(nodes is not None)
+        if nodes is not None:
+            return nodes
+        return self.structure_cache.load(
+            uid, nbid, parent, lambda: self._fetch_tree_level(nbid, parent)
+        )
+
+    def _fetch_tree_level(
+        self, nbid: str, parent: TreeNode
+    ) -> list[TreeNode]:
+        params: dict[str, str] = {
+            "uid": self.ua_info["id"],
+            "nbid": nbid,
+            "parent_tree_id": parent.tree_id,
+        }
+        # waiters get the leader's parsed nodes, below the leader's parent
+        nodes: list[TreeNode] = self._coalesce(
+            "get_tree_level",
+            params,
+            lambda: self._load_tree_level(nbid, parent),
+        )
+        return rebase_level(nodes, parent)
+
+    def _load_tree_level(
+        self, nbid: str, parent: TreeNode
+    ) -> list[TreeNode]:
+        uid: str = self.ua_info["id"]
+        if self.cache is not None:
+            content: Union[bytes, None] = self.cache.get(
+                uid, nbid, parent.tree_id
+            )
+            self.metrics.record_cache(content is not None)
+            if content is not None:
+                with self.metrics.timer("parse_tree_level"):
+                    return parse_tree_level(content, parent)
+        response: Response = self._api_get(
+            "/api/tree_tools/get_tree_level",
+            "get_tree_level",
+            {"uid": uid, "nbid": nbid, "parent_tree_id": parent.tree_id},
+        )
+        # an error body parses as an empty level, which must not be cached
+        # or handed to the callers waiting for this fetch
+        response.raise_for_status()
+        if self.cache is not None:
+            self.cache.put(uid, nbid, parent.tree_id, response.content)
+        with self.metrics.timer("parse_tree_level"):
+            return parse_tree_level(response.content, parent)
+
     def get_dir_nodes(
         self,
         nbid: str,
         tree_id: str = "0",
         tree_name: str = "root",
         parent_tree_name: str = "",
-    ) -> list[ET.Element]:
+    ) -> list[TreeNode]:
         """
-        Get nodes in the tree of a given level. Not recursive.
+        Get the folders in the tree of a given level. Not recursive.
         """
         if not self.is_auth or not isinstance(self.email, str):
             raise ValueError("Client is not authenticated")
-        all_dir_nodes: list[ET.Element] = []
-        full_path: str = (
-            parent_tree_name + "/" + tree_name
-            if parent_tree_name
-            else tree_name
-        )
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
-            "get_tree_level",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/get_tree_level"
-            + f"?uid={self.ua_info['id']}"
-            + f"&nbid={nbid}"
-            + f"&parent_tree_id={tree_id}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+        parent: TreeNode = root_node(tree_id, tree_name, parent_tree_name)
+        return [
+            node
+            for node in self._get_tree_level(nbid, parent)
+            if not node.is_page
+        ]
+
+    def crawl_tree(
+        self,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+        max_depth: Union[int, None] = None,
+    ) -> tuple[list[TreeNode], list[TreeNode]]:
+        """
+        Crawl the tree below a node breadth-first, expanding every folder of
+        a level concurrently.
+
+        Args:
+            nbid (str): Notebook ID whose tree is to be traversed
+            tree_id (str): Tree ID of the node to start from
+            tree_name (str): Display name of the starting node
+            parent_tree_name (str): full_path of the starting node's parent
+            max_workers (int): Maximum number of concurrent tree requests
+            max_depth (int, optional): Number of levels to expand. Expands
+                the whole subtree if None.
+
+        Returns:
+            tuple[list[TreeNode], list[TreeNode]]: The pages and the
+            folders of the subtree in depth-first notebook order,
+            regardless of completion order.
+
+        Raises:
+            ValueError: If client is not authenticated
+        """
+        levels: dict[str, list[TreeNode]] = self.crawl_levels(
+            nbid,
+            root_node(tree_id, tree_name, parent_tree_name),
+            max_workers=max_workers,
+            max_depth=max_depth,
         )
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
-            )
-        else:
-            response = requests.get(url)
-        tree: ET.ElementTree = ET.parse(BytesIO(response.content))
-        root: ET.Element = tree.getroot()
-        nodes: list[ET.Element] = root.findall(".//level-node")
-        for node in nodes:
-            node_tree_id: ET.Element | None = node.find("tree-id")
-            if isinstance(node_tree_id, ET.Element):
-                node_tree_id_text: str | None = node_tree_id.text
-                if node_tree_id_text is None:
-                    raise ValueError("Node tree_id has no text!")
-            else:
-                raise ValueError("Node is missing tree-id element")
-            display_name: ET.Element | None = node.find("display-text")
-            is_page: ET.Element | None = node.find("is-page")
-            if isinstance(is_page, ET.Element):
-                is_page_text: str | None = is_page.text
-                if is_page_text is None:
-                    raise ValueError("Node is-page element text is missing!")
-            else:
-                raise ValueError("Node is missing is-page element!")
-            if isinstance(display_name, ET.Element):
-                display_name_text: str | None = display_name.text
-                if display_name_text:
-                    if is_page_text == "false":
-                        node.set(
-                            "full_path", full_path + "/" + display_name_text
-                        )
-                        all_dir_nodes.append(node)
-                    elif is_page_text == "true":
-                        pass
-                    else:
-                        raise ValueError(
-                            f"Node: {display_name_text} has is-page"
-                            + f" value of {is_page_text}"
-                        )
-            else:
-                raise ValueError("Node is missing display text!")
-        return all_dir_nodes
+        # walk the expanded levels depth-first to get a stable order
+        return order_crawl(levels, tree_id)
+
+    def crawl_levels(
+        self,
+        nbid: str,
+        root: TreeNode,
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+        max_depth: Union[int, None] = None,
+    ) -> dict[str, list[TreeNode]]:
+        """
+        Fetch the levels below root breadth-first, expanding every folder
+        of a level concurrently.
+
+        Returns:
+            dict[str, list[TreeNode]]: The nodes of every expanded folder in
+            notebook order, keyed by the folder's tree id. Top-level nodes
+            have root as their parent.
+
+        Raises:
+            ValueError: If client is not authenticated
+        """
+        if not self.is_auth or not isinstance(self.email, str):
+            raise ValueError("Client is not authenticated")
+        levels: dict[str, list[TreeNode]] = {}
+        frontier: list[TreeNode] = [root]
+        depth: int = 0
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            while frontier and (max_depth is None or depth < max_depth):
+                fetched = executor.map(
+                    lambda folder: self._get_tree_level(nbid, folder),
+                    frontier,
+                )
+                next_frontier: list[TreeNode] = []
+                for folder, nodes in zip(frontier, fetched):
+                    levels[folder.tree_id] = nodes
+                    next_frontier.extend(
+                        node for node in nodes if not node.is_page
+                    )
+                frontier = next_frontier
+                depth += 1
+        return levels
 
     def get_all_pages(
         self,
@@ -467,138 +820,39 @@ class LAClient:
         tree_id: str = "0",
         tree_name: str = "root",
         parent_tree_name: str = "",
-    ) -> list[ET.Element]:
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+    ) -> list[TreeNode]:
         """
         Get all pages in the tree recursively.
         """
-        if not self.is_auth or not isinstance(self.email, str):
-            raise ValueError("Client is not authenticated")
-        all_pages: list[ET.Element] = []
-        full_path: str = (
-            parent_tree_name + "/" + tree_name
-            if parent_tree_name
-            else tree_name
-        )
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
-            "get_tree_level",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/get_tree_level"
-            + f"?uid={self.ua_info['id']}"
-            + f"&nbid={nbid}"
-            + f"&parent_tree_id={tree_id}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+        pages, _ = self.crawl_tree(
+            nbid,
+            tree_id,
+            tree_name,
+            parent_tree_name,
+            max_workers=max_workers,
         )
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
-            )
-        else:
-            response = requests.get(url)
-        tree: ET.ElementTree = ET.parse(BytesIO(response.content))
-        root: ET.Element = tree.getroot()
-        nodes: list[ET.Element] = root.findall(".//level-node")
-        for node in nodes:
-            node_tree_id: ET.Element | None = node.find("tree-id")
-            if isinstance(node_tree_id, ET.Element):
-                node_tree_id_text: str | None = node_tree_id.text
-                if node_tree_id_text is None:
-                    raise ValueError("Node tree_id has no text!")
-            else:
-                raise ValueError("Node is missing tree-id element")
-            display_name: ET.Element | None = node.find("display-text")
-            is_page: ET.Element | None = node.find("is-page")
-            if isinstance(is_page, ET.Element):
-                is_page_text: str | None = is_page.text
-                if is_page_text is None:
-                    raise ValueError("Node is-page element text is missing!")
-            else:
-                raise ValueError("Node is missing is-page element!")
-            if isinstance(display_name, ET.Element):
-                display_name_text: str | None = display_name.text
-                if display_name_text:
-                    if is_page_text == "true":
-                        node.set(
-                            "full_path", full_path + "/" + display_name_text
-                        )
-                        all_pages.append(node)
-                    elif is_page_text == "false":
-                        all_pages.extend(
-                            self.get_all_pages(  # type: ignore
-                                nbid,
-                                node_tree_id_text,
-                                display_name_text,
-                                full_path,
-                            )
-                        )
-                        pass
-                    else:
-                        raise ValueError(
-                            f"Node: {display_name_text} has is-page"
-                            + f" value of {is_page_text}"
-                        )
-            else:
-                raise ValueError("Node is missing display text!")
-        return all_pages
+        return pages
 
     def get_entry_data(self, nbid: str, page_tree_id: str) -> Response:
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
+        response: Response = self._api_get(
+            "/api/tree_tools/get_entries_for_page",
             "get_entries_for_page",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/get_entries_for_page"
-            + f"?uid={self.ua_info['id']}"
-            + f"&page_tree_id={page_tree_id}"
-            + "&entry_data=true"
-            + f"&nbid={nbid}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+            {
+                "uid": self.ua_info["id"],
+                "page_tree_id": page_tree_id,
+                "entry_data": "true",
+                "nbid": nbid,
+            },
         )
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
-            )
-        else:
-            response = requests.get(url)
         return response
 
     def get_node_data(self, nbid: str, tree_id: str) -> Response:
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
+        response: Response = self._api_get(
+            "/api/tree_tools/get_node",
             "get_node",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/get_node"
-            + f"?uid={self.ua_info['id']}"
-            + f"&nbid={nbid}"
-            + f"&tree_id={tree_id}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+            {"uid": self.ua_info["id"], "nbid": nbid, "tree_id": tree_id},
         )
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
-            )
-        else:
-            response = requests.get(url)
         return response
 
     def insert_node(
@@ -608,31 +862,24 @@ class LAClient:
         display_text: str,
         is_folder: Literal["true", "false"],
     ) -> Response:
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
+        response: Response = self._api_get(
+            "/api/tree_tools/insert_node",
             "insert_node",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/insert_node"
-            + f"?uid={self.ua_info['id']}"
-            + f"&nbid={nbid}"
-            + f"&parent_tree_id={parent_tree_id}"
-            + f"&display_text={display_text}"
-            + f"&is_folder={is_folder}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+            {
+                "uid": self.ua_info["id"],
+                "nbid": nbid,
+                "parent_tree_id": parent_tree_id,
+                "display_text": display_text,
+                "is_folder": is_folder,
+            },
+            idempotent=False,
         )
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
+        if self.cache is not None:
+            self.cache.invalidate(self.ua_info["id"], nbid, parent_tree_id)
+        if self.structure_cache is not None:
+            self.structure_cache.invalidate(
+                self.ua_info["id"], nbid, parent_tree_id
             )
-        else:
-            response = requests.get(url)
         return response
 
     def add_attachment(
@@ -644,9 +891,14 @@ class LAClient:
         pid: Union[str, None] = None,
         change_description: Union[str, None] = None,
         client_ip: Union[str, None] = None,
-    ) -> Response:
+        progress: Union[Callable[[int], None], None] = None,
+    ) -> Union[Response, None]:
         """
-        Upload a new attachment to the notebook.
+        Upload a new attachment to the notebook. The file is streamed from
+        disk in chunks.
+
+        If the client has a dedup index and the file's content was already
+        attached to the page, nothing is uploaded.
 
         Args:
             filepath: Path to the file to upload
@@ -656,9 +908,12 @@ class LAClient:
             pid: Optional page ID within the notebook
             change_description: Optional description of changes
             client_ip: Optional IP address of the client
+            progress: Optional callback, called with the size of every
+                chunk sent
 
         Returns:
-            Response object containing the server's response
+            Response object containing the server's response, None if the
+            upload was skipped as a duplicate
 
         Raises:
             ValueError: If client is not authenticated or file doesn't exist
@@ -674,50 +929,48 @@ class LAClient:
         # Use provided filename or get from filepath
         filename = filename or filepath.name
 
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
-            "add_attachment",
-            expires,
-            self.access_password,
+        # duplicates are only detected when the destination page is known
+        dedup_page: Union[tuple[str, str], None] = (
+            (nbid, pid) if nbid and pid else None
         )
-
-        url: str = (
-            f"{self.api_url}/api/entries/add_attachment"
-            f"?uid={self.ua_info['id']}"
-            f"&filename={quote_plus(filename)}"
-            f"&akid={self.access_key_id}"
-            f"&expires={expires}"
-            f"&sig={sig}"
+        if self.dedup is not None and dedup_page is not None:
+            duplicate = self.dedup.lookup(filepath, *dedup_page)
+            if duplicate is not None:
+                logger.info(
+                    f"Skipping {filepath}, already attached to page {pid}"
+                    + f" as entry {duplicate[1]}"
+                )
+                return None
+
+        params: dict[str, str] = attachment_params(
+            self.ua_info["id"],
+            filename,
+            caption=caption,
+            nbid=nbid,
+            pid=pid,
+            change_description=change_description,
+            client_ip=client_ip,
         )
 
-        # Add optional parameters if provided
-        if caption:
-            url += f"&caption={quote_plus(caption)}"
-        if nbid:
-            url += f"&nbid={nbid}"
-        if pid:
-            url += f"&pid={pid}"
-        if change_description:
-            url += f"&change_description={quote_plus(change_description)}"
-        if client_ip:
-            url += f"&client_ip={quote_plus(client_ip)}"
-
         # Read file in binary mode
         with open(filepath, "rb") as file:
-            if self.cer_filepath is not None:
-                response: Response = requests.post(
-                    url,
-                    data=file,
-                    headers={"Content-Type": "application/octet-stream"},
-                    verify=str(self.cer_filepath),
-                )
-            else:
-                response = requests.post(
-                    url,
-                    data=file,
-                    headers={"Content-Type": "application/octet-stream"},
-                )
+            response: Response = self._api_post(
+                "/api/entries/add_attachment",
+                "add_attachment",
+                params,
+                data=(
+                    file
+                    if progress is None
+                    else ProgressReader(
+                        file, filepath.stat().st_size, progress
+                    )
+                ),
+                headers={"Content-Type": "application/octet-stream"},
+            )
+        if self.dedup is not None and dedup_page is not None and response.ok:
+            self.dedup.record(
+                filepath, *dedup_page, parse_attachment_eid(response.content)
+            )
 
         return response
 
@@ -737,29 +990,11 @@ class LAClient:
         if not self.is_auth:
             raise ValueError("Client is not authenticated")
 
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
+        response: Response = self._api_get(
+            "/api/entries/attachment_last_uploaded_at",
             "attachment_last_uploaded_at",
-            expires,
-            self.access_password,
-        )
-        url: str = (
-            self.api_url
-            + "/api/entries/attachment_last_uploaded_at"
-            + f"?uid={self.ua_info['id']}"
-            + f"&eid={eid}"
-            + f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
+            {"uid": self.ua_info["id"], "eid": eid},
         )
-
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
-            )
-        else:
-            response = requests.get(url)
         return response
 
     def get_entries_for_page(
@@ -768,6 +1003,7 @@ class LAClient:
         page_tree_id: str,
         entry_data: bool = False,
         comment_data: bool = False,
+        stream: bool = False,
     ) -> Response:
         """
         Get a list of Entries that reside on a specific page.
@@ -779,6 +1015,10 @@ class LAClient:
                 Defaults to False.
             comment_data (bool, optional): Include comment data in response.
                 Defaults to False.
+            stream (bool, optional): Leave the body unread so it can be
+                parsed incrementally with iter_page_entries. Defaults to
+                False. Concurrent identical calls that are not streamed
+                share one request and get the same Response.
 
         Returns:
             Response: Server response containing the entries for the
@@ -790,36 +1030,28 @@ class LAClient:
         if not self.is_auth:
             raise ValueError("Client is not authenticated")
 
-        expires: int = int(time.time()) * 1000
-        sig: str = generate_signature(
-            self.access_key_id,
-            "get_entries_for_page",
-            expires,
-            self.access_password,
+        params: dict[str, str] = entries_for_page_params(
+            self.ua_info["id"],
+            nbid,
+            page_tree_id,
+            entry_data=entry_data,
+            comment_data=comment_data,
         )
-        url: str = (
-            self.api_url
-            + "/api/tree_tools/get_entries_for_page"
-            + f"?uid={self.ua_info['id']}"
-            + f"&page_tree_id={page_tree_id}"
-            + f"&nbid={nbid}"
-        )
-
-        if entry_data:
-            url += "&entry_data=true"
-        if comment_data:
-            url += "&comment_data=true"
-
-        url += (
-            f"&akid={self.access_key_id}"
-            + f"&expires={expires}"
-            + f"&sig={sig}"
-        )
-
-        if self.cer_filepath is not None:
-            response: Response = requests.get(
-                url, verify=str(self.cer_filepath)
+        if stream:
+            # a streamed body can only be read once
+            return self._api_get(
+                "/api/tree_tools/get_entries_for_page",
+                "get_entries_for_page",
+                params,
+                stream=True,
             )
-        else:
-            response = requests.get(url)
+        response: Response = self._coalesce(
+            "get_entries_for_page",
+            params,
+            lambda: self._api_get(
+                "/api/tree_tools/get_entries_for_page",
+                "get_entries_for_page",
+                params,
+            ),
+        )
         return response
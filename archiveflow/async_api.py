@@ -0,0 +1,343 @@
+import asyncio
+import ssl
+from pathlib import Path
+from typing import Any, Literal, Union
+
+try:
+    import aiohttp
+    from yarl import URL
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "AsyncLAClient requires aiohttp,"
+        + " install it with `pip install archiveflow[async]`"
+    ) from e
+
+from .api import (
+    DEFAULT_CRAWL_WORKERS,
+    attachment_params,
+    build_api_url,
+    entries_for_page_params,
+    resolve_credentials,
+)
+from .tree import TreeNode, order_crawl, parse_tree_level, root_node
+from .utils import parse_user_access_info_response
+
+DEFAULT_CONNECTION_LIMIT: int = 100
+DEFAULT_CONNECTION_LIMIT_PER_HOST: int = 20
+
+
+class AsyncLAClient:
+    """
+    asyncio variant of LAClient built on aiohttp.
+
+    Request signing and XML parsing are shared with LAClient, so both
+    clients build identical URLs and return identical tree nodes. Response
+    bodies are returned as bytes.
+    """
+
+    def __init__(
+        self,
+        api_url: Union[str, None] = None,
+        access_key_id: Union[str, None] = None,
+        access_password: Union[str, None] = None,
+        cer_filepath: Union[Path, None] = None,
+        limit: int = DEFAULT_CONNECTION_LIMIT,
+        limit_per_host: int = DEFAULT_CONNECTION_LIMIT_PER_HOST,
+        timeout: Union[float, None] = None,
+    ) -> None:
+        """
+        Args:
+            api_url: Base URL of the LabArchives API. Defaults to config.
+            access_key_id: API access key id. Defaults to config.
+            access_password: API access password. Defaults to config.
+            cer_filepath: Optional CA bundle used to verify the host, if it
+                exists.
+            limit: Maximum number of open connections.
+            limit_per_host: Maximum number of open connections per host.
+            timeout: Total timeout in seconds for each request.
+        """
+        self.api_url, self.access_key_id, self.access_password = (
+            resolve_credentials(api_url, access_key_id, access_password)
+        )
+        self.cer_filepath = cer_filepath
+        self.limit = limit
+        self.limit_per_host = limit_per_host
+        self.timeout = timeout
+        self._session: Union[aiohttp.ClientSession, None] = None
+        self.is_auth: bool = False
+        self.email: Union[str, None] = None
+        self.uid: Union[str, None] = None
+
+    async def __aenter__(self) -> "AsyncLAClient":
+        return self
+
+    async def __aexit__(self, *exc_info: Any) -> None:
+        await self.close()
+
+    @property
+    def session(self) -> aiohttp.ClientSession:
+        """
+        The pooled aiohttp session, created on first use inside the
+        running event loop.
+        """
+        if self._session is None or self._session.closed:
+            ssl_context: Union[ssl.SSLContext, bool] = True
+            if self.cer_filepath is not None and self.cer_filepath.exists():
+                ssl_context = ssl.create_default_context(
+                    cafile=str(self.cer_filepath)
+                )
+            connector = aiohttp.TCPConnector(
+                limit=self.limit,
+                limit_per_host=self.limit_per_host,
+                ssl=ssl_context,
+            )
+            self._session = aiohttp.ClientSession(
+                connector=connector,
+                timeout=aiohttp.ClientTimeout(total=self.timeout),
+                raise_for_status=True,
+            )
+        return self._session
+
+    async def close(self) -> None:
+        """
+        Close the session and release all open connections.
+        """
+        if self._session is not None:
+            await self._session.close()
+            self._session = None
+
+    def _check_auth(self) -> None:
+        if not self.is_auth or not isinstance(self.email, str):
+            raise ValueError("Client is not authenticated")
+
+    async def _api_get(
+        self, path: str, api_method: str, params: dict[str, str]
+    ) -> bytes:
+        url: str = build_api_url(
+            self.api_url,
+            path,
+            api_method,
+            params,
+            self.access_key_id,
+            self.access_password,
+        )
+        # the URL is already encoded and signed, aiohttp must not requote it
+        async with self.session.get(URL(url, encoded=True)) as response:
+            return await response.read()
+
+    async def login(self, auth_code: str, email: str) -> bytes:
+        """
+        Log in with an auth code and email from the LabArchives login
+        redirect.
+
+        Args:
+            auth_code (str): auth_code returned to the redirect URI
+            email (str): email returned to the redirect URI
+
+        Returns:
+            bytes: The user_access_info response body
+        """
+        if not isinstance(auth_code, str) or not isinstance(email, str):
+            raise ValueError("Invalid auth_code or email")
+        content: bytes = await self._api_get(
+            "/api/users/user_access_info",
+            "user_access_info",
+            {"login_or_email": email, "password": auth_code},
+        )
+        self.ua_info: dict[str, Any] = parse_user_access_info_response(
+            content
+        )
+        self.is_auth = True
+        self.auth_code = auth_code
+        self.email = email
+        return content
+
+    async def _get_tree_level(
+        self, nbid: str, parent: TreeNode
+    ) -> list[TreeNode]:
+        content: bytes = await self._api_get(
+            "/api/tree_tools/get_tree_level",
+            "get_tree_level",
+            {
+                "uid": self.ua_info["id"],
+                "nbid": nbid,
+                "parent_tree_id": parent.tree_id,
+            },
+        )
+        return parse_tree_level(content, parent)
+
+    async def get_dir_nodes(
+        self,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+    ) -> list[TreeNode]:
+        """
+        Get the folders in the tree of a given level. Not recursive.
+        """
+        self._check_auth()
+        parent: TreeNode = root_node(tree_id, tree_name, parent_tree_name)
+        return [
+            node
+            for node in await self._get_tree_level(nbid, parent)
+            if not node.is_page
+        ]
+
+    async def crawl_tree(
+        self,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+        max_depth: Union[int, None] = None,
+    ) -> tuple[list[TreeNode], list[TreeNode]]:
+        """
+        Crawl the tree below a node breadth-first, see LAClient.crawl_tree.
+        max_workers bounds the number of tree requests in flight.
+        """
+        self._check_auth()
+        semaphore: asyncio.Semaphore = asyncio.Semaphore(max_workers)
+
+        async def fetch(folder: TreeNode) -> list[TreeNode]:
+            async with semaphore:
+                return await self._get_tree_level(nbid, folder)
+
+        children: dict[str, list[TreeNode]] = {}
+        frontier: list[TreeNode] = [
+            root_node(tree_id, tree_name, parent_tree_name)
+        ]
+        depth: int = 0
+        while frontier and (max_depth is None or depth < max_depth):
+            levels: list[list[TreeNode]] = await asyncio.gather(
+                *(fetch(folder) for folder in frontier)
+            )
+            next_frontier: list[TreeNode] = []
+            for folder, nodes in zip(frontier, levels):
+                children[folder.tree_id] = nodes
+                next_frontier.extend(
+                    node for node in nodes if not node.is_page
+                )
+            frontier = next_frontier
+            depth += 1
+        return order_crawl(children, tree_id)
+
+    async def get_all_pages(
+        self,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+    ) -> list[TreeNode]:
+        """
+        Get all pages in the tree recursively.
+        """
+        pages, _ = await self.crawl_tree(
+            nbid,
+            tree_id,
+            tree_name,
+            parent_tree_name,
+            max_workers=max_workers,
+        )
+        return pages
+
+    async def get_entries_for_page(
+        self,
+        nbid: str,
+        page_tree_id: str,
+        entry_data: bool = False,
+        comment_data: bool = False,
+    ) -> bytes:
+        """
+        Get a list of Entries that reside on a specific page.
+
+        Returns:
+            bytes: The get_entries_for_page response body
+        """
+        self._check_auth()
+        return await self._api_get(
+            "/api/tree_tools/get_entries_for_page",
+            "get_entries_for_page",
+            entries_for_page_params(
+                self.ua_info["id"],
+                nbid,
+                page_tree_id,
+                entry_data=entry_data,
+                comment_data=comment_data,
+            ),
+        )
+
+    async def get_node_data(self, nbid: str, tree_id: str) -> bytes:
+        self._check_auth()
+        return await self._api_get(
+            "/api/tree_tools/get_node",
+            "get_node",
+            {"uid": self.ua_info["id"], "nbid": nbid, "tree_id": tree_id},
+        )
+
+    async def insert_node(
+        self,
+        nbid: str,
+        parent_tree_id: str,
+        display_text: str,
+        is_folder: Literal["true", "false"],
+    ) -> bytes:
+        self._check_auth()
+        return await self._api_get(
+            "/api/tree_tools/insert_node",
+            "insert_node",
+            {
+                "uid": self.ua_info["id"],
+                "nbid": nbid,
+                "parent_tree_id": parent_tree_id,
+                "display_text": display_text,
+                "is_folder": is_folder,
+            },
+        )
+
+    async def add_attachment(
+        self,
+        filepath: Union[str, Path],
+        filename: Union[str, None] = None,
+        caption: Union[str, None] = None,
+        nbid: Union[str, None] = None,
+        pid: Union[str, None] = None,
+        change_description: Union[str, None] = None,
+        client_ip: Union[str, None] = None,
+    ) -> bytes:
+        """
+        Upload a new attachment to the notebook. The file is streamed from
+        disk, see LAClient.add_attachment for the arguments.
+
+        Returns:
+            bytes: The add_attachment response body
+        """
+        self._check_auth()
+        filepath = Path(filepath)
+        if not filepath.exists():
+            raise FileNotFoundError(f"File not found: {filepath}")
+        url: str = build_api_url(
+            self.api_url,
+            "/api/entries/add_attachment",
+            "add_attachment",
+            attachment_params(
+                self.ua_info["id"],
+                filename or filepath.name,
+                caption=caption,
+                nbid=nbid,
+                pid=pid,
+                change_description=change_description,
+                client_ip=client_ip,
+            ),
+            self.access_key_id,
+            self.access_password,
+        )
+        with open(filepath, "rb") as file:
+            async with self.session.post(
+                URL(url, encoded=True),
+                data=file,
+                headers={"Content-Type": "application/octet-stream"},
+            ) as response:
+                return await response.read()
@@ -1,18 +1,22 @@
+import hashlib
 import json
 import string
-from io import BytesIO
 from json import JSONDecodeError
 from pathlib import Path
-from typing import Any, Final, Literal
-from xml.etree import ElementTree as ET
+from typing import TYPE_CHECKING, Any, Callable, Final, Iterator
 
-import pandas as pd
 from requests import Response
 
+from .utils import EmptyResults, iter_page_entries
 
-class EmptyResults(Exception):
-    def __init__(self, message: str | None):
-        super().__init__(message)
+# numpy and pandas take most of the import time of the package, so they are
+# only imported once forms are decoded
+if TYPE_CHECKING:
+    import numpy as np
+    import pandas as pd
+    from numpy.typing import NDArray
+
+BEHAVIOR_FORM_ID: Final[int] = 20058
 
 
 class FormIdError(Exception):
@@ -20,403 +24,552 @@ class FormIdError(Exception):
         super().__init__(message)
 
 
-class BehaviorFormV4:
-    FORM_ID: Final[int] = 20058
-    FORM_VERSION: Final[int] = 4
-    FORM_METADATA: Final[dict[str, str]] = {
-        "date_date": "Date",
-        "start": "Start Time",
-        "personnel": "Personnel Running Task",
-        "room": "Behavior Room",
-        "experiment": "Experiment",
-        "subjects": "Subjects",
-        "manipulation": "Manipulation",
-        "video_file_path": "Video File Path",
-        "protocol": "AnyMaze Protocol",
-        "cue": "Cue Information",
-        "reward": "Reward Information",
-    }
-    FIRST_TABLE_NUM_COLS: Final[int] = 6
-    FIRST_TABLE_NUM_SUBJECTS: Final[int] = 12
-    FIRST_TABLE_DATA_INPUTS: Final[list[list[str]]] = []
-    for i in range(FIRST_TABLE_NUM_SUBJECTS):
-        subject_row: list[str] = []
-        subject_letter: str = string.ascii_lowercase[i]
-        for j in range(FIRST_TABLE_NUM_COLS):
-            subject_row.append(f"{subject_letter}{j + 1}")
-        FIRST_TABLE_DATA_INPUTS.append(subject_row)
-    FIRST_TABLE_HEADERS: Final[list[str]] = [
-        "p6",
-        "p1",
-        "p2",
-        "p3",
-        "p4",
-        "p5",
-    ]
-    # The order of the subjects is scrambled at the end in the form
-    # the list is in the proper order to match to form
-    FIRST_TABLE_SUBJECTS: Final[list[str]] = [
-        "m1",
-        "m2",
-        "m3",
-        "m4",
-        "m5",
-        "m6",
-        "m7",
-        "m8",
-        "m9",
-        "m12",
-        "m10",
-        "m11",
-    ]
-    FIRST_TABLE: pd.DataFrame = pd.DataFrame(
-        data=FIRST_TABLE_DATA_INPUTS,
-        columns=FIRST_TABLE_HEADERS,
-        index=FIRST_TABLE_SUBJECTS,
-    )
-    SECOND_TABLE_NUM_COLS: Final[int] = 6
-    SECOND_TABLE_NUM_SUBJECTS: Final[int] = 8
-    SECOND_TABLE_HEADERS: Final[list[str]] = [
-        "p1",
-        "p2",
-        "p3",
-        "p4",
-        "p5",
-        "p6",
-    ]
-    SECOND_TABLE_SUBJECTS: Final[list[str]] = [
-        "m1",
-        "m2",
-        "m3",
-        "m4",
-        "m5",
-        "m6",
-        "m7",
-        "m8",
-    ]
-    SECOND_TABLE_DATA_INPUTS: Final[list[list[str]]] = []
-    for i in range(SECOND_TABLE_NUM_SUBJECTS):
-        subject_row = []
-        subject_letter = string.ascii_lowercase[i]
-        for j in range(SECOND_TABLE_NUM_COLS):
-            if subject_letter == "g" and j == 0:
-                subject_row.append("f7")
-            else:
-                subject_row.append(f"{subject_letter}{j + 1}")
-        SECOND_TABLE_DATA_INPUTS.append(subject_row)
-    SECOND_TABLE: pd.DataFrame = pd.DataFrame(
-        data=SECOND_TABLE_DATA_INPUTS,
-        columns=SECOND_TABLE_HEADERS,
-        index=SECOND_TABLE_SUBJECTS,
-    )
-    FLAT_FIRST_TABLE: list[Any] = [
-        item
-        for sublist in FIRST_TABLE.reset_index().values  # type: ignore
-        for item in sublist
-    ]
-    FLAT_SECOND_TABLE: list[Any] = [
-        item
-        for sublist in SECOND_TABLE.reset_index().values  # type: ignore
-        for item in sublist
+def table_inputs(
+    subjects: list[str], num_cols: int, cell_name: Callable[[int, int], str]
+) -> list[list[str]]:
+    """
+    Input names of a form table, one row per subject: the subject input
+    followed by the input of each metric column.
+
+    Args:
+        subjects: Input name of the subject cell of every row
+        num_cols: Number of metric columns
+        cell_name: Input name of the cell at (row, column)
+    """
+    return [
+        [subject] + [cell_name(i, j) for j in range(num_cols)]
+        for i, subject in enumerate(subjects)
     ]
-    METADATA_KEYS: list[str] = list(FORM_METADATA.keys())
-    INPUTS: list[str] = (
-        METADATA_KEYS
-        + FIRST_TABLE_HEADERS
-        + FLAT_FIRST_TABLE
-        + SECOND_TABLE_HEADERS
-        + FLAT_SECOND_TABLE
-        + ["notes"]
+
+
+class FormLayout:
+    """
+    Input layout of one version of a form.
+
+    The layout is compiled once into index arrays into the form's
+    name/value list, so decoding a form is a single gather per table. The
+    arrays are built on first use, registering a layout is cheap.
+    """
+
+    _INDEX_ATTRIBUTES: Final[frozenset[str]] = frozenset(
+        {
+            "metadata_index",
+            "first_headers_index",
+            "first_table_index",
+            "second_headers_index",
+            "second_table_index",
+            "notes_index",
+        }
     )
 
-    def _reconstruct_table(
-        self, form_values: list[Any], table_type: Literal["First", "Second"]
-    ) -> list[Any]:
-        if table_type == "First":
-            table_headers: list[str] = self.FIRST_TABLE_HEADERS
-            flat_table: list[Any] = self.FLAT_FIRST_TABLE
-            num_cols: int = self.FIRST_TABLE_NUM_COLS + 1
-        else:
-            table_headers = self.SECOND_TABLE_HEADERS
-            flat_table = self.FLAT_SECOND_TABLE
-            num_cols = self.SECOND_TABLE_NUM_COLS + 1
-        table_header_values: list[str] = form_values[: len(table_headers)]
-        del form_values[: len(table_headers)]
-        table_values: list[list[Any]] = form_values[: len(flat_table)]
-        del form_values[: len(flat_table)]
-        # chunk size is the number of metric columns plus the mouse column
-        chunk_size: int = num_cols
-        table_lists: list[list[Any]] = [
-            table_values[i : i + chunk_size]
-            for i in range(
-                0,
-                len(table_values),
-                chunk_size,
-            )
+    def __init__(
+        self,
+        form_id: int,
+        form_version: int,
+        metadata: dict[str, str],
+        first_table_headers: list[str],
+        first_table: list[list[str]],
+        second_table_headers: list[str],
+        second_table: list[list[str]],
+        notes: str = "notes",
+    ) -> None:
+        """
+        Args:
+            form_id: LabArchives form id
+            form_version: LabArchives form version
+            metadata: Metadata input names mapped to their labels
+            first_table_headers: Inputs holding the first table's headers
+            first_table: Inputs of the first table, see table_inputs
+            second_table_headers: Inputs holding the second table's headers
+            second_table: Inputs of the second table, see table_inputs
+            notes: Input holding the notes
+        """
+        self.form_id = form_id
+        self.form_version = form_version
+        self.metadata = metadata
+        self.inputs: list[str] = (
+            list(metadata)
+            + first_table_headers
+            + [name for row in first_table for name in row]
+            + second_table_headers
+            + [name for row in second_table for name in row]
+            + [notes]
+        )
+        self._inputs: tuple[str, ...] = tuple(self.inputs)
+        self.metadata_labels: list[str] = list(metadata.values())
+        self._section_shapes: list[tuple[int, ...]] = [
+            (len(metadata),),
+            (len(first_table_headers),),
+            (len(first_table), len(first_table[0])),
+            (len(second_table_headers),),
+            (len(second_table), len(second_table[0])),
         ]
-        table_columns: list[str] = ["Mouse"] + table_header_values
-        table: pd.DataFrame = pd.DataFrame(
-            data=table_lists, columns=table_columns
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for attributes not set yet
+        if name in FormLayout._INDEX_ATTRIBUTES:
+            self._compile()
+            return self.__dict__[name]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
         )
-        table.set_index("Mouse")  # type: ignore
-        if table_type == "First":
-            self.first_table = table
-        else:
-            self.second_table = table
-        return form_values
-
-    def __init__(self, forms: list[list[dict[str, Any]]]) -> None:
-        for form_pairs in forms:
-            # ensure that the form pairs are in the correct order
-            form_inputs: list[str] = [pair["name"] for pair in form_pairs]
-            form_values: list[Any] = [pair["value"] for pair in form_pairs]
-            if form_inputs != self.INPUTS:
-                raise ValueError("Form inputs do not match expected inputs!")
-            # parse metadata
-            metadata: dict[str, Any] = dict(
-                zip(
-                    self.FORM_METADATA.values(),
-                    form_values[: len(self.FORM_METADATA)],
-                )
-            )
-            del form_values[: len(self.FORM_METADATA)]
-            self.metadata = metadata
-            form_values = self._reconstruct_table(form_values, "First")
-            form_values = self._reconstruct_table(form_values, "Second")
-            self.notes = form_values[0]
-
-
-class BehaviorFormV6:
-    FORM_ID: Final[int] = 20058
-    FORM_VERSION: Final[int] = 6
-    FORM_METADATA: Final[dict[str, str]] = {
-        "date_date": "Date",
-        "start": "Start Time",
-        "personnel": "Personnel Running Task",
-        "room": "Behavior Room",
-        "experiment": "Experiment",
-        "subjects": "Subjects",
-        "manipulation": "Manipulation",
-        "video_file_path": "Video File Path",
-        "protocol": "AnyMaze Protocol",
-        "cue": "Cue Information",
-        "reward": "Reward Information",
-    }
-    FIRST_TABLE_NUM_COLS: Final[int] = 6
-    FIRST_TABLE_NUM_SUBJECTS: Final[int] = 12
-    FIRST_TABLE_DATA_INPUTS: Final[list[list[str]]] = []
+
+    def _compile(self) -> None:
+        import numpy as np
+
+        # input names repeat between the tables, so the index arrays are
+        # built from each section's offset in the input order
+        offset: int = 0
+
+        def section(shape: tuple[int, ...]) -> "NDArray[np.intp]":
+            nonlocal offset
+            size: int = int(np.prod(shape))
+            indices: NDArray[np.intp] = np.arange(
+                offset, offset + size, dtype=np.intp
+            ).reshape(shape)
+            offset += size
+            return indices
+
+        (
+            self.metadata_index,
+            self.first_headers_index,
+            self.first_table_index,
+            self.second_headers_index,
+            self.second_table_index,
+        ) = [section(shape) for shape in self._section_shapes]
+        self.notes_index: int = int(section((1,))[0])
+
+    @property
+    def key(self) -> tuple[int, int]:
+        return self.form_id, self.form_version
+
+    def form_values(
+        self, form_pairs: list[dict[str, Any]]
+    ) -> "NDArray[Any]":
+        """
+        Check a form's inputs against the layout and return its values.
+
+        Raises:
+            ValueError: If the form inputs do not match the layout
+        """
+        import numpy as np
+
+        if tuple(pair["name"] for pair in form_pairs) != self._inputs:
+            raise ValueError("Form inputs do not match expected inputs!")
+        values: NDArray[Any] = np.empty(len(form_pairs), dtype=object)
+        values[:] = [pair["value"] for pair in form_pairs]
+        return values
+
+    def decode(
+        self, form_pairs: list[dict[str, Any]]
+    ) -> "tuple[dict[str, Any], pd.DataFrame, pd.DataFrame, Any]":
+        """
+        Decode the name/value pairs of one form.
+
+        Returns:
+            tuple: The metadata by label, the first and second tables with
+            a "Mouse" column, and the notes
+        """
+        import pandas as pd
+
+        values: NDArray[Any] = self.form_values(form_pairs)
+        metadata: dict[str, Any] = dict(
+            zip(self.metadata_labels, values[self.metadata_index])
+        )
+        first_table: pd.DataFrame = pd.DataFrame(
+            data=values[self.first_table_index],
+            columns=["Mouse"] + list(values[self.first_headers_index]),
+        )
+        second_table: pd.DataFrame = pd.DataFrame(
+            data=values[self.second_table_index],
+            columns=["Mouse"] + list(values[self.second_headers_index]),
+        )
+        return metadata, first_table, second_table, values[self.notes_index]
+
+
+FORM_LAYOUTS: dict[tuple[int, int], FormLayout] = {}
+
+
+def register_form_layout(layout: FormLayout) -> FormLayout:
+    """
+    Add a form layout to the registry used by recontruct_behavior_form.
+    """
+    FORM_LAYOUTS[layout.key] = layout
+    return layout
+
+
+def get_form_layout(form_id: int, form_version: int) -> FormLayout:
+    try:
+        return FORM_LAYOUTS[(form_id, form_version)]
+    except KeyError:
+        raise ValueError("Form version not known!") from None
+
+
+BEHAVIOR_FORM_METADATA: Final[dict[str, str]] = {
+    "date_date": "Date",
+    "start": "Start Time",
+    "personnel": "Personnel Running Task",
+    "room": "Behavior Room",
+    "experiment": "Experiment",
+    "subjects": "Subjects",
+    "manipulation": "Manipulation",
+    "video_file_path": "Video File Path",
+    "protocol": "AnyMaze Protocol",
+    "cue": "Cue Information",
+    "reward": "Reward Information",
+}
+
+
+def _second_table_cell(i: int, j: int) -> str:
+    # g1 of the second table is actually named f7 in the form
+    if i == 6 and j == 0:
+        return "f7"
+    return f"{string.ascii_lowercase[i]}{j + 1}"
+
+
+def _v6_first_table_cell(i: int, j: int) -> str:
     # for some unfathomable reason, the -a suffix is dropped
-    # at i2 of table 1 in v6 of the form and g1 is actually f7
-    a_toggle: bool = True
-    for i in range(FIRST_TABLE_NUM_SUBJECTS):
-        subject_row: list[str] = []
-        subject_letter: str = string.ascii_lowercase[i]
-        for j in range(FIRST_TABLE_NUM_COLS):
-            if a_toggle:
-                subject_row.append(f"{subject_letter}{j + 1}-a")
-            else:
-                subject_row.append(f"{subject_letter}{j + 1}")
-            if i == 8 and j == 0:
-                a_toggle = False
-        FIRST_TABLE_DATA_INPUTS.append(subject_row)
-    FIRST_TABLE_HEADERS: Final[list[str]] = [
-        "p65-a",
-        "p1-a",
-        "p2-a",
-        "p3-a",
-        "p4-a",
-        "p5-a",
-    ]
-    # The order of the subjects is scrambled at the end in the form
-    # the list is in the proper order to match to form
-    FIRST_TABLE_SUBJECTS: Final[list[str]] = [
-        "m1-a",
-        "m2-a",
-        "m3-a",
-        "m4-a",
-        "m5-a",
-        "m6-a",
-        "m7-a",
-        "m8-a",
-        "m9",
-        "m12",
-        "m10",
-        "m11",
-    ]
-    FIRST_TABLE: pd.DataFrame = pd.DataFrame(
-        data=FIRST_TABLE_DATA_INPUTS,
-        columns=FIRST_TABLE_HEADERS,
-        index=FIRST_TABLE_SUBJECTS,
-    )
-    SECOND_TABLE_NUM_COLS: Final[int] = 6
-    SECOND_TABLE_NUM_SUBJECTS: Final[int] = 8
-    SECOND_TABLE_HEADERS: Final[list[str]] = [
-        "p1",
-        "p2",
-        "p3",
-        "p4",
-        "p5",
-        "p6",
-    ]
-    SECOND_TABLE_SUBJECTS: Final[list[str]] = [
-        "m1",
-        "m2",
-        "m3",
-        "m4",
-        "m5",
-        "m6",
-        "m7",
-        "m8",
-    ]
-    SECOND_TABLE_DATA_INPUTS: Final[list[list[str]]] = []
-    for i in range(SECOND_TABLE_NUM_SUBJECTS):
-        subject_row = []
-        subject_letter = string.ascii_lowercase[i]
-        for j in range(SECOND_TABLE_NUM_COLS):
-            if subject_letter == "g" and j == 0:
-                subject_row.append("f7")
-            else:
-                subject_row.append(f"{subject_letter}{j + 1}")
-        SECOND_TABLE_DATA_INPUTS.append(subject_row)
-    SECOND_TABLE: pd.DataFrame = pd.DataFrame(
-        data=SECOND_TABLE_DATA_INPUTS,
-        columns=SECOND_TABLE_HEADERS,
-        index=SECOND_TABLE_SUBJECTS,
+    # after i1 of table 1 in v6 of the form
+    suffix: str = "-a" if (i, j) <= (8, 0) else ""
+    return f"{string.ascii_lowercase[i]}{j + 1}{suffix}"
+
+
+# The order of the subjects is scrambled at the end in the form
+# the lists are in the proper order to match to form
+BEHAVIOR_FORM_V4: Final[FormLayout] = register_form_layout(
+    FormLayout(
+        form_id=BEHAVIOR_FORM_ID,
+        form_version=4,
+        metadata=BEHAVIOR_FORM_METADATA,
+        first_table_headers=["p6", "p1", "p2", "p3", "p4", "p5"],
+        first_table=table_inputs(
+            [f"m{n}" for n in [1, 2, 3, 4, 5, 6, 7, 8, 9, 12, 10, 11]],
+            6,
+            lambda i, j: f"{string.ascii_lowercase[i]}{j + 1}",
+        ),
+        second_table_headers=["p1", "p2", "p3", "p4", "p5", "p6"],
+        second_table=table_inputs(
+            [f"m{n}" for n in range(1, 9)], 6, _second_table_cell
+        ),
     )
-    FLAT_FIRST_TABLE: list[Any] = [
-        item
-        for sublist in FIRST_TABLE.reset_index().values  # type: ignore
-        for item in sublist
-    ]
-    FLAT_SECOND_TABLE: list[Any] = [
-        item
-        for sublist in SECOND_TABLE.reset_index().values  # type: ignore
-        for item in sublist
-    ]
-    METADATA_KEYS: list[str] = list(FORM_METADATA.keys())
-    INPUTS: list[str] = (
-        METADATA_KEYS
-        + FIRST_TABLE_HEADERS
-        + FLAT_FIRST_TABLE
-        + SECOND_TABLE_HEADERS
-        + FLAT_SECOND_TABLE
-        + ["notes"]
+)
+BEHAVIOR_FORM_V6: Final[FormLayout] = register_form_layout(
+    FormLayout(
+        form_id=BEHAVIOR_FORM_ID,
+        form_version=6,
+        metadata=BEHAVIOR_FORM_METADATA,
+        first_table_headers=["p65-a", "p1-a", "p2-a", "p3-a", "p4-a", "p5-a"],
+        first_table=table_inputs(
+            [f"m{n}-a" for n in range(1, 9)] + ["m9", "m12", "m10", "m11"],
+            6,
+            _v6_first_table_cell,
+        ),
+        second_table_headers=["p1", "p2", "p3", "p4", "p5", "p6"],
+        second_table=table_inputs(
+            [f"m{n}" for n in range(1, 9)], 6, _second_table_cell
+        ),
     )
+)
 
-    def _reconstruct_table(
-        self, form_values: list[Any], table_type: Literal["First", "Second"]
-    ) -> list[Any]:
-        if table_type == "First":
-            table_headers: list[str] = self.FIRST_TABLE_HEADERS
-            flat_table: list[Any] = self.FLAT_FIRST_TABLE
-            num_cols: int = self.FIRST_TABLE_NUM_COLS + 1
-        else:
-            table_headers = self.SECOND_TABLE_HEADERS
-            flat_table = self.FLAT_SECOND_TABLE
-            num_cols = self.SECOND_TABLE_NUM_COLS + 1
-        table_header_values: list[str] = form_values[: len(table_headers)]
-        del form_values[: len(table_headers)]
-        table_values: list[list[Any]] = form_values[: len(flat_table)]
-        del form_values[: len(flat_table)]
-        # chunk size is the number of metric columns plus the mouse column
-        chunk_size: int = num_cols
-        table_lists: list[list[Any]] = [
-            table_values[i : i + chunk_size]
-            for i in range(
-                0,
-                len(table_values),
-                chunk_size,
-            )
-        ]
-        table_columns: list[str] = ["Mouse"] + table_header_values
-        table: pd.DataFrame = pd.DataFrame(
-            data=table_lists, columns=table_columns
-        )
-        table.set_index("Mouse")  # type: ignore
-        if table_type == "First":
-            self.first_table = table
-        else:
-            self.second_table = table
-        return form_values
-
-    def __init__(self, forms: list[list[dict[str, Any]]]) -> None:
+
+class BehaviorForm:
+    """
+    A behavior form decoded with its FormLayout.
+
+    Attributes:
+        metadata: Metadata values by label
+        first_table: First table with a "Mouse" column
+        second_table: Second table with a "Mouse" column
+        notes: Form notes
+    """
+
+    LAYOUT: FormLayout
+    FORM_ID: int
+    FORM_VERSION: int
+    FORM_METADATA: dict[str, str]
+    INPUTS: list[str]
+
+    def __init__(
+        self,
+        forms: list[list[dict[str, Any]]],
+        layout: FormLayout | None = None,
+    ) -> None:
+        if layout is not None:
+            # a version without a subclass of its own
+            self.LAYOUT = layout
+            self.FORM_ID = layout.form_id
+            self.FORM_VERSION = layout.form_version
+            self.FORM_METADATA = layout.metadata
+            self.INPUTS = layout.inputs
         for form_pairs in forms:
-            # ensure that the form pairs are in the correct order
-            form_inputs: list[str] = [pair["name"] for pair in form_pairs]
-            form_values: list[Any] = [pair["value"] for pair in form_pairs]
-            if form_inputs != self.INPUTS:
-                raise ValueError("Form inputs do not match expected inputs!")
-            # parse metadata
-            metadata: dict[str, Any] = dict(
-                zip(
-                    self.FORM_METADATA.values(),
-                    form_values[: len(self.FORM_METADATA)],
-                )
-            )
-            del form_values[: len(self.FORM_METADATA)]
-            self.metadata = metadata
-            form_values = self._reconstruct_table(form_values, "First")
-            form_values = self._reconstruct_table(form_values, "Second")
-            self.notes = form_values[0]
+            (
+                self.metadata,
+                self.first_table,
+                self.second_table,
+                self.notes,
+            ) = self.LAYOUT.decode(form_pairs)
 
 
-def parse_behavior_widget(
-    response: Response | Path,
-) -> tuple[list[dict[str, Any]], list[list[dict[str, Any]]]]:
-    if isinstance(response, Path):
-        tree: ET.ElementTree = ET.parse(response)
-    else:
-        tree = ET.parse(BytesIO(response.content))
-    root: ET.Element = tree.getroot()
-    # make sure the get entries for page method yielded entries
-    total_returned: ET.Element | None = root.find("results/total-returned")
-    if isinstance(total_returned, ET.Element):
-        total_returned_text: str | None = total_returned.text
-        if total_returned_text == "0":
-            raise EmptyResults(
-                "No entries found in get_entries_for_page response!"
-            )
-    entries: ET.Element | None = root.find("entries")
-    if entries is None:
-        raise ValueError("No entries found in response!")
-    # entry-data tag is also in response element, so need to
-    # limit search to children of entries
-    entry_data: list[ET.Element] = entries.findall(".//entry-data")
-    forms: list[list[dict[str, Any]]] = []
-    forms_metadata: list[dict[str, Any]] = []
-    for entry in entry_data:
-        entry_text: str | None = entry.text
+class BehaviorFormV4(BehaviorForm):
+    LAYOUT = BEHAVIOR_FORM_V4
+    FORM_ID = LAYOUT.form_id
+    FORM_VERSION = LAYOUT.form_version
+    FORM_METADATA = LAYOUT.metadata
+    INPUTS = LAYOUT.inputs
+
+
+class BehaviorFormV6(BehaviorForm):
+    LAYOUT = BEHAVIOR_FORM_V6
+    FORM_ID = LAYOUT.form_id
+    FORM_VERSION = LAYOUT.form_version
+    FORM_METADATA = LAYOUT.metadata
+    INPUTS = LAYOUT.inputs
+
+
+# decoders kept for the form versions that predate the layout registry
+_FORM_CLASSES: dict[tuple[int, int], type[BehaviorForm]] = {
+    BEHAVIOR_FORM_V4.key: BehaviorFormV4,
+    BEHAVIOR_FORM_V6.key: BehaviorFormV6,
+}
+
+
+def iter_behavior_forms(
+    response: Response | Path | bytes,
+    skip_other_entries: bool = False,
+) -> Iterator[tuple[dict[str, Any], list[dict[str, Any]]]]:
+    """
+    Stream the behavior forms of a get_entries_for_page response.
+
+    Entries are parsed one at a time from the response (see
+    iter_page_entries), so only the entry being decoded is held in memory.
+    Request the page with ``stream=True`` to avoid buffering the body.
+
+    Args:
+        response: The get_entries_for_page response, a saved response
+            file or the response body
+        skip_other_entries: Skip entries that are not behavior forms, e.g.
+            text entries and other widgets, instead of raising
+
+    Yields:
+        tuple[dict[str, Any], list[dict[str, Any]]]: The form metadata
+        (form_id, form_version and the entry's eid) and the form
+        name/value pairs
+
+    Raises:
+        EmptyResults: If the response has no entries
+        ValueError: If an entry is not a behavior form and
+        skip_other_entries is False
+    """
+    for entry in iter_page_entries(response):
+        entry_text: str | None = entry.findtext("entry-data")
         if isinstance(entry_text, str):
             try:
-                entry_dict: dict[str, Any] = json.loads(entry_text)
+                try:
+                    entry_dict: Any = json.loads(entry_text)
+                except JSONDecodeError:
+                    entry_dict = json.loads(entry_text.replace("\n", ""))
             except JSONDecodeError:
-                entry_dict = json.loads(entry_text.replace("\n", ""))
-            if entry_dict["form_id"] == 20058:
+                if skip_other_entries:
+                    continue
+                raise
+            if (
+                isinstance(entry_dict, dict)
+                and entry_dict.get("form_id") == BEHAVIOR_FORM_ID
+            ):
                 form_metadata: dict[str, Any] = {
                     "form_id": entry_dict["form_id"],
                     "form_version": entry_dict["form_version"],
+                    "eid": entry.findtext("eid"),
                 }
                 form_data: list[dict[str, Any]] = json.loads(
                     entry_dict["form_data"]
                 )
-                forms_metadata.append(form_metadata)
-                forms.append(form_data)
-            else:
+                yield form_metadata, form_data
+            elif not skip_other_entries:
                 raise ValueError("Form ID not 20058, not behavior form!")
+
+
+def parse_behavior_widget(
+    response: Response | Path | bytes,
+    skip_other_entries: bool = False,
+) -> tuple[list[dict[str, Any]], list[list[dict[str, Any]]]]:
+    forms: list[list[dict[str, Any]]] = []
+    forms_metadata: list[dict[str, Any]] = []
+    for form_metadata, form_data in iter_behavior_forms(
+        response, skip_other_entries
+    ):
+        forms_metadata.append(form_metadata)
+        forms.append(form_data)
     return forms_metadata, forms
 
 
 def recontruct_behavior_form(
     forms_metadata: list[dict[str, Any]], forms: list[list[dict[str, Any]]]
-) -> BehaviorFormV4 | BehaviorFormV6:
+) -> BehaviorForm:
     if len(forms_metadata) > 1:
         raise ValueError("More than one form found in response!")
-    if forms_metadata[0]["form_version"] == 4:
-        behavior_version: BehaviorFormV4 | BehaviorFormV6 = BehaviorFormV4(
-            forms
+    key: tuple[int, int] = (
+        forms_metadata[0]["form_id"],
+        forms_metadata[0]["form_version"],
+    )
+    layout: FormLayout = get_form_layout(*key)
+    return _FORM_CLASSES.get(key, BehaviorForm)(forms, layout)
+
+
+class BehaviorFormBatch:
+    """
+    Many behavior forms decoded into long-format DataFrames.
+
+    Every frame has a "form_key" column identifying the form: the entry
+    eid when known, otherwise a hash of the form's layout and values (see
+    _content_key), so the same form gets the same key in every run.
+
+    Attributes:
+        metadata: One row per form with the metadata labels as columns,
+            plus "form_id", "form_version" and "Notes"
+        first_table: One row per (form, subject, column) of the first
+            table with "row", "Mouse", "column" and "value" columns
+        second_table: Same as first_table for the second table
+    """
+
+    def __init__(
+        self,
+        metadata: "pd.DataFrame",
+        first_table: "pd.DataFrame",
+        second_table: "pd.DataFrame",
+    ) -> None:
+        self.metadata = metadata
+        self.first_table = first_table
+        self.second_table = second_table
+
+    def __len__(self) -> int:
+        return len(self.metadata)
+
+
+def _content_key(
+    layout_key: tuple[int, int], values: "NDArray[Any]", seen: dict[str, int]
+) -> str:
+    digest: str = hashlib.sha256(
+        json.dumps([*layout_key, values.tolist()], default=str).encode()
+    ).hexdigest()
+    # identical forms of one batch are numbered to keep their keys unique
+    count: int = seen.get(digest, 0)
+    seen[digest] = count + 1
+    return f"sha256:{digest}" if count == 0 else f"sha256:{digest}:{count}"
+
+
+def _long_table(
+    form_keys: "NDArray[Any]",
+    values: "NDArray[Any]",
+    headers_index: "NDArray[np.intp]",
+    table_index: "NDArray[np.intp]",
+) -> "pd.DataFrame":
+    import numpy as np
+    import pandas as pd
+
+    # cells has shape (forms, rows, 1 + columns), the first column of
+    # every row is the subject
+    cells: NDArray[Any] = values[:, table_index]
+    num_forms, num_rows, num_cols = cells.shape
+    num_cols -= 1
+    shape: tuple[int, int, int] = (num_forms, num_rows, num_cols)
+    return pd.DataFrame(
+        {
+            "form_key": np.broadcast_to(
+                form_keys[:, None, None], shape
+            ).ravel(),
+            "row": np.broadcast_to(
+                np.arange(num_rows)[None, :, None], shape
+            ).ravel(),
+            "Mouse": np.broadcast_to(cells[:, :, :1], shape).ravel(),
+            "column": np.broadcast_to(
+                values[:, headers_index][:, None, :], shape
+            ).ravel(),
+            "value": cells[:, :, 1:].ravel(),
+        }
+    )
+
+
+def decode_behavior_forms(
+    results: list[
+        tuple[list[dict[str, Any]], list[list[dict[str, Any]]]]
+    ],
+) -> BehaviorFormBatch:
+    """
+    Decode the forms of one or more parse_behavior_widget results at once.
+
+    Forms are grouped by layout and each group is decoded with one gather
+    into a (forms x inputs) value array, so the frames are built once per
+    layout rather than once per form.
+
+    Args:
+        results: (forms_metadata, forms) tuples from parse_behavior_widget
+
+    Returns:
+        BehaviorFormBatch: The metadata, first table and second table of
+        every form
+
+    Raises:
+        ValueError: If a form version is not known or its inputs do not
+        match its layout
+    """
+    import numpy as np
+    import pandas as pd
+
+    groups: dict[tuple[int, int], tuple[list[Any], list[NDArray[Any]]]] = {}
+    content_keys: dict[str, int] = {}
+    for forms_metadata, forms in results:
+        for form_metadata, form_pairs in zip(forms_metadata, forms):
+            key: tuple[int, int] = (
+                form_metadata["form_id"],
+                form_metadata["form_version"],
+            )
+            layout: FormLayout = get_form_layout(*key)
+            form_keys, form_values = groups.setdefault(key, ([], []))
+            form_row: NDArray[Any] = layout.form_values(form_pairs)
+            eid: Any = form_metadata.get("eid")
+            form_keys.append(
+                eid
+                if eid is not None
+                else _content_key(key, form_row, content_keys)
+            )
+            form_values.append(form_row)
+    metadata_frames: list[pd.DataFrame] = []
+    first_frames: list[pd.DataFrame] = []
+    second_frames: list[pd.DataFrame] = []
+    for key, (form_keys, form_values) in groups.items():
+        layout = FORM_LAYOUTS[key]
+        keys: NDArray[Any] = np.empty(len(form_keys), dtype=object)
+        keys[:] = form_keys
+        values: NDArray[Any] = np.stack(form_values)
+        metadata: pd.DataFrame = pd.DataFrame(
+            values[:, layout.metadata_index], columns=layout.metadata_labels
+        )
+        metadata.insert(0, "form_key", keys)
+        metadata.insert(1, "form_id", layout.form_id)
+        metadata.insert(2, "form_version", layout.form_version)
+        metadata["Notes"] = values[:, layout.notes_index]
+        metadata_frames.append(metadata)
+        first_frames.append(
+            _long_table(
+                keys,
+                values,
+                layout.first_headers_index,
+                layout.first_table_index,
+            )
         )
-    elif forms_metadata[0]["form_version"] == 6:
-        behavior_version = BehaviorFormV6(forms)
-    else:
-        raise ValueError("Form version not known!")
-    return behavior_version
+        second_frames.append(
+            _long_table(
+                keys,
+                values,
+                layout.second_headers_index,
+                layout.second_table_index,
+            )
+        )
+    if not groups:
+        raise EmptyResults("No forms to decode!")
+    return BehaviorFormBatch(
+        pd.concat(metadata_frames, ignore_index=True),
+        pd.concat(first_frames, ignore_index=True),
+        pd.concat(second_frames, ignore_index=True),
+    )
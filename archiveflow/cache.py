@@ -0,0 +1,158 @@
+import sqlite3
+import threading
+import time
+from pathlib import Path
+from typing import Union
+
+DEFAULT_CACHE_PATH: Path = (
+    Path.home() / ".cache" / "archiveflow" / "tree_levels.sqlite"
+)
+DEFAULT_TTL: float = 15 * 60
+DEFAULT_MAX_ENTRIES: int = 10_000
+
+
+class TreeLevelCache:
+    """
+    Persistent cache of get_tree_level response bodies keyed by
+    (uid, nbid, parent_tree_id).
+
+    Entries expire ttl seconds after they are stored, and the least
+    recently used entries are evicted once more than max_entries are held.
+    The cache is a single SQLite file, so it survives app reloads and can
+    be shared by several processes.
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str] = DEFAULT_CACHE_PATH,
+        ttl: float = DEFAULT_TTL,
+        max_entries: int = DEFAULT_MAX_ENTRIES,
+    ) -> None:
+        """
+        Args:
+            path: SQLite file to store the cache in, ":memory:" keeps the
+                cache in memory only
+            ttl: Seconds a response stays fresh
+            max_entries: Maximum number of responses kept
+        """
+        if str(path) != ":memory:":
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS tree_levels ("
+            " uid TEXT NOT NULL,"
+            " nbid TEXT NOT NULL,"
+            " parent_tree_id TEXT NOT NULL,"
+            " content BLOB NOT NULL,"
+            " stored_at REAL NOT NULL,"
+            " accessed_at REAL NOT NULL,"
+            " PRIMARY KEY (uid, nbid, parent_tree_id))"
+        )
+        self._conn.execute(
+            "CREATE INDEX IF NOT EXISTS tree_levels_accessed_at"
+            " ON tree_levels (accessed_at)"
+        )
+
+    def get(
+        self, uid: str, nbid: str, parent_tree_id: str
+    ) -> Union[bytes, None]:
+        """
+        Return the cached response body, or None if it is missing or stale.
+        """
+        now: float = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT content, stored_at FROM tree_levels"
+                " WHERE uid = ? AND nbid = ? AND parent_tree_id = ?",
+                (uid, nbid, parent_tree_id),
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            content, stored_at = row
+            if now - stored_at > self.ttl:
+                self._conn.execute(
+                    "DELETE FROM tree_levels"
+                    " WHERE uid = ? AND nbid = ? AND parent_tree_id = ?",
+                    (uid, nbid, parent_tree_id),
+                )
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE tree_levels SET accessed_at = ?"
+                " WHERE uid = ? AND nbid = ? AND parent_tree_id = ?",
+                (now, uid, nbid, parent_tree_id),
+            )
+            self.hits += 1
+            return content
+
+    def put(
+        self, uid: str, nbid: str, parent_tree_id: str, content: bytes
+    ) -> None:
+        """
+        Store a response body, evicting the least recently used entries
+        if the cache is full.
+        """
+        now: float = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO tree_levels"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (uid, nbid, parent_tree_id, content, now, now),
+            )
+            self._conn.execute(
+                "DELETE FROM tree_levels WHERE rowid IN ("
+                " SELECT rowid FROM tree_levels"
+                " ORDER BY accessed_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            )
+
+    def invalidate(
+        self,
+        uid: str,
+        nbid: str,
+        parent_tree_id: Union[str, None] = None,
+    ) -> None:
+        """
+        Drop one cached level, or every level of a notebook if
+        parent_tree_id is None.
+        """
+        with self._lock:
+            if parent_tree_id is None:
+                self._conn.execute(
+                    "DELETE FROM tree_levels WHERE uid = ? AND nbid = ?",
+                    (uid, nbid),
+                )
+            else:
+                self._conn.execute(
+                    "DELETE FROM tree_levels"
+                    " WHERE uid = ? AND nbid = ? AND parent_tree_id = ?",
+                    (uid, nbid, parent_tree_id),
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._conn.execute("DELETE FROM tree_levels")
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM tree_levels"
+            ).fetchone()[0]
+
+    def stats(self) -> dict[str, int]:
+        return {"hits": self.hits, "misses": self.misses, "size": len(self)}
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
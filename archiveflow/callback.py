@@ -0,0 +1,55 @@
+import threading
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from typing import Union
+
+
+class CallbackHandler(BaseHTTPRequestHandler):
+    callback_responses: list[str] = []
+
+    @classmethod
+    def clear_responses(cls):
+        cls.callback_responses = []
+
+    def do_GET(self):
+        # Store the callback response
+        CallbackHandler.callback_responses.append(self.path)
+        # Send a nice HTML response that explicitly
+        # tells the user to close the window
+        self.send_response(200)
+        self.send_header("Content-type", "text/html")
+        self.end_headers()
+        html = """
+        <html>
+            <body style="
+                text-align: center;
+                font-family: Arial, sans-serif;
+                padding-top: 50px;
+            ">
+                <h2>Authentication Complete!</h2>
+                <p>Please close this window now. Do not refresh this page.</p>
+                <script>
+                    // Prevent back/forward navigation
+                    window.history.pushState(null, '', window.location.href);
+                    window.onpopstate = function () {
+                        window.history.pushState(
+                            null, '', window.location.href
+                        );
+                    };
+                </script>
+            </body>
+        </html>
+        """
+        self.wfile.write(html.encode())
+
+    def log_message(
+        self, format: str, *args: Union[str, tuple[str, ...]]
+    ) -> None:
+        pass
+
+
+def start_callback_server(port: int = 8000) -> HTTPServer:
+    server = HTTPServer(("localhost", port), CallbackHandler)
+    thread = threading.Thread(target=server.serve_forever)
+    thread.daemon = True
+    thread.start()
+    return server
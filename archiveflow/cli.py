@@ -0,0 +1,411 @@
+import argparse
+import json
+import logging
+import os
+import sys
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Union
+from xml.etree import ElementTree as ET
+
+from requests import RequestException
+
+from .api import DEFAULT_CRAWL_WORKERS, LAClient, configure_logging
+from .cache import TreeLevelCache
+from .dedup import DedupIndex
+from .index import NotebookIndex
+from .pipeline import PageForms, harvest_behavior_forms
+from .scheduler import RequestScheduler
+from .tree import TreeNode
+
+logger = logging.getLogger(__name__)
+
+# environment variables holding the LabArchives login for headless runs
+EMAIL_ENV: str = "archiveflow_email"
+AUTH_CODE_ENV: str = "archiveflow_auth_code"
+
+Command = Callable[[argparse.Namespace, LAClient], dict[str, Any]]
+# failures of one experiment, page or command that go into the report
+# instead of ending the run with a traceback
+REPORTED_ERRORS: tuple[type[BaseException], ...] = (
+    ValueError,
+    Warning,
+    OSError,
+    RequestException,
+    ET.ParseError,
+)
+
+
+def _notebook_id(client: LAClient, notebook: str) -> str:
+    """
+    Notebook ID of a notebook given by name or ID.
+
+    Raises:
+        ValueError: If the user has no such notebook
+    """
+    for entry in client.ua_info["notebooks"]:
+        if notebook in (entry["id"], entry["name"]):
+            return entry["id"]
+    raise ValueError(f"Notebook not found: {notebook}")
+
+
+def _load_index(
+    args: argparse.Namespace, client: LAClient, nbid: str
+) -> NotebookIndex:
+    # a saved index of the same notebook saves the crawl
+    if args.index is not None and args.index.exists():
+        index: NotebookIndex = NotebookIndex.load(args.index)
+        if index.nbid == nbid:
+            return index
+    return NotebookIndex.build(client, nbid, max_workers=args.workers)
+
+
+def crawl(args: argparse.Namespace, client: LAClient) -> dict[str, Any]:
+    nbid: str = _notebook_id(client, args.notebook)
+    index: NotebookIndex = NotebookIndex.build(
+        client, nbid, args.tree_id, max_workers=args.workers
+    )
+    index.save(args.output)
+    return {
+        "nbid": nbid,
+        "nodes": len(index),
+        "pages": len(index.pages),
+        "output": str(args.output),
+    }
+
+
+def _materialize_experiment(
+    args: argparse.Namespace,
+    client: LAClient,
+    nbid: str,
+    experiment: TreeNode,
+) -> dict[str, Any]:
+    from .structure import TejedaExperiment
+
+    result: dict[str, Any] = {"experiment": experiment.full_path}
+    try:
+        plan = TejedaExperiment(
+            args.root / experiment.display_text,
+            client,
+            nbid,
+            experiment,
+            args.method,
+            max_workers=args.workers,
+        ).plan()
+        result.update(plan.summary())
+        if args.dry_run:
+            result["report"] = plan.report().splitlines()
+        else:
+            plan.apply()
+    except REPORTED_ERRORS as e:
+        result["error"] = f"{type(e).__name__}: {e}"
+    return result
+
+
+def materialize(
+    args: argparse.Namespace, client: LAClient
+) -> dict[str, Any]:
+    nbid: str = _notebook_id(client, args.notebook)
+    index: NotebookIndex = _load_index(args, client, nbid)
+    matches: dict[str, TreeNode] = {
+        node.tree_id: node
+        for pattern in args.experiment
+        for node in index.glob(pattern, is_page=False)
+    }
+    # "*" also matches "/", the data directories below an experiment match
+    # as well and are skipped
+    experiments: list[TreeNode] = [
+        node
+        for node in matches.values()
+        if not any(
+            parent.tree_id in matches for parent in index.ancestors(node)
+        )
+    ]
+    if not experiments:
+        raise ValueError(f"No experiment folder matches {args.experiment}")
+    with ThreadPoolExecutor(max_workers=args.workers) as executor:
+        results: list[dict[str, Any]] = list(
+            executor.map(
+                lambda experiment: _materialize_experiment(
+                    args, client, nbid, experiment
+                ),
+                experiments,
+            )
+        )
+    return {
+        "nbid": nbid,
+        "dry_run": args.dry_run,
+        "failed": sum("error" in result for result in results),
+        "experiments": results,
+    }
+
+
+def harvest(args: argparse.Namespace, client: LAClient) -> dict[str, Any]:
+    nbid: str = _notebook_id(client, args.notebook)
+    index: NotebookIndex = _load_index(args, client, nbid)
+    pages: list[TreeNode] = [
+        page
+        for page in index.pages
+        if args.path is None
+        or page.full_path == args.path
+        or page.full_path.startswith(args.path.rstrip("/") + "/")
+    ]
+    results = harvest_behavior_forms(
+        client,
+        nbid,
+        pages=pages,
+        fetch_workers=args.workers,
+        decode_workers=args.decode_workers,
+    )
+    errors: dict[str, str] = {}
+
+    def record_errors(results: Iterable[PageForms]) -> Iterator[PageForms]:
+        for result in results:
+            if result.error is not None:
+                errors[result.full_path] = result.error
+            yield result
+
+    if args.output is not None:
+        from .export import export_harvest
+
+        forms: int = export_harvest(record_errors(results), args.output)
+    else:
+        forms = sum(
+            len(result.batch)
+            for result in record_errors(results)
+            if result.batch is not None
+        )
+    return {
+        "nbid": nbid,
+        "pages": len(pages),
+        "forms": forms,
+        "errors": errors,
+    }
+
+
+def upload(args: argparse.Namespace, client: LAClient) -> dict[str, Any]:
+    from .upload import BulkUploader, UploadJob, directory_jobs
+
+    nbid: str = _notebook_id(client, args.notebook)
+    pid: str
+    if args.pid is not None:
+        pid = args.pid
+    else:
+        page: Union[TreeNode, None] = _load_index(
+            args, client, nbid
+        ).find_path(args.page)
+        if page is None or not page.is_page:
+            raise ValueError(f"Page not found: {args.page}")
+        pid = page.tree_id
+    jobs: list[UploadJob] = []
+    for path in args.paths:
+        if path.is_dir():
+            jobs.extend(directory_jobs(path, nbid, pid, args.pattern))
+        else:
+            jobs.append(UploadJob(path, nbid, pid))
+    report = BulkUploader(
+        client, journal=args.journal, max_workers=args.workers
+    ).upload(jobs)
+    return {
+        "nbid": nbid,
+        "pid": pid,
+        **report.summary(),
+        "failed_paths": {
+            str(result.job.path): result.error for result in report.failed
+        },
+    }
+
+
+def build_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog="archiveflow",
+        description="Headless LabArchives crawls, directory builds,"
+        + " harvests and uploads. Prints a JSON report to stdout.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=DEFAULT_CRAWL_WORKERS,
+        help="concurrent requests, uploads and experiments,"
+        + " and the cap on requests in flight"
+        + " (default: %(default)s)",
+    )
+    parser.add_argument(
+        "--rate",
+        type=float,
+        default=None,
+        help="maximum requests per second of each API method,"
+        + " unlimited by default",
+    )
+    parser.add_argument("--api-url", default=None, help="defaults to config")
+    parser.add_argument(
+        "--email",
+        default=os.getenv(EMAIL_ENV),
+        help=f"LabArchives login email (default: ${EMAIL_ENV})",
+    )
+    parser.add_argument(
+        "--auth-code",
+        default=os.getenv(AUTH_CODE_ENV),
+        help="LabArchives password token"
+        + f" (default: ${AUTH_CODE_ENV}), opens a browser login if unset",
+    )
+    parser.add_argument(
+        "--cache", type=Path, default=None, help="tree level cache file"
+    )
+    parser.add_argument(
+        "--index",
+        type=Path,
+        default=None,
+        help="notebook index saved by crawl, used instead of crawling",
+    )
+    parser.add_argument(
+        "--report",
+        type=Path,
+        default=None,
+        help="write the JSON report to a file instead of stdout",
+    )
+    parser.add_argument("--log-level", default="INFO")
+    parser.add_argument("--log-file", type=Path, default=None)
+    subparsers = parser.add_subparsers(dest="command", required=True)
+
+    crawl_parser = subparsers.add_parser(
+        "crawl", help="crawl a notebook into an index file"
+    )
+    crawl_parser.add_argument("notebook", help="notebook name or ID")
+    crawl_parser.add_argument("output", type=Path, help="index file")
+    crawl_parser.add_argument("--tree-id", default="0")
+    crawl_parser.set_defaults(func=crawl)
+
+    materialize_parser = subparsers.add_parser(
+        "materialize", help="build local experiment directories"
+    )
+    materialize_parser.add_argument("notebook", help="notebook name or ID")
+    materialize_parser.add_argument(
+        "root", type=Path, help="local directory holding the experiments"
+    )
+    materialize_parser.add_argument(
+        "--experiment",
+        action="append",
+        required=True,
+        help="full path or glob pattern of experiment folders, repeatable",
+    )
+    materialize_parser.add_argument(
+        "--method", choices=["Existing", "All"], default="Existing"
+    )
+    materialize_parser.add_argument(
+        "--dry-run",
+        action="store_true",
+        help="report the operations without changing anything",
+    )
+    materialize_parser.set_defaults(func=materialize)
+
+    harvest_parser = subparsers.add_parser(
+        "harvest", help="harvest the behavior forms of a notebook"
+    )
+    harvest_parser.add_argument("notebook", help="notebook name or ID")
+    harvest_parser.add_argument(
+        "--path", default=None, help="only harvest the pages below path"
+    )
+    harvest_parser.add_argument(
+        "--output",
+        type=Path,
+        default=None,
+        help="write the forms to a Parquet dataset (needs pyarrow)",
+    )
+    harvest_parser.add_argument(
+        "--decode-workers",
+        type=int,
+        default=None,
+        help="decode processes (default: CPU count), 0 decodes inline",
+    )
+    harvest_parser.set_defaults(func=harvest)
+
+    upload_parser = subparsers.add_parser(
+        "upload", help="upload files as attachments to a page"
+    )
+    upload_parser.add_argument("notebook", help="notebook name or ID")
+    upload_parser.add_argument(
+        "paths", type=Path, nargs="+", help="files or directories"
+    )
+    page_group = upload_parser.add_mutually_exclusive_group(required=True)
+    page_group.add_argument("--page", help="full path of the page")
+    page_group.add_argument("--pid", help="tree ID of the page")
+    upload_parser.add_argument(
+        "--pattern", default="*", help="files of directories to upload"
+    )
+    upload_parser.add_argument(
+        "--journal", type=Path, default=None, help="upload journal file"
+    )
+    upload_parser.add_argument(
+        "--dedup", type=Path, default=None, help="dedup index file"
+    )
+    upload_parser.set_defaults(func=upload)
+    return parser
+
+
+def build_client(args: argparse.Namespace) -> LAClient:
+    """
+    Logged-in client for the global options of args.
+    """
+    client: LAClient = LAClient(
+        api_url=args.api_url,
+        pool_connections=args.workers,
+        pool_maxsize=args.workers,
+        cache=TreeLevelCache(args.cache) if args.cache is not None else None,
+        # workers caps the requests in flight across all thread pools
+        scheduler=RequestScheduler(
+            default_rate=args.rate, max_concurrency=args.workers
+        ),
+        dedup=(
+            DedupIndex(args.dedup)
+            if getattr(args, "dedup", None) is not None
+            else None
+        ),
+    )
+    if args.email is not None and args.auth_code is not None:
+        client.login(auth_code=args.auth_code, email=args.email)
+    else:
+        client.login()
+    return client
+
+
+def main(argv: Union[list[str], None] = None) -> int:
+    """
+    Run one command and print its JSON report.
+
+    Returns:
+        int: Exit status, 1 if the command failed or any item of it did
+    """
+    args: argparse.Namespace = build_parser().parse_args(argv)
+    configure_logging(level=args.log_level.upper(), log_file=args.log_file)
+    start: float = time.perf_counter()
+    report: dict[str, Any] = {"command": args.command}
+    client: Union[LAClient, None] = None
+    try:
+        client = build_client(args)
+        command: Command = args.func
+        report["result"] = command(args, client)
+        failed: bool = bool(
+            report["result"].get("failed") or report["result"].get("errors")
+        )
+        report["status"] = "failed" if failed else "ok"
+    except REPORTED_ERRORS as e:
+        logger.error(str(e))
+        report["status"] = "error"
+        report["error"] = str(e)
+    finally:
+        report["seconds"] = time.perf_counter() - start
+        if client is not None:
+            report["metrics"] = client.metrics.snapshot()
+            client.close()
+    output: str = json.dumps(report, indent=2, default=str)
+    if args.report is not None:
+        args.report.write_text(output + "\n")
+    else:
+        print(output)
+    return 0 if report["status"] == "ok" else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
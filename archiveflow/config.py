@@ -1,10 +1,32 @@
 import os
-from typing import Union
+from typing import Any, Union
 
-from dotenv import load_dotenv
+CONFIG_FIELDS: tuple[str, ...] = (
+    "api_url",
+    "access_key_id",
+    "access_password",
+    "ssl_cer",
+    "app_host",
+    "tree_cache",
+)
 
 
 class Config:
+    """
+    Settings read from the environment and a .env file.
+
+    Nothing is read when the module is imported: the .env file is loaded
+    the first time a setting is accessed. A setting missing from the
+    environment falls back to the value passed here.
+    """
+
+    api_url: Union[str, None]
+    access_key_id: Union[str, None]
+    access_password: Union[str, None]
+    ssl_cer: Union[str, None]
+    app_host: Union[str, None]
+    tree_cache: Union[str, None]
+
     def __init__(
         self,
         api_url: Union[str, None],
@@ -12,13 +34,36 @@ class Config:
         access_password: Union[str, None],
         ssl_cer: Union[str, None],
         app_host: Union[str, None],
+        tree_cache: Union[str, None],
     ):
+        self._defaults: dict[str, Union[str, None]] = {
+            "api_url": api_url,
+            "access_key_id": access_key_id,
+            "access_password": access_password,
+            "ssl_cer": ssl_cer,
+            "app_host": app_host,
+            "tree_cache": tree_cache,
+        }
+
+    def load(self) -> None:
+        """
+        Read the .env file and the environment, replacing any setting
+        already loaded.
+        """
+        from dotenv import load_dotenv
+
         load_dotenv()
-        self.api_url: Union[str, None] = os.getenv("api_url")
-        self.access_key_id: Union[str, None] = os.getenv("access_key_id")
-        self.access_password: Union[str, None] = os.getenv("access_password")
-        self.ssl_cer: Union[str, None] = os.getenv("ssl_cer")
-        self.app_host: Union[str, None] = os.getenv("app_host")
+        for name in CONFIG_FIELDS:
+            setattr(self, name, os.getenv(name, self._defaults[name]))
+
+    def __getattr__(self, name: str) -> Any:
+        # only called for settings that were not loaded yet
+        if name in CONFIG_FIELDS:
+            self.load()
+            return self.__dict__[name]
+        raise AttributeError(
+            f"'{type(self).__name__}' object has no attribute '{name}'"
+        )
 
 
 config: Config = Config(
@@ -27,4 +72,5 @@ config: Config = Config(
     access_password=None,
     ssl_cer=None,
     app_host=None,
+    tree_cache=None,
 )
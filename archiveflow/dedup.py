@@ -0,0 +1,172 @@
+import hashlib
+import sqlite3
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Iterable, Union
+
+DEFAULT_DEDUP_PATH: Path = (
+    Path.home() / ".cache" / "archiveflow" / "dedup.sqlite"
+)
+DEFAULT_HASH_WORKERS: int = 4
+HASH_ALGORITHM: str = "sha256"
+
+
+def hash_file(path: Union[Path, str]) -> str:
+    """
+    Hex digest of a file's content, read in chunks so memory use does not
+    depend on the file size.
+    """
+    with open(path, "rb") as f:
+        return hashlib.file_digest(f, HASH_ALGORITHM).hexdigest()
+
+
+class DedupIndex:
+    """
+    Local index of uploaded attachments keyed by content hash.
+
+    Each upload is recorded by the content hash and size of the file and
+    the page it was attached to. The hash of every file seen is kept with
+    the file's size and mtime, so an unchanged file is recognized without
+    reading it again. The index is a single SQLite file shared by every
+    process uploading from this machine.
+    """
+
+    def __init__(self, path: Union[Path, str] = DEFAULT_DEDUP_PATH) -> None:
+        """
+        Args:
+            path: SQLite file to store the index in, ":memory:" keeps the
+                index in memory only
+        """
+        if str(path) != ":memory:":
+            path = Path(path)
+            path.parent.mkdir(parents=True, exist_ok=True)
+        self.path = path
+        self.hashed: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._conn: sqlite3.Connection = sqlite3.connect(
+            str(path), check_same_thread=False, isolation_level=None
+        )
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS file_hashes ("
+            " path TEXT PRIMARY KEY,"
+            " size INTEGER NOT NULL,"
+            " mtime_ns INTEGER NOT NULL,"
+            " digest TEXT NOT NULL)"
+        )
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS uploads ("
+            " digest TEXT NOT NULL,"
+            " size INTEGER NOT NULL,"
+            " nbid TEXT NOT NULL,"
+            " pid TEXT NOT NULL,"
+            " eid TEXT,"
+            " uploaded_at REAL NOT NULL,"
+            " PRIMARY KEY (digest, size, nbid, pid))"
+        )
+
+    def file_hash(self, path: Union[Path, str]) -> tuple[str, int]:
+        """
+        Content hash and size of a file, only read from disk if the file
+        is new or its size or mtime changed since it was last hashed.
+        """
+        path = Path(path).resolve()
+        stat = path.stat()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT digest FROM file_hashes"
+                " WHERE path = ? AND size = ? AND mtime_ns = ?",
+                (str(path), stat.st_size, stat.st_mtime_ns),
+            ).fetchone()
+        if row is not None:
+            return row[0], stat.st_size
+        digest: str = hash_file(path)
+        with self._lock:
+            self.hashed += 1
+            self._conn.execute(
+                "INSERT OR REPLACE INTO file_hashes VALUES (?, ?, ?, ?)",
+                (str(path), stat.st_size, stat.st_mtime_ns, digest),
+            )
+        return digest, stat.st_size
+
+    def hash_files(
+        self,
+        paths: Iterable[Union[Path, str]],
+        max_workers: int = DEFAULT_HASH_WORKERS,
+    ) -> dict[Path, tuple[str, int]]:
+        """
+        Hash many files concurrently. hashlib releases the GIL while
+        hashing, so large files are hashed in parallel.
+
+        Returns:
+            dict[Path, tuple[str, int]]: Content hash and size by path
+        """
+        resolved: list[Path] = [Path(path) for path in paths]
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            return dict(
+                zip(resolved, executor.map(self.file_hash, resolved))
+            )
+
+    def lookup(
+        self, path: Union[Path, str], nbid: str, pid: str
+    ) -> Union[tuple[str, Union[str, None]], None]:
+        """
+        Find an earlier upload of the file's content to a page.
+
+        Returns:
+            tuple | None: (content hash, entry id of the attachment) if the
+            content was already attached to the page, None otherwise
+        """
+        digest, size = self.file_hash(path)
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT eid FROM uploads"
+                " WHERE digest = ? AND size = ? AND nbid = ? AND pid = ?",
+                (digest, size, nbid, pid),
+            ).fetchone()
+        return (digest, row[0]) if row is not None else None
+
+    def record(
+        self,
+        path: Union[Path, str],
+        nbid: str,
+        pid: str,
+        eid: Union[str, None],
+    ) -> None:
+        """
+        Record that the file's content was attached to a page.
+        """
+        digest, size = self.file_hash(path)
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO uploads VALUES (?, ?, ?, ?, ?, ?)",
+                (digest, size, nbid, pid, eid, time.time()),
+            )
+
+    def forget(self, nbid: str, pid: Union[str, None] = None) -> None:
+        """
+        Drop the uploads recorded for a page, or for every page of a
+        notebook if pid is None, e.g. after attachments were deleted.
+        """
+        with self._lock:
+            if pid is None:
+                self._conn.execute(
+                    "DELETE FROM uploads WHERE nbid = ?", (nbid,)
+                )
+            else:
+                self._conn.execute(
+                    "DELETE FROM uploads WHERE nbid = ? AND pid = ?",
+                    (nbid, pid),
+                )
+
+    def __len__(self) -> int:
+        with self._lock:
+            return self._conn.execute(
+                "SELECT COUNT(*) FROM uploads"
+            ).fetchone()[0]
+
+    def close(self) -> None:
+        with self._lock:
+            self._conn.close()
@@ -0,0 +1,320 @@
+import operator
+import os
+import re
+import uuid
+from datetime import datetime
+from functools import reduce
+from pathlib import Path
+from typing import Any, Iterable, Literal, Union
+
+import pandas as pd
+
+try:
+    import pyarrow as pa
+    import pyarrow.dataset as ds
+except ImportError as e:  # pragma: no cover
+    raise ImportError(
+        "Parquet export requires pyarrow,"
+        + " install it with `pip install archiveflow[parquet]`"
+    ) from e
+
+from .behavior_widget import BehaviorFormBatch
+from .pipeline import PageForms
+
+BEHAVIOR_TABLES: list[str] = ["metadata", "first_table", "second_table"]
+DEFAULT_PARTITIONING: list[str] = ["experiment", "cohort", "date"]
+COHORT_PATTERN: re.Pattern[str] = re.compile(r"Cohort \d+", re.IGNORECASE)
+UNKNOWN_PARTITION: str = "unknown"
+DATE_FORMATS: list[str] = ["%m/%d/%Y", "%Y-%m-%d", "%m/%d/%y"]
+# identify a form across runs: its entry and the session it records
+DEDUP_COLUMNS: list[str] = ["form_key", "Date", "Start Time"]
+
+
+def _iso_date(value: Any) -> str:
+    if isinstance(value, str):
+        for date_format in DATE_FORMATS:
+            try:
+                return (
+                    datetime.strptime(value.strip(), date_format)
+                    .date()
+                    .isoformat()
+                )
+            except ValueError:
+                continue
+    return UNKNOWN_PARTITION
+
+
+def _partition_value(value: Any) -> str:
+    # partition values end up in directory names
+    if not isinstance(value, str) or not value.strip():
+        return UNKNOWN_PARTITION
+    return re.sub(r"[\\/:*?\"<>|]+", "_", value.strip())
+
+
+def _string_table(frame: pd.DataFrame) -> pa.Table:
+    # form values are free text or numbers depending on what was typed,
+    # so every column is stored as a nullable string
+    return pa.table(
+        {
+            column: pa.array(
+                [None if value is None else str(value) for value in values],
+                type=pa.string(),
+            )
+            for column, values in frame.items()
+        }
+    )
+
+
+def partition_columns(
+    batch: BehaviorFormBatch, page_path: Union[str, None] = None
+) -> pd.DataFrame:
+    """
+    Partition keys of every form in a batch.
+
+    Args:
+        batch: Decoded behavior forms
+        page_path: full_path of the page the forms came from, used to find
+            the "Cohort N" folder
+
+    Returns:
+        pd.DataFrame: "form_key", "experiment", "cohort" and "date"
+        columns, one row per form
+    """
+    cohort_match: Union[re.Match[str], None] = (
+        COHORT_PATTERN.search(page_path) if page_path else None
+    )
+    return pd.DataFrame(
+        {
+            "form_key": batch.metadata["form_key"],
+            "experiment": batch.metadata["Experiment"].map(_partition_value),
+            "cohort": (
+                cohort_match.group(0).title()
+                if cohort_match
+                else UNKNOWN_PARTITION
+            ),
+            "date": batch.metadata["Date"].map(_iso_date),
+        }
+    )
+
+
+def _hive_partitioning(partitioning: list[str]) -> ds.Partitioning:
+    # partition values are always strings, e.g. dates are not inferred
+    return ds.partitioning(
+        pa.schema([(column, pa.string()) for column in partitioning]),
+        flavor="hive",
+    )
+
+
+def _form_ids(metadata: pd.DataFrame) -> list[tuple[Any, ...]]:
+    # stored as strings, see _string_table
+    return [
+        tuple(None if pd.isna(value) else str(value) for value in row)
+        for row in metadata.reindex(columns=DEDUP_COLUMNS).itertuples(
+            index=False
+        )
+    ]
+
+
+class BehaviorDatasetWriter:
+    """
+    Writes decoded behavior forms of one run to partitioned Parquet
+    datasets.
+
+    Each table of a batch goes to its own hive-partitioned dataset under
+    root (root/metadata, root/first_table, root/second_table), partitioned
+    by experiment, cohort and ISO date by default.
+
+    In "overwrite" mode every partition is cleared before the first write
+    of the run to it, so later pages of the same run add to it instead of
+    replacing the earlier ones. In "append" mode forms already in the
+    dataset, the same form_key with the same Date and Start Time, are
+    skipped, so running a harvest again adds no duplicate rows.
+    """
+
+    def __init__(
+        self,
+        root: Union[Path, str],
+        partitioning: list[str] = DEFAULT_PARTITIONING,
+        mode: Literal["append", "overwrite"] = "append",
+    ) -> None:
+        """
+        Args:
+            root: Directory holding the datasets
+            partitioning: Partition columns, from "experiment", "cohort"
+                and "date"
+            mode: "append" adds the new forms to the existing ones,
+                "overwrite" replaces the partitions being written
+        """
+        self.root = Path(root)
+        self.partitioning = partitioning
+        self.mode = mode
+        self._cleared: set[tuple[str, ...]] = set()
+        self._written: Union[set[tuple[Any, ...]], None] = None
+
+    def _dataset(self, table_name: str) -> Union[ds.Dataset, None]:
+        directory: Path = self.root / table_name
+        if not directory.exists():
+            return None
+        return ds.dataset(
+            directory,
+            format="parquet",
+            partitioning=_hive_partitioning(self.partitioning),
+        )
+
+    def _existing_forms(self) -> set[tuple[Any, ...]]:
+        # read once per run, then kept up to date by write
+        if self._written is None:
+            self._written = set()
+            dataset: Union[ds.Dataset, None] = self._dataset("metadata")
+            if dataset is not None:
+                columns: list[str] = [
+                    column
+                    for column in DEDUP_COLUMNS
+                    if column in dataset.schema.names
+                ]
+                self._written.update(
+                    _form_ids(
+                        dataset.to_table(columns=columns).to_pandas()
+                    )
+                )
+        return self._written
+
+    def _clear(self, partitions: pd.DataFrame) -> None:
+        keys: list[tuple[str, ...]] = [
+            key
+            for key in partitions[self.partitioning]
+            .drop_duplicates()
+            .itertuples(index=False, name=None)
+            if key not in self._cleared
+        ]
+        for table_name in BEHAVIOR_TABLES:
+            dataset: Union[ds.Dataset, None] = self._dataset(table_name)
+            if dataset is None:
+                continue
+            for key in keys:
+                expression: ds.Expression = reduce(
+                    operator.and_,
+                    (
+                        ds.field(column) == value
+                        for column, value in zip(self.partitioning, key)
+                    ),
+                )
+                for fragment in dataset.get_fragments(filter=expression):
+                    os.remove(fragment.path)
+        self._cleared.update(keys)
+
+    def write(
+        self, batch: BehaviorFormBatch, page_path: Union[str, None] = None
+    ) -> int:
+        """
+        Write the forms of a batch.
+
+        Args:
+            batch: Decoded behavior forms
+            page_path: full_path of the page the forms came from
+
+        Returns:
+            int: Number of forms written
+        """
+        partitions: pd.DataFrame = partition_columns(batch, page_path)
+        form_keys: Union[set[Any], None] = None
+        if self.mode == "overwrite":
+            self._clear(partitions)
+        else:
+            written: set[tuple[Any, ...]] = self._existing_forms()
+            is_new: list[bool] = [
+                form_id not in written
+                for form_id in _form_ids(batch.metadata)
+            ]
+            if not all(is_new):
+                form_keys = set(batch.metadata["form_key"][is_new])
+            written.update(_form_ids(batch.metadata[is_new]))
+        # unique file names so writes never clobber earlier ones
+        basename_template: str = f"part-{uuid.uuid4().hex}-{{i}}.parquet"
+        count: int = len(batch)
+        for table_name in BEHAVIOR_TABLES:
+            frame: pd.DataFrame = getattr(batch, table_name)
+            if form_keys is not None:
+                frame = frame[frame["form_key"].isin(form_keys)]
+                if table_name == "metadata":
+                    count = len(frame)
+            if frame.empty:
+                continue
+            frame = frame.merge(
+                partitions[["form_key"] + self.partitioning], on="form_key"
+            )
+            ds.write_dataset(
+                _string_table(frame),
+                self.root / table_name,
+                format="parquet",
+                partitioning=self.partitioning,
+                partitioning_flavor="hive",
+                basename_template=basename_template,
+                existing_data_behavior="overwrite_or_ignore",
+            )
+        return count
+
+
+def write_behavior_dataset(
+    batch: BehaviorFormBatch,
+    root: Union[Path, str],
+    page_path: Union[str, None] = None,
+    partitioning: list[str] = DEFAULT_PARTITIONING,
+    mode: Literal["append", "overwrite"] = "append",
+) -> int:
+    """
+    Write decoded behavior forms to partitioned Parquet datasets, see
+    BehaviorDatasetWriter.
+
+    Returns:
+        int: Number of forms written
+    """
+    return BehaviorDatasetWriter(root, partitioning, mode).write(
+        batch, page_path
+    )
+
+
+def export_harvest(
+    results: Iterable[PageForms],
+    root: Union[Path, str],
+    partitioning: list[str] = DEFAULT_PARTITIONING,
+    mode: Literal["append", "overwrite"] = "append",
+) -> int:
+    """
+    Write every decoded page of harvest_behavior_forms as it arrives, all
+    pages as one run of a BehaviorDatasetWriter.
+
+    Returns:
+        int: Number of forms written
+    """
+    writer: BehaviorDatasetWriter = BehaviorDatasetWriter(
+        root, partitioning, mode
+    )
+    written: int = 0
+    for result in results:
+        if result.batch is not None:
+            written += writer.write(result.batch, result.full_path)
+    return written
+
+
+def read_behavior_dataset(
+    root: Union[Path, str],
+    table_name: Literal["metadata", "first_table", "second_table"],
+    columns: Union[list[str], None] = None,
+    filter: Union[Any, None] = None,
+) -> pd.DataFrame:
+    """
+    Read one table of a behavior dataset, loading only the requested
+    columns and the partitions matching filter.
+
+    Args:
+        root: Directory holding the datasets
+        table_name: Table to read
+        columns: Columns to load, all if None
+        filter: pyarrow.dataset expression, e.g.
+            ``ds.field("cohort") == "Cohort 1"``
+    """
+    dataset: ds.Dataset = ds.dataset(
+        Path(root) / table_name, format="parquet", partitioning="hive"
+    )
+    return dataset.to_table(columns=columns, filter=filter).to_pandas()
@@ -0,0 +1,273 @@
+import json
+import os
+import time
+from bisect import bisect_left
+from fnmatch import fnmatchcase
+from pathlib import Path
+from typing import Any, Iterator, Union
+
+from .api import DEFAULT_CRAWL_WORKERS, LAClient
+from .tree import TreeNode, root_node
+
+INDEX_VERSION: int = 1
+GLOB_CHARS: str = "*?["
+
+
+class NotebookIndex:
+    """
+    In-memory index of a crawled notebook tree.
+
+    Nodes can be looked up by tree_id, by full_path and by case-insensitive
+    display name in constant time, full paths can be queried by prefix or
+    glob pattern, and the tree can be walked through children and parent.
+    The index can be saved as JSON and loaded by the next process instead
+    of crawling again.
+
+    Attributes:
+        nbid: Notebook ID the index was built from
+        root: The crawl root, parent of the top-level nodes
+        built_at: Epoch seconds the crawl started at
+    """
+
+    def __init__(
+        self,
+        nbid: str,
+        root: TreeNode,
+        levels: dict[str, list[TreeNode]],
+        built_at: Union[float, None] = None,
+    ) -> None:
+        """
+        Args:
+            nbid: Notebook ID of the nodes
+            root: The crawl root
+            levels: Nodes of every folder in notebook order, keyed by the
+                folder's tree id, see LAClient.crawl_levels
+            built_at: Epoch seconds the crawl started at, defaults to now
+        """
+        self.nbid = nbid
+        self.root = root
+        self.built_at: float = (
+            built_at if built_at is not None else time.time()
+        )
+        self._children: dict[str, list[TreeNode]] = levels
+        self._by_id: dict[str, TreeNode] = {root.tree_id: root}
+        self._by_path: dict[str, TreeNode] = {root.full_path: root}
+        self._by_name: dict[str, list[TreeNode]] = {}
+        for node in self:
+            self._by_id[node.tree_id] = node
+            self._by_path[node.full_path] = node
+            self._by_name.setdefault(node.display_text.lower(), []).append(
+                node
+            )
+        # sorted once so prefix and glob queries can bisect
+        self._paths: list[str] = sorted(self._by_path)
+
+    @classmethod
+    def build(
+        cls,
+        client: LAClient,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+    ) -> "NotebookIndex":
+        """
+        Crawl a notebook, or the subtree below tree_id, and index it.
+        """
+        built_at: float = time.time()
+        root: TreeNode = root_node(tree_id, tree_name, parent_tree_name)
+        levels: dict[str, list[TreeNode]] = client.crawl_levels(
+            nbid, root, max_workers=max_workers
+        )
+        return cls(nbid, root, levels, built_at=built_at)
+
+    def __len__(self) -> int:
+        # the root is not a node of the notebook
+        return len(self._by_id) - 1
+
+    def __iter__(self) -> Iterator[TreeNode]:
+        """
+        Every node below the root, depth-first in notebook order.
+        """
+        stack: list[TreeNode] = list(
+            reversed(self._children.get(self.root.tree_id, []))
+        )
+        while stack:
+            node: TreeNode = stack.pop()
+            yield node
+            stack.extend(reversed(self._children.get(node.tree_id, [])))
+
+    def __contains__(self, tree_id: object) -> bool:
+        return tree_id in self._by_id
+
+    @property
+    def pages(self) -> list[TreeNode]:
+        return [node for node in self if node.is_page]
+
+    @property
+    def folders(self) -> list[TreeNode]:
+        return [node for node in self if not node.is_page]
+
+    def get(self, tree_id: str) -> Union[TreeNode, None]:
+        return self._by_id.get(tree_id)
+
+    def find_path(self, full_path: str) -> Union[TreeNode, None]:
+        return self._by_path.get(full_path.rstrip("/"))
+
+    def find_name(
+        self, name: str, is_page: Union[bool, None] = None
+    ) -> list[TreeNode]:
+        """
+        Nodes whose display name matches name, ignoring case.
+
+        Args:
+            name: Display name to look up
+            is_page: Only return pages if True, only folders if False
+        """
+        return [
+            node
+            for node in self._by_name.get(name.lower(), [])
+            if is_page is None or node.is_page == is_page
+        ]
+
+    def children(self, node: Union[TreeNode, str]) -> list[TreeNode]:
+        tree_id: str = node.tree_id if isinstance(node, TreeNode) else node
+        return list(self._children.get(tree_id, []))
+
+    def parent(self, node: Union[TreeNode, str]) -> Union[TreeNode, None]:
+        record: Union[TreeNode, None] = (
+            node if isinstance(node, TreeNode) else self._by_id.get(node)
+        )
+        return record.parent if record is not None else None
+
+    def ancestors(self, node: Union[TreeNode, str]) -> list[TreeNode]:
+        """
+        Parents of a node from its parent up to the root.
+        """
+        ancestors: list[TreeNode] = []
+        parent: Union[TreeNode, None] = self.parent(node)
+        while parent is not None:
+            ancestors.append(parent)
+            parent = parent.parent
+        return ancestors
+
+    def _paths_with_prefix(self, prefix: str) -> Iterator[str]:
+        for i in range(bisect_left(self._paths, prefix), len(self._paths)):
+            if not self._paths[i].startswith(prefix):
+                return
+            yield self._paths[i]
+
+    def prefix(
+        self, prefix: str, is_page: Union[bool, None] = None
+    ) -> list[TreeNode]:
+        """
+        Nodes whose full_path starts with prefix, sorted by full_path.
+        """
+        return [
+            node
+            for node in map(
+                self._by_path.__getitem__, self._paths_with_prefix(prefix)
+            )
+            if is_page is None or node.is_page == is_page
+        ]
+
+    def glob(
+        self, pattern: str, is_page: Union[bool, None] = None
+    ) -> list[TreeNode]:
+        """
+        Nodes whose full_path matches a case-sensitive fnmatch pattern,
+        sorted by full_path. "*" also matches "/", so
+        ``"root/Exp A/*/Cohort 1"`` matches at any depth.
+
+        Only paths sharing the pattern's literal prefix are tested.
+        """
+        literal_end: int = min(
+            (i for i, char in enumerate(pattern) if char in GLOB_CHARS),
+            default=len(pattern),
+        )
+        if literal_end == len(pattern):
+            match: Union[TreeNode, None] = self.find_path(pattern)
+            return (
+                [match]
+                if match is not None
+                and (is_page is None or match.is_page == is_page)
+                else []
+            )
+        return [
+            node
+            for node in map(
+                self._by_path.__getitem__,
+                self._paths_with_prefix(pattern[:literal_end]),
+            )
+            if fnmatchcase(node.full_path, pattern)
+            and (is_page is None or node.is_page == is_page)
+        ]
+
+    def save(self, path: Union[Path, str]) -> None:
+        """
+        Write the index as JSON, replacing the previous file atomically.
+        """
+        path = Path(path)
+        path.parent.mkdir(parents=True, exist_ok=True)
+        nodes: list[list[Any]] = [
+            [
+                node.tree_id,
+                node.display_text,
+                node.is_page,
+                node.parent.tree_id if node.parent is not None else None,
+                node.stamp,
+            ]
+            for node in self
+        ]
+        tmp_path: Path = path.with_suffix(path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": INDEX_VERSION,
+                    "nbid": self.nbid,
+                    "built_at": self.built_at,
+                    "root": [
+                        self.root.tree_id,
+                        self.root.display_text,
+                        self.root.full_path,
+                    ],
+                    "nodes": nodes,
+                },
+                f,
+            )
+        os.replace(tmp_path, path)
+
+    @classmethod
+    def load(cls, path: Union[Path, str]) -> "NotebookIndex":
+        """
+        Load an index written by save.
+
+        Raises:
+            ValueError: If the file was written by another index version
+        """
+        with open(path) as f:
+            data: dict[str, Any] = json.load(f)
+        if data.get("version") != INDEX_VERSION:
+            raise ValueError(f"Unsupported notebook index version in {path}")
+        root_id, root_name, root_path = data["root"]
+        root: TreeNode = TreeNode(root_id, root_name, False, root_path)
+        by_id: dict[str, TreeNode] = {root_id: root}
+        levels: dict[str, list[TreeNode]] = {}
+        # saved depth-first, so every parent is rebuilt before its children,
+        # indexes saved before stamps were kept have no stamp column
+        for tree_id, display_text, is_page, parent_id, *stamp in data[
+            "nodes"
+        ]:
+            parent: TreeNode = by_id[parent_id]
+            node: TreeNode = TreeNode(
+                tree_id,
+                display_text,
+                is_page,
+                parent.full_path + "/" + display_text,
+                parent,
+                stamp[0] if stamp else None,
+            )
+            by_id[tree_id] = node
+            levels.setdefault(parent_id, []).append(node)
+        return cls(data["nbid"], root, levels, built_at=data["built_at"])
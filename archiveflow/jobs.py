@@ -0,0 +1,264 @@
+import threading
+import time
+import traceback
+import uuid
+from concurrent.futures import CancelledError, Future, ThreadPoolExecutor
+from typing import Any, Callable, Hashable, Literal, Union
+
+DEFAULT_JOB_WORKERS: int = 4
+# finished jobs kept for sessions to pick up their results
+DEFAULT_JOB_RETENTION: float = 60 * 60
+
+JobStatus = Literal["pending", "running", "succeeded", "failed", "cancelled"]
+FINISHED_STATUSES: frozenset[str] = frozenset(
+    {"succeeded", "failed", "cancelled"}
+)
+
+
+class JobCancelled(Exception):
+    """Raised by Job.report once the job was asked to stop."""
+
+
+class Job:
+    """
+    A long-running operation executed by a JobManager.
+
+    The function of a job gets the job as its argument and calls report to
+    publish its progress. Cancellation is cooperative: report raises
+    JobCancelled once cancel was called, so the job stops at its next
+    progress update.
+
+    Attributes:
+        job_id: Unique id of the job
+        name: Human readable description
+        owner: Who submitted the job, e.g. the LabArchives uid
+        status: "pending", "running", "succeeded", "failed" or
+            "cancelled"
+        done: Units of work done
+        total: Units of work in total, None until known
+        message: Last progress message
+        result: Return value of the function once succeeded
+        error: Traceback summary if the job failed
+    """
+
+    def __init__(
+        self,
+        name: str,
+        owner: Union[str, None] = None,
+        key: Union[Hashable, None] = None,
+    ) -> None:
+        self.job_id: str = uuid.uuid4().hex
+        self.name = name
+        self.owner = owner
+        self.key = key
+        self.status: JobStatus = "pending"
+        self.done: int = 0
+        self.total: Union[int, None] = None
+        self.message: str = ""
+        self.result: Any = None
+        self.error: Union[str, None] = None
+        self.created_at: float = time.time()
+        self.started_at: Union[float, None] = None
+        self.finished_at: Union[float, None] = None
+        self._cancel: threading.Event = threading.Event()
+        self._future: Union[Future[Any], None] = None
+
+    @property
+    def finished(self) -> bool:
+        return self.status in FINISHED_STATUSES
+
+    @property
+    def cancel_requested(self) -> bool:
+        return self._cancel.is_set()
+
+    @property
+    def fraction(self) -> Union[float, None]:
+        """Share of the work done, None while the total is unknown."""
+        if not self.total:
+            return None
+        return min(self.done / self.total, 1.0)
+
+    def report(
+        self,
+        done: int,
+        total: Union[int, None] = None,
+        message: Union[str, None] = None,
+    ) -> None:
+        """
+        Publish progress from the job's function.
+
+        Raises:
+            JobCancelled: If the job was cancelled
+        """
+        if self._cancel.is_set():
+            raise JobCancelled(self.name)
+        self.done = done
+        if total is not None:
+            self.total = total
+        if message is not None:
+            self.message = message
+
+    def cancel(self) -> None:
+        """
+        Ask the job to stop. A job that has not started yet never runs.
+        """
+        self._cancel.set()
+        if self._future is not None and self._future.cancel():
+            self.status = "cancelled"
+            self.finished_at = time.time()
+
+    def wait(self, timeout: Union[float, None] = None) -> bool:
+        """
+        Wait for the job to finish.
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        if self._future is None:
+            return self.finished
+        try:
+            self._future.exception(timeout)
+        except TimeoutError:
+            return False
+        except CancelledError:
+            # cancelled before it started
+            pass
+        return True
+
+    def snapshot(self) -> dict[str, Any]:
+        return {
+            "job_id": self.job_id,
+            "name": self.name,
+            "owner": self.owner,
+            "status": self.status,
+            "done": self.done,
+            "total": self.total,
+            "message": self.message,
+            "error": self.error,
+            "created_at": self.created_at,
+            "started_at": self.started_at,
+            "finished_at": self.finished_at,
+        }
+
+    def __repr__(self) -> str:
+        return f"Job({self.name!r}, {self.status})"
+
+
+class JobManager:
+    """
+    Runs jobs on a bounded thread pool that outlives the caller.
+
+    One manager is meant to be shared by every session of a server, e.g.
+    through st.cache_resource: a Streamlit rerun or a second session finds
+    the jobs already running instead of starting them again. Jobs
+    submitted with the same key while one is still unfinished return the
+    unfinished job.
+    """
+
+    def __init__(
+        self,
+        max_workers: int = DEFAULT_JOB_WORKERS,
+        retention: float = DEFAULT_JOB_RETENTION,
+    ) -> None:
+        """
+        Args:
+            max_workers: Maximum number of jobs running at once, further
+                jobs wait as "pending"
+            retention: Seconds finished jobs are kept
+        """
+        self.retention = retention
+        self._jobs: dict[str, Job] = {}
+        self._lock: threading.Lock = threading.Lock()
+        self._executor: ThreadPoolExecutor = ThreadPoolExecutor(
+            max_workers=max_workers, thread_name_prefix="archiveflow-job"
+        )
+
+    def submit(
+        self,
+        name: str,
+        fn: Callable[[Job], Any],
+        owner: Union[str, None] = None,
+        key: Union[Hashable, None] = None,
+    ) -> Job:
+        """
+        Run fn(job) in the background.
+
+        Args:
+            name: Description of the job
+            fn: Function doing the work, gets the job to report progress
+            owner: Who submitted the job
+            key: Identity of the work, an unfinished job with the same key
+                is returned instead of starting another
+
+        Returns:
+            Job: The new job, or the unfinished job with the same key
+        """
+        with self._lock:
+            self._prune()
+            if key is not None:
+                for job in self._jobs.values():
+                    if job.key == key and not job.finished:
+                        return job
+            job = Job(name, owner, key)
+            self._jobs[job.job_id] = job
+            job._future = self._executor.submit(self._run, job, fn)
+        return job
+
+    def _run(self, job: Job, fn: Callable[[Job], Any]) -> None:
+        if job.cancel_requested:
+            job.status = "cancelled"
+            job.finished_at = time.time()
+            return
+        job.status = "running"
+        job.started_at = time.time()
+        try:
+            job.result = fn(job)
+            job.status = "succeeded"
+        except JobCancelled:
+            job.status = "cancelled"
+        except Exception as e:
+            job.error = "".join(traceback.format_exception_only(e)).strip()
+            job.status = "failed"
+        finally:
+            job.finished_at = time.time()
+
+    def get(self, job_id: Union[str, None]) -> Union[Job, None]:
+        with self._lock:
+            return self._jobs.get(job_id) if job_id is not None else None
+
+    def jobs(self, owner: Union[str, None] = None) -> list[Job]:
+        """
+        Jobs still kept, newest first, only those of owner if given.
+        """
+        with self._lock:
+            self._prune()
+            return sorted(
+                (
+                    job
+                    for job in self._jobs.values()
+                    if owner is None or job.owner == owner
+                ),
+                key=lambda job: job.created_at,
+                reverse=True,
+            )
+
+    def cancel(self, job_id: str) -> None:
+        job: Union[Job, None] = self.get(job_id)
+        if job is not None:
+            job.cancel()
+
+    def _prune(self) -> None:
+        # called with the lock held
+        cutoff: float = time.time() - self.retention
+        for job_id, job in list(self._jobs.items()):
+            if job.finished_at is not None and job.finished_at < cutoff:
+                del self._jobs[job_id]
+
+    def shutdown(self, wait: bool = True) -> None:
+        """
+        Cancel the pending jobs and ask the running ones to stop.
+        """
+        with self._lock:
+            for job in self._jobs.values():
+                job.cancel()
+        self._executor.shutdown(wait=wait, cancel_futures=True)
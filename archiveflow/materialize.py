@@ -0,0 +1,286 @@
+import os
+from concurrent.futures import ThreadPoolExecutor
+from itertools import groupby
+from pathlib import Path
+from typing import Any, Callable, Iterable, Union
+
+from .index import NotebookIndex
+from .tree import TreeNode
+
+# stat and mkdir are network round-trips on NFS, so they are overlapped
+DEFAULT_SCAN_WORKERS: int = 16
+
+
+def _depth(relative_path: str) -> int:
+    return relative_path.count("/")
+
+
+def _parent(relative_path: str) -> str:
+    return relative_path.rpartition("/")[0]
+
+
+def _rename_key(relative_path: str) -> str:
+    # "Cohort 1" matches "cohort 1" and "Cohort  1 "
+    return " ".join(relative_path.rpartition("/")[2].lower().split())
+
+
+def _list_subdirectories(directory: Path) -> list[str]:
+    try:
+        with os.scandir(directory) as entries:
+            # the entry type comes with the listing, no stat per entry
+            return [
+                entry.name
+                for entry in entries
+                if entry.is_dir(follow_symlinks=False)
+            ]
+    except (FileNotFoundError, NotADirectoryError):
+        return []
+
+
+def scan_directories(
+    root: Union[Path, str],
+    max_workers: int = DEFAULT_SCAN_WORKERS,
+    max_depth: Union[int, None] = None,
+) -> set[str]:
+    """
+    Every directory below root, as paths relative to root joined with "/".
+
+    The tree is listed level by level with os.scandir, every directory of
+    a level concurrently, so a network share is read in one round-trip per
+    level instead of one per directory.
+
+    Args:
+        root: Directory to scan
+        max_workers: Maximum number of concurrent listings
+        max_depth: Number of levels to list, the whole tree if None
+    """
+    root = Path(root)
+    found: set[str] = set()
+    frontier: list[str] = [""]
+    depth: int = 0
+    with ThreadPoolExecutor(max_workers=max_workers) as executor:
+        while frontier and (max_depth is None or depth < max_depth):
+            depth += 1
+            listed = executor.map(
+                lambda relative: _list_subdirectories(root / relative),
+                frontier,
+            )
+            next_frontier: list[str] = []
+            for relative, names in zip(frontier, listed):
+                for name in names:
+                    child: str = f"{relative}/{name}" if relative else name
+                    found.add(child)
+                    next_frontier.append(child)
+            frontier = next_frontier
+    return found
+
+
+def index_directories(
+    index: NotebookIndex,
+    folder: Union[TreeNode, None] = None,
+    include_pages: bool = False,
+) -> list[str]:
+    """
+    The folders below a folder of a notebook index as relative directory
+    paths, depth-first in notebook order.
+
+    Args:
+        index: Index of the notebook
+        folder: Folder to start from, defaults to the index root
+        include_pages: Also give every page a directory, e.g. for the
+            files DataWatcher uploads to it
+    """
+    folder = folder if folder is not None else index.root
+    directories: list[str] = []
+    stack: list[tuple[str, TreeNode]] = [
+        ("", node) for node in reversed(index.children(folder))
+    ]
+    while stack:
+        parent, node = stack.pop()
+        if node.is_page and not include_pages:
+            continue
+        relative: str = (
+            f"{parent}/{node.display_text}" if parent else node.display_text
+        )
+        directories.append(relative)
+        stack.extend(
+            (relative, child) for child in reversed(index.children(node))
+        )
+    return directories
+
+
+class MaterializePlan:
+    """
+    Operations that turn a local directory tree into a desired tree.
+
+    A plan is computed from one scan of the local tree. Directories of the
+    desired tree that do not exist locally are missing, local directories
+    that are not desired are extra. A missing directory whose name only
+    differs from an extra sibling in case or whitespace, e.g. "cohort 1"
+    for "Cohort 1", is a rename instead, which keeps the files inside it.
+    Extra directories are only reported, never deleted. Directories below
+    the leaves of the desired tree hold data, e.g. the videos of a cohort,
+    and are neither extra nor scanned.
+
+    Attributes:
+        root: Local directory the paths are relative to
+        desired: Desired directories
+        existing: Directories found below root when the plan was made
+        renamed: (old, new) relative paths, applied in order
+        missing: Directories to create, parents before children
+        extra: Local directories not in the desired tree
+    """
+
+    def __init__(
+        self,
+        root: Union[Path, str],
+        desired: Iterable[str],
+        existing: set[str],
+    ) -> None:
+        self.root = Path(root)
+        self.desired: set[str] = {
+            path.strip("/") for path in desired if path.strip("/")
+        }
+        self.existing = existing
+        self._desired_parents: set[str] = {
+            _parent(path) for path in self.desired
+        }
+        self.renamed: list[tuple[str, str]] = []
+        # existing directories as they will be after the renames
+        current: set[str] = set(existing)
+        for depth in sorted({_depth(path) for path in self.desired}):
+            extra_by_key: dict[tuple[str, str], list[str]] = {}
+            for path in sorted(current - self.desired):
+                if _depth(path) == depth:
+                    extra_by_key.setdefault(
+                        (_parent(path), _rename_key(path)), []
+                    ).append(path)
+            for path in sorted(self.desired - current):
+                if _depth(path) != depth:
+                    continue
+                candidates: Union[list[str], None] = extra_by_key.get(
+                    (_parent(path), _rename_key(path))
+                )
+                if not candidates:
+                    continue
+                old: str = candidates.pop(0)
+                self.renamed.append((old, path))
+                current = {
+                    path + other[len(old) :]
+                    if other == old or other.startswith(old + "/")
+                    else other
+                    for other in current
+                }
+        self.missing: list[str] = sorted(
+            self.desired - current, key=lambda path: (_depth(path), path)
+        )
+        self.extra: list[str] = sorted(
+            path
+            for path in current - self.desired
+            if not self._below_leaf(path)
+        )
+        self.root_missing: bool = not self.root.is_dir()
+
+    def _below_leaf(self, path: str) -> bool:
+        parent: str = _parent(path)
+        while parent:
+            if parent in self.desired:
+                # a desired directory without desired subdirectories
+                return parent not in self._desired_parents
+            parent = _parent(parent)
+        return False
+
+    @classmethod
+    def scan(
+        cls,
+        root: Union[Path, str],
+        desired: Iterable[str],
+        max_workers: int = DEFAULT_SCAN_WORKERS,
+    ) -> "MaterializePlan":
+        """
+        Plan the operations for root after scanning it once, down to the
+        depth of the desired tree.
+        """
+        desired = list(desired)
+        max_depth: int = max(
+            (len(Path(path.strip("/")).parts) for path in desired),
+            default=0,
+        )
+        return cls(
+            root, desired, scan_directories(root, max_workers, max_depth)
+        )
+
+    @property
+    def up_to_date(self) -> bool:
+        return not self.root_missing and not self.renamed and not self.missing
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "root": str(self.root),
+            "create_root": self.root_missing,
+            "create": len(self.missing),
+            "rename": len(self.renamed),
+            "extra": len(self.extra),
+            "up_to_date": self.up_to_date,
+        }
+
+    def report(self) -> str:
+        """
+        Dry-run report, one operation per line: "+" for a directory to
+        create, "~" for a rename and "?" for an extra local directory.
+        """
+        lines: list[str] = []
+        if self.root_missing:
+            lines.append(f"+ {self.root}")
+        lines.extend(f"~ {old} -> {new}" for old, new in self.renamed)
+        lines.extend(f"+ {path}" for path in self.missing)
+        lines.extend(f"? {path}" for path in self.extra)
+        return "\n".join(lines)
+
+    def apply(
+        self,
+        max_workers: int = DEFAULT_SCAN_WORKERS,
+        progress: Union[Callable[[int, int], None], None] = None,
+    ) -> None:
+        """
+        Rename and create directories. The directories of one level are
+        created concurrently, after the level of their parents.
+
+        Args:
+            max_workers: Maximum number of concurrent mkdir calls
+            progress: Called with the operations done and their total
+                after every rename and every level, an exception raised by
+                it stops the remaining operations
+
+        Directories created by someone else since the plan was made are
+        left as they are.
+
+        Raises:
+            FileExistsError: If a file is in the place of a directory
+        """
+        total: int = len(self.renamed) + len(self.missing)
+        done: int = 0
+        if self.root_missing:
+            self.root.mkdir(parents=True, exist_ok=True)
+        for old, new in self.renamed:
+            os.rename(self.root / old, self.root / new)
+            done += 1
+            if progress is not None:
+                progress(done, total)
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            for _, level in groupby(self.missing, key=_depth):
+                paths: list[str] = list(level)
+                # list() waits for the level and raises the first error
+                list(
+                    executor.map(
+                        lambda path: os.makedirs(
+                            self.root / path, exist_ok=True
+                        ),
+                        paths,
+                    )
+                )
+                done += len(paths)
+                if progress is not None:
+                    progress(done, total)
+        self.existing = self.desired | set(self.extra)
+        self.renamed, self.missing, self.root_missing = [], [], False
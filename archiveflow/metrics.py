@@ -0,0 +1,271 @@
+import json
+import threading
+import time
+from contextlib import contextmanager
+from typing import Any, Iterator
+
+# upper bounds in seconds of the latency histogram buckets
+LATENCY_BUCKETS: tuple[float, ...] = (
+    0.005,
+    0.01,
+    0.025,
+    0.05,
+    0.1,
+    0.25,
+    0.5,
+    1.0,
+    2.5,
+    5.0,
+    10.0,
+    30.0,
+)
+METRIC_PREFIX: str = "archiveflow"
+
+
+class Histogram:
+    """
+    Cumulative latency histogram with fixed buckets.
+    """
+
+    def __init__(self, buckets: tuple[float, ...] = LATENCY_BUCKETS) -> None:
+        self.buckets = buckets
+        self.counts: list[int] = [0] * len(buckets)
+        self.count: int = 0
+        self.sum: float = 0.0
+
+    def observe(self, value: float) -> None:
+        self.count += 1
+        self.sum += value
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+
+    def to_dict(self) -> dict[str, Any]:
+        return {
+            "count": self.count,
+            "sum": self.sum,
+            "buckets": dict(zip(map(str, self.buckets), self.counts)),
+        }
+
+
+class ClientMetrics:
+    """
+    Thread-safe request metrics of a LAClient.
+
+    Records per API method request counts by status, latency histograms,
+    bytes sent and received and retries, plus the hits/misses of the
+    SQLite tree cache and of the in-memory structure cache, each counted
+    on its own, and named hot-path timers such as XML parse time.
+    Snapshots can be exported as JSON or in the Prometheus text format.
+    """
+
+    def __init__(self) -> None:
+        self._lock: threading.Lock = threading.Lock()
+        self.reset()
+
+    def reset(self) -> None:
+        with self._lock:
+            self.requests: dict[tuple[str, str], int] = {}
+            self.latency: dict[str, Histogram] = {}
+            self.bytes_sent: dict[str, int] = {}
+            self.bytes_received: dict[str, int] = {}
+            self.retries: dict[str, int] = {}
+            self.coalesced: dict[str, int] = {}
+            self.cache_hits: int = 0
+            self.cache_misses: int = 0
+            self.structure_cache_hits: int = 0
+            self.structure_cache_misses: int = 0
+            self.timers: dict[str, Histogram] = {}
+
+    def record_request(
+        self,
+        api_method: str,
+        status: str,
+        latency: float,
+        bytes_sent: int = 0,
+        bytes_received: int = 0,
+    ) -> None:
+        """
+        Record one request attempt.
+
+        Args:
+            api_method: API method name
+            status: HTTP status code, or the exception name if the attempt
+                got no response
+            latency: Seconds until the response headers arrived
+            bytes_sent: Request body size
+            bytes_received: Response body size, when known
+        """
+        with self._lock:
+            key: tuple[str, str] = (api_method, status)
+            self.requests[key] = self.requests.get(key, 0) + 1
+            self.latency.setdefault(api_method, Histogram()).observe(latency)
+            self.bytes_sent[api_method] = (
+                self.bytes_sent.get(api_method, 0) + bytes_sent
+            )
+            self.bytes_received[api_method] = (
+                self.bytes_received.get(api_method, 0) + bytes_received
+            )
+
+    def record_retry(self, api_method: str) -> None:
+        with self._lock:
+            self.retries[api_method] = self.retries.get(api_method, 0) + 1
+
+    def record_coalesced(self, api_method: str) -> None:
+        with self._lock:
+            self.coalesced[api_method] = (
+                self.coalesced.get(api_method, 0) + 1
+            )
+
+    def record_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.cache_hits += 1
+            else:
+                self.cache_misses += 1
+
+    def record_structure_cache(self, hit: bool) -> None:
+        with self._lock:
+            if hit:
+                self.structure_cache_hits += 1
+            else:
+                self.structure_cache_misses += 1
+
+    def observe(self, name: str, seconds: float) -> None:
+        with self._lock:
+            self.timers.setdefault(name, Histogram()).observe(seconds)
+
+    @contextmanager
+    def timer(self, name: str) -> Iterator[None]:
+        """
+        Time the enclosed block into the timer histogram called name.
+        """
+        start: float = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(name, time.perf_counter() - start)
+
+    def snapshot(self) -> dict[str, Any]:
+        """
+        Summary of all metrics as plain, JSON-serializable values.
+        """
+        with self._lock:
+            api_methods: set[str] = {method for method, _ in self.requests}
+            return {
+                "requests": {
+                    method: {
+                        "statuses": {
+                            status: count
+                            for (m, status), count in self.requests.items()
+                            if m == method
+                        },
+                        "latency": self.latency[method].to_dict(),
+                        "bytes_sent": self.bytes_sent.get(method, 0),
+                        "bytes_received": self.bytes_received.get(method, 0),
+                        "retries": self.retries.get(method, 0),
+                        "coalesced": self.coalesced.get(method, 0),
+                    }
+                    for method in sorted(api_methods)
+                },
+                "cache": {
+                    "hits": self.cache_hits,
+                    "misses": self.cache_misses,
+                },
+                "structure_cache": {
+                    "hits": self.structure_cache_hits,
+                    "misses": self.structure_cache_misses,
+                },
+                "timers": {
+                    name: histogram.to_dict()
+                    for name, histogram in sorted(self.timers.items())
+                },
+            }
+
+    def to_json(self, indent: int | None = None) -> str:
+        return json.dumps(self.snapshot(), indent=indent)
+
+    def to_prometheus(self) -> str:
+        """
+        Metrics in the Prometheus text exposition format.
+        """
+        lines: list[str] = []
+
+        def header(name: str, kind: str, help_text: str) -> str:
+            lines.append(f"# HELP {METRIC_PREFIX}_{name} {help_text}")
+            lines.append(f"# TYPE {METRIC_PREFIX}_{name} {kind}")
+            return f"{METRIC_PREFIX}_{name}"
+
+        def histogram(
+            name: str, label: str, histograms: dict[str, Histogram]
+        ) -> None:
+            for value, hist in sorted(histograms.items()):
+                for bound, count in zip(hist.buckets, hist.counts):
+                    lines.append(
+                        f'{name}_bucket{{{label}="{value}",le="{bound}"}}'
+                        + f" {count}"
+                    )
+                lines.append(
+                    f'{name}_bucket{{{label}="{value}",le="+Inf"}}'
+                    + f" {hist.count}"
+                )
+                lines.append(f'{name}_sum{{{label}="{value}"}} {hist.sum}')
+                lines.append(
+                    f'{name}_count{{{label}="{value}"}} {hist.count}'
+                )
+
+        with self._lock:
+            name: str = header(
+                "requests_total", "counter", "LabArchives API requests."
+            )
+            for (method, status), count in sorted(self.requests.items()):
+                lines.append(
+                    f'{name}{{api_method="{method}",status="{status}"}}'
+                    + f" {count}"
+                )
+            name = header(
+                "request_duration_seconds",
+                "histogram",
+                "LabArchives API request latency.",
+            )
+            histogram(name, "api_method", self.latency)
+            for metric, values, help_text in (
+                ("request_bytes_total", self.bytes_sent, "Bytes sent."),
+                (
+                    "response_bytes_total",
+                    self.bytes_received,
+                    "Bytes received.",
+                ),
+                ("retries_total", self.retries, "Retried requests."),
+                (
+                    "coalesced_total",
+                    self.coalesced,
+                    "Calls served by an identical call in flight.",
+                ),
+            ):
+                name = header(metric, "counter", help_text)
+                for method, count in sorted(values.items()):
+                    lines.append(f'{name}{{api_method="{method}"}} {count}')
+            name = header(
+                "tree_cache_requests_total",
+                "counter",
+                "Tree cache lookups.",
+            )
+            lines.append(f'{name}{{result="hit"}} {self.cache_hits}')
+            lines.append(f'{name}{{result="miss"}} {self.cache_misses}')
+            name = header(
+                "structure_cache_requests_total",
+                "counter",
+                "In-memory structure cache lookups.",
+            )
+            lines.append(
+                f'{name}{{result="hit"}} {self.structure_cache_hits}'
+            )
+            lines.append(
+                f'{name}{{result="miss"}} {self.structure_cache_misses}'
+            )
+            name = header(
+                "timer_seconds", "histogram", "Hot-path timings."
+            )
+            histogram(name, "name", self.timers)
+        return "\n".join(lines) + "\n"
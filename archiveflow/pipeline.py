@@ -0,0 +1,216 @@
+import os
+import time
+from collections import deque
+from concurrent.futures import Executor, Future, ProcessPoolExecutor
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator, Union
+from xml.etree import ElementTree as ET
+
+from requests import RequestException
+
+from .api import DEFAULT_CRAWL_WORKERS, LAClient
+from .behavior_widget import (
+    BehaviorFormBatch,
+    decode_behavior_forms,
+    parse_behavior_widget,
+)
+from .tree import TreeNode
+from .utils import EmptyResults
+
+
+class PageForms:
+    """
+    Behavior forms harvested from one page.
+
+    Attributes:
+        page: The page's node record
+        tree_id: Tree id of the page
+        full_path: full_path of the page
+        batch: The decoded forms, None if the page has none
+        error: Why the page could not be decoded, None if it could
+    """
+
+    def __init__(
+        self,
+        page: TreeNode,
+        batch: Union[BehaviorFormBatch, None],
+        error: Union[str, None],
+    ) -> None:
+        self.page = page
+        self.tree_id: str = page.tree_id
+        self.full_path: str = page.full_path
+        self.batch = batch
+        self.error = error
+
+
+def decode_page(
+    content: bytes,
+) -> tuple[Union[BehaviorFormBatch, None], Union[str, None]]:
+    """
+    Parse and decode the behavior forms of a get_entries_for_page body.
+
+    Runs in the decode worker processes, so it only takes and returns
+    picklable values. Entries that are not behavior forms, e.g. text
+    entries, are skipped.
+
+    Returns:
+        tuple: The decoded forms (None if the page has none) and the
+        error message if a form could not be decoded or the body is not
+        valid XML
+    """
+    batch, error, _ = _timed_decode_page(content)
+    return batch, error
+
+
+def _timed_decode_page(
+    content: bytes,
+) -> tuple[
+    Union[BehaviorFormBatch, None], Union[str, None], dict[str, float]
+]:
+    # decode_page plus the seconds spent in each stage, the decode worker
+    # processes cannot record them in the client's metrics themselves
+    timings: dict[str, float] = {}
+    try:
+        start: float = time.perf_counter()
+        try:
+            results = parse_behavior_widget(content, skip_other_entries=True)
+        finally:
+            timings["parse_behavior_widget"] = time.perf_counter() - start
+        start = time.perf_counter()
+        batch: BehaviorFormBatch = decode_behavior_forms([results])
+        timings["decode_behavior_forms"] = time.perf_counter() - start
+        return batch, None, timings
+    except EmptyResults:
+        return None, None, timings
+    except (KeyError, ValueError, ET.ParseError) as e:
+        return None, f"{type(e).__name__}: {e}", timings
+
+
+def _decoded(error: str) -> Future:
+    # stands in for the decode of a page that could not be fetched
+    future: Future = Future()
+    future.set_result((None, error, {}))
+    return future
+
+
+class _InlineExecutor(Executor):
+    def submit(self, fn, /, *args, **kwargs):  # type: ignore
+        future: Future = Future()
+        try:
+            future.set_result(fn(*args, **kwargs))
+        except BaseException as e:
+            future.set_exception(e)
+        return future
+
+
+def harvest_behavior_forms(
+    client: LAClient,
+    nbid: str,
+    tree_id: str = "0",
+    tree_name: str = "root",
+    parent_tree_name: str = "",
+    pages: Union[list[TreeNode], None] = None,
+    fetch_workers: int = DEFAULT_CRAWL_WORKERS,
+    decode_workers: Union[int, None] = None,
+) -> Iterator[PageForms]:
+    """
+    Fetch, parse and decode the behavior forms of every page in a subtree.
+
+    Page entries are fetched on a thread pool of fetch_workers, and the
+    CPU-bound JSON parsing and DataFrame construction runs on a process
+    pool of decode_workers. Results are yielded in page order as soon as
+    they are ready, with a bounded number of pages in flight. The parse
+    and decode time of every page is recorded in the client's metrics as
+    the parse_behavior_widget and decode_behavior_forms timers.
+
+    Args:
+        client (LAClient): Authenticated client
+        nbid (str): Notebook ID to harvest
+        tree_id (str): Tree ID of the subtree to harvest, "0" for the
+            whole notebook
+        tree_name (str): Display name of the subtree root
+        parent_tree_name (str): full_path of the subtree root's parent
+        pages (list[TreeNode], optional): Pages to harvest instead of
+            crawling the subtree
+        fetch_workers (int): Maximum number of concurrent page requests
+        decode_workers (int, optional): Number of decode processes,
+            defaults to the CPU count. 0 decodes in the calling thread.
+
+    Yields:
+        PageForms: The decoded forms of each page
+    """
+    if pages is None:
+        pages = client.get_all_pages(
+            nbid,
+            tree_id,
+            tree_name,
+            parent_tree_name,
+            max_workers=fetch_workers,
+        )
+    if decode_workers is None:
+        decode_workers = os.cpu_count() or 1
+    fetch_window: int = 2 * fetch_workers
+    decode_window: int = 2 * max(decode_workers, 1)
+
+    def fetch(page: TreeNode) -> tuple[bytes, Union[str, None]]:
+        # a failed page is reported on its own, the harvest goes on
+        try:
+            response = client.get_entries_for_page(
+                nbid, page.tree_id, entry_data=True
+            )
+        except RequestException as e:
+            return b"", f"{type(e).__name__}: {e}"
+        if not response.ok:
+            return b"", f"HTTP {response.status_code}: {response.reason}"
+        return response.content, None
+
+    decode_executor: Executor = (
+        ProcessPoolExecutor(max_workers=decode_workers)
+        if decode_workers > 0
+        else _InlineExecutor()
+    )
+    with ThreadPoolExecutor(max_workers=fetch_workers) as fetch_executor:
+        with decode_executor:
+            page_iter: Iterator[TreeNode] = iter(pages)
+            fetches: deque[tuple[TreeNode, Future]] = deque()
+            decodes: deque[tuple[TreeNode, Future]] = deque()
+
+            def fill_fetches() -> None:
+                while len(fetches) < fetch_window:
+                    page: Union[TreeNode, None] = next(page_iter, None)
+                    if page is None:
+                        return
+                    fetches.append(
+                        (page, fetch_executor.submit(fetch, page))
+                    )
+
+            try:
+                fill_fetches()
+                while fetches or decodes:
+                    if fetches:
+                        page, fetched = fetches.popleft()
+                        content, error = fetched.result()
+                        decodes.append(
+                            (
+                                page,
+                                (
+                                    _decoded(error)
+                                    if error is not None
+                                    else decode_executor.submit(
+                                        _timed_decode_page, content
+                                    )
+                                ),
+                            )
+                        )
+                        fill_fetches()
+                    if decodes and (
+                        len(decodes) >= decode_window or not fetches
+                    ):
+                        page, decoded = decodes.popleft()
+                        batch, error, timings = decoded.result()
+                        for name, seconds in timings.items():
+                            client.metrics.observe(name, seconds)
+                        yield PageForms(page, batch, error)
+            finally:
+                for _, future in list(fetches) + list(decodes):
+                    future.cancel()
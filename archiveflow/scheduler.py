@@ -0,0 +1,194 @@
+import logging
+import random
+import threading
+import time
+from typing import Callable, Union
+
+import requests
+from requests import Response
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_MAX_CONCURRENCY: int = 10
+DEFAULT_MAX_RETRIES: int = 4
+DEFAULT_BACKOFF_BASE: float = 0.5
+DEFAULT_BACKOFF_MAX: float = 30.0
+# (connect, read) timeouts in seconds
+DEFAULT_TIMEOUT: tuple[float, float] = (10.0, 120.0)
+RETRY_STATUSES: frozenset[int] = frozenset({429, 500, 502, 503, 504})
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket allowing rate requests per second on
+    average, with bursts of up to burst requests.
+    """
+
+    def __init__(self, rate: float, burst: Union[int, None] = None) -> None:
+        if rate <= 0:
+            raise ValueError("Token bucket rate must be positive")
+        self.rate = rate
+        self.capacity: float = float(burst if burst is not None else 1)
+        self._tokens: float = self.capacity
+        self._updated_at: float = time.monotonic()
+        self._lock: threading.Lock = threading.Lock()
+
+    def acquire(self) -> float:
+        """
+        Take one token, sleeping until one is available.
+
+        Returns:
+            float: Seconds spent waiting
+        """
+        with self._lock:
+            now: float = time.monotonic()
+            self._tokens = min(
+                self.capacity,
+                self._tokens + (now - self._updated_at) * self.rate,
+            )
+            self._updated_at = now
+            # reserve the token now so concurrent callers queue up
+            self._tokens -= 1
+            wait: float = max(0.0, -self._tokens / self.rate)
+        if wait > 0:
+            time.sleep(wait)
+        return wait
+
+
+class RequestScheduler:
+    """
+    Central scheduler for LAClient requests.
+
+    Every request passes through a global concurrency cap and, if one is
+    configured for its API method, a token-bucket rate limit. Idempotent
+    requests that fail with a connection error, a timeout or a retryable
+    status are retried with jittered exponential backoff. Each attempt
+    calls send again, so the request is re-signed with a fresh expires.
+    """
+
+    def __init__(
+        self,
+        rate_limits: Union[dict[str, float], None] = None,
+        default_rate: Union[float, None] = None,
+        burst: Union[int, None] = None,
+        max_concurrency: int = DEFAULT_MAX_CONCURRENCY,
+        max_retries: int = DEFAULT_MAX_RETRIES,
+        backoff_base: float = DEFAULT_BACKOFF_BASE,
+        backoff_max: float = DEFAULT_BACKOFF_MAX,
+        timeout: Union[float, tuple[float, float], None] = DEFAULT_TIMEOUT,
+        retry_statuses: frozenset[int] = RETRY_STATUSES,
+    ) -> None:
+        """
+        Args:
+            rate_limits: Requests per second allowed for each API method
+            default_rate: Requests per second for API methods without an
+                entry in rate_limits, unlimited if None
+            burst: Requests allowed in a burst by each rate limit
+            max_concurrency: Maximum number of requests in flight
+            max_retries: Retries of a failed idempotent request
+            backoff_base: Backoff ceiling of the first retry in seconds,
+                doubled on every further retry
+            backoff_max: Maximum backoff ceiling in seconds
+            timeout: requests timeout applied to every request
+            retry_statuses: HTTP statuses that are retried
+        """
+        self.rate_limits: dict[str, float] = rate_limits or {}
+        self.default_rate = default_rate
+        self.burst = burst
+        self.max_concurrency = max_concurrency
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.timeout = timeout
+        self.retry_statuses = retry_statuses
+        self._buckets: dict[str, TokenBucket] = {}
+        self._buckets_lock: threading.Lock = threading.Lock()
+        self._slots: threading.BoundedSemaphore = threading.BoundedSemaphore(
+            max_concurrency
+        )
+
+    def _bucket(self, api_method: str) -> Union[TokenBucket, None]:
+        rate: Union[float, None] = self.rate_limits.get(
+            api_method, self.default_rate
+        )
+        if rate is None:
+            return None
+        with self._buckets_lock:
+            if api_method not in self._buckets:
+                self._buckets[api_method] = TokenBucket(rate, self.burst)
+            return self._buckets[api_method]
+
+    def backoff(
+        self, attempt: int, response: Union[Response, None] = None
+    ) -> float:
+        """
+        Seconds to wait before retry number attempt (starting at 0),
+        honoring a Retry-After header in seconds.
+        """
+        if response is not None:
+            retry_after: Union[str, None] = response.headers.get(
+                "Retry-After"
+            )
+            if retry_after is not None and retry_after.isdigit():
+                return min(float(retry_after), self.backoff_max)
+        ceiling: float = min(
+            self.backoff_max, self.backoff_base * 2**attempt
+        )
+        return random.uniform(0, ceiling)
+
+    def execute(
+        self,
+        api_method: str,
+        send: Callable[[], Response],
+        idempotent: bool = True,
+        on_retry: Union[Callable[[str], None], None] = None,
+    ) -> Response:
+        """
+        Run a request under the rate limit and concurrency cap, retrying
+        it if it is idempotent.
+
+        Args:
+            api_method: API method name used to pick the rate limit
+            send: Builds, signs and sends the request
+            idempotent: Whether the request is safe to send again
+            on_retry: Called with api_method before every retry
+
+        Returns:
+            Response: The first successful response, or the last response
+            once the retries are exhausted
+
+        Raises:
+            requests.ConnectionError, requests.Timeout: If the last
+            attempt failed to get a response
+        """
+        bucket: Union[TokenBucket, None] = self._bucket(api_method)
+        retries: int = self.max_retries if idempotent else 0
+        attempt: int = 0
+        while True:
+            if bucket is not None:
+                bucket.acquire()
+            response: Union[Response, None] = None
+            try:
+                with self._slots:
+                    response = send()
+            except (requests.ConnectionError, requests.Timeout) as e:
+                if attempt >= retries:
+                    raise
+                logger.warning(
+                    f"{api_method} attempt {attempt + 1} failed: {e!r}"
+                )
+            else:
+                if (
+                    response.status_code not in self.retry_statuses
+                    or attempt >= retries
+                ):
+                    return response
+                logger.warning(
+                    f"{api_method} attempt {attempt + 1} returned"
+                    + f" {response.status_code}"
+                )
+                response.close()
+            if on_retry is not None:
+                on_retry(api_method)
+            time.sleep(self.backoff(attempt, response))
+            attempt += 1
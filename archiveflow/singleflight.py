@@ -0,0 +1,59 @@
+import threading
+from concurrent.futures import Future
+from typing import Callable, Hashable, TypeVar, Union
+
+T = TypeVar("T")
+
+
+class SingleFlight:
+    """
+    Runs a call once for every caller asking for the same key meanwhile.
+
+    The first caller of a key runs the function, callers arriving while it
+    runs wait for it and get the same result, or the same exception. Once
+    the call finished the key is free again: nothing is cached, a later
+    call runs the function anew.
+
+    Attributes:
+        calls: Number of times a function was run
+        shared: Number of callers that got the result of another's call
+    """
+
+    def __init__(self) -> None:
+        self.calls: int = 0
+        self.shared: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        self._in_flight: dict[Hashable, Future] = {}
+
+    def do(self, key: Hashable, fn: Callable[[], T]) -> T:
+        """
+        Return fn(), or the result of the call of key already running.
+
+        Raises:
+            Exception: Whatever fn raised, also in the waiting callers
+        """
+        with self._lock:
+            future: Union[Future, None] = self._in_flight.get(key)
+            if future is not None:
+                self.shared += 1
+            else:
+                leader: Future = Future()
+                self._in_flight[key] = leader
+                self.calls += 1
+        if future is not None:
+            return future.result()
+        try:
+            result: T = fn()
+        except BaseException as e:
+            leader.set_exception(e)
+            raise
+        else:
+            leader.set_result(result)
+            return result
+        finally:
+            with self._lock:
+                del self._in_flight[key]
+
+    def in_flight(self) -> int:
+        with self._lock:
+            return len(self._in_flight)
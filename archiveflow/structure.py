@@ -1,9 +1,10 @@
 import re
-import xml.etree.ElementTree as ET
 from pathlib import Path
-from typing import Literal
+from typing import Literal, Union
 
-from archiveflow.api import LAClient
+from archiveflow.api import DEFAULT_CRAWL_WORKERS, LAClient
+from archiveflow.materialize import DEFAULT_SCAN_WORKERS, MaterializePlan
+from archiveflow.tree import TreeNode
 
 
 class TejedaDataDirectory:
@@ -12,6 +13,9 @@ class TejedaDataDirectory:
     compare to LabArchive entry.
     """
 
+    # directories created in every cohort directory
+    cohort_subdirs: list[str] = []
+
     def __init__(
         self,
         data_dir_root_dir: Path,
@@ -19,17 +23,22 @@ class TejedaDataDirectory:
         nbid: str,
         tree_id: str,
         tree_name: str,
-        parent_experiment: ET.Element,
+        parent_experiment: TreeNode,
+        cohort_nodes: Union[list[TreeNode], None] = None,
     ):
-        parent_tree_name: str | None = parent_experiment.findtext(
-            "display-text"
-        )
-        if isinstance(parent_tree_name, str):
-            cohort_nodes: list[ET.Element] = client.get_dir_nodes(
-                nbid, tree_id, tree_name, parent_tree_name=parent_tree_name
+        """
+        Args:
+            cohort_nodes: Folders of the directory if they were already
+                fetched, e.g. by TejedaExperiment, fetched from LabArchives
+                otherwise
+        """
+        if cohort_nodes is None:
+            cohort_nodes = client.get_dir_nodes(
+                nbid,
+                tree_id,
+                tree_name,
+                parent_tree_name=parent_experiment.display_text,
             )
-        else:
-            raise ValueError("No display-text found for parent experiment")
         # initialize attributes
         # these are the types of subdirectories in the behavior directory
         self.cohorts: list[str] = []
@@ -39,20 +48,34 @@ class TejedaDataDirectory:
         self.data_dir_root_dir = data_dir_root_dir
         # examine names of cohort directories
         for node in cohort_nodes:
-            name: str | None = node.findtext("display-text")
-            if isinstance(name, str):
-                if cohort_pattern.match(name):
-                    self.cohorts.append(name)
-                else:
-                    raise ValueError(
-                        f"Invalid cohort directory name: {name}. "
-                        + " Please correct in LabArchives"
-                    )
+            name: str = node.display_text
+            if cohort_pattern.match(name):
+                self.cohorts.append(name)
+            else:
+                raise ValueError(
+                    f"Invalid cohort directory name: {name}. "
+                    + " Please correct in LabArchives"
+                )
+
+    def desired_directories(self) -> list[str]:
+        """
+        The cohort directories and their subdirectories, relative to
+        data_dir_root_dir.
+        """
+        directories: list[str] = []
+        for cohort in self.cohorts:
+            directories.append(cohort)
+            directories.extend(
+                f"{cohort}/{subdir}" for subdir in self.cohort_subdirs
+            )
+        return directories
 
     def create_cohorts(self):
         for cohort in self.cohorts:
             cohort_dir = self.data_dir_root_dir.joinpath(cohort)
             cohort_dir.mkdir(exist_ok=True)
+            for subdir in self.cohort_subdirs:
+                cohort_dir.joinpath(subdir).mkdir(exist_ok=True)
 
 
 class TejedaBehavior(TejedaDataDirectory):
@@ -61,6 +84,8 @@ class TejedaBehavior(TejedaDataDirectory):
     compare to LabArchive entry.
     """
 
+    cohort_subdirs: list[str] = ["Videos"]
+
     def __init__(
         self,
         data_dir_root_dir: Path,
@@ -68,7 +93,8 @@ class TejedaBehavior(TejedaDataDirectory):
         nbid: str,
         tree_id: str,
         tree_name: str,
-        parent_experiment: ET.Element,
+        parent_experiment: TreeNode,
+        cohort_nodes: Union[list[TreeNode], None] = None,
     ):
         super().__init__(
             data_dir_root_dir,
@@ -77,15 +103,9 @@ class TejedaBehavior(TejedaDataDirectory):
             tree_id,
             tree_name,
             parent_experiment,
+            cohort_nodes,
         )
 
-    def create_cohorts(self):
-        for cohort in self.cohorts:
-            cohort_dir = self.data_dir_root_dir.joinpath(cohort)
-            cohort_dir.mkdir(exist_ok=True)
-            videos_dir = cohort_dir.joinpath("Videos")
-            videos_dir.mkdir(exist_ok=True)
-
 
 class TejedaPhotometry(TejedaDataDirectory):
     """
@@ -93,6 +113,8 @@ class TejedaPhotometry(TejedaDataDirectory):
     compare to LabArchive entry.
     """
 
+    cohort_subdirs: list[str] = ["Tanks", "Analysis"]
+
     def __init__(
         self,
         data_dir_root_dir: Path,
@@ -100,7 +122,8 @@ class TejedaPhotometry(TejedaDataDirectory):
         nbid: str,
         tree_id: str,
         tree_name: str,
-        parent_experiment: ET.Element,
+        parent_experiment: TreeNode,
+        cohort_nodes: Union[list[TreeNode], None] = None,
     ):
         super().__init__(
             data_dir_root_dir,
@@ -109,16 +132,17 @@ class TejedaPhotometry(TejedaDataDirectory):
             tree_id,
             tree_name,
             parent_experiment,
+            cohort_nodes,
         )
 
-    def create_cohorts(self):
-        for cohort in self.cohorts:
-            cohort_dir = self.data_dir_root_dir.joinpath(cohort)
-            cohort_dir.mkdir(exist_ok=True)
-            tanks_dir = cohort_dir.joinpath("Tanks")
-            tanks_dir.mkdir(exist_ok=True)
-            analysis_dir = cohort_dir.joinpath("Analysis")
-            analysis_dir.mkdir(exist_ok=True)
+
+DATA_DIRECTORY_CLASSES: dict[str, type[TejedaDataDirectory]] = {
+    "Behavior": TejedaBehavior,
+    "Histology": TejedaDataDirectory,
+    "Metadata": TejedaDataDirectory,
+    "Photometry": TejedaPhotometry,
+    "Surgeries": TejedaDataDirectory,
+}
 
 
 class TejedaExperiment:
@@ -132,18 +156,25 @@ class TejedaExperiment:
         experiment_root_dir: Path,
         client: LAClient,
         nbid: str,
-        experiment: ET.Element,
+        experiment: TreeNode,
         make_method: Literal["All", "Existing"],
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
     ):
+        """
+        Args:
+            experiment_root_dir: Local directory of the experiment
+            client: Authenticated client
+            nbid: Notebook ID of the experiment
+            experiment: Folder node of the experiment
+            make_method: "All" creates every data directory, "Existing"
+                only those found in LabArchives
+            max_workers: Maximum number of concurrent tree requests
+        """
         self.experiment_root_dir = experiment_root_dir
         self.client = client
         self.nbid = nbid
         self.experiment = experiment
-        tree_id: str | None = self.experiment.findtext("tree-id")
-        if isinstance(tree_id, str):
-            self.tree_id = tree_id
-        else:
-            raise ValueError("No tree-id found for experiment")
+        self.tree_id: str = self.experiment.tree_id
         self.make_method = make_method
         self.first_level_dirs = [
             "Behavior",
@@ -152,85 +183,73 @@ class TejedaExperiment:
             "Photometry",
             "Surgeries",
         ]
-        self.dir_nodes: list[ET.Element] = self.client.get_dir_nodes(
-            self.nbid, self.tree_id
+        # the experiment level and every data directory below it in two
+        # rounds of concurrent requests
+        levels: dict[str, list[TreeNode]] = self.client.crawl_levels(
+            self.nbid, self.experiment, max_workers=max_workers, max_depth=2
         )
+        self.dir_nodes: list[TreeNode] = [
+            node
+            for node in levels.get(self.tree_id, [])
+            if not node.is_page
+        ]
 
-        # TODO: iterate over the dir_nodes and create the subclasses
-        # for each type of subdirectory
         self.behavior: TejedaBehavior | None = None
         self.histology: TejedaDataDirectory | None = None
         self.metadata: TejedaDataDirectory | None = None
         self.photometry: TejedaPhotometry | None = None
         self.surgeries: TejedaDataDirectory | None = None
         for node in self.dir_nodes:
-            name: str | None = node.findtext("display-text")
-            if isinstance(name, str):
-                if name.capitalize() == "Behavior":
-                    behavior_tree_id: str | None = node.findtext("tree-id")
-                    if isinstance(behavior_tree_id, str):
-                        self.behavior = TejedaBehavior(
-                            data_dir_root_dir=self.experiment_root_dir.joinpath(
-                                "Behavior"
-                            ),
-                            client=self.client,
-                            nbid=self.nbid,
-                            tree_id=behavior_tree_id,
-                            tree_name=name,
-                            parent_experiment=self.experiment,
-                        )
-                elif name.capitalize() == "Histology":
-                    histology_tree_id: str | None = node.findtext("tree-id")
-                    if isinstance(histology_tree_id, str):
-                        self.histology = TejedaDataDirectory(
-                            data_dir_root_dir=self.experiment_root_dir.joinpath(
-                                "Histology"
-                            ),
-                            client=self.client,
-                            nbid=self.nbid,
-                            tree_id=histology_tree_id,
-                            tree_name=name,
-                            parent_experiment=self.experiment,
-                        )
-                elif name.capitalize() == "Metadata":
-                    metadata_tree_id: str | None = node.findtext("tree-id")
-                    if isinstance(metadata_tree_id, str):
-                        self.metadata = TejedaDataDirectory(
-                            data_dir_root_dir=self.experiment_root_dir.joinpath(
-                                "Metadata"
-                            ),
-                            client=self.client,
-                            nbid=self.nbid,
-                            tree_id=metadata_tree_id,
-                            tree_name=name,
-                            parent_experiment=self.experiment,
-                        )
-                elif name.capitalize() == "Photometry":
-                    photometry_tree_id: str | None = node.findtext("tree-id")
-                    if isinstance(photometry_tree_id, str):
-                        self.photometry = TejedaPhotometry(
-                            data_dir_root_dir=self.experiment_root_dir.joinpath(
-                                "Photometry"
-                            ),
-                            client=self.client,
-                            nbid=self.nbid,
-                            tree_id=photometry_tree_id,
-                            tree_name=name,
-                            parent_experiment=self.experiment,
-                        )
-                elif name.capitalize() == "Surgeries":
-                    surgeries_tree_id: str | None = node.findtext("tree-id")
-                    if isinstance(surgeries_tree_id, str):
-                        self.surgeries = TejedaDataDirectory(
-                            data_dir_root_dir=self.experiment_root_dir.joinpath(
-                                "Surgeries"
-                            ),
-                            client=self.client,
-                            nbid=self.nbid,
-                            tree_id=surgeries_tree_id,
-                            tree_name=name,
-                            parent_experiment=self.experiment,
-                        )
+            name: str = node.display_text.capitalize()
+            if name not in DATA_DIRECTORY_CLASSES:
+                continue
+            setattr(
+                self,
+                name.lower(),
+                DATA_DIRECTORY_CLASSES[name](
+                    data_dir_root_dir=self.experiment_root_dir.joinpath(
+                        name
+                    ),
+                    client=self.client,
+                    nbid=self.nbid,
+                    tree_id=node.tree_id,
+                    tree_name=node.display_text,
+                    parent_experiment=self.experiment,
+                    cohort_nodes=[
+                        child
+                        for child in levels.get(node.tree_id, [])
+                        if not child.is_page
+                    ],
+                ),
+            )
+
+    def _first_level_dirs(self) -> list[str]:
+        """
+        The data directories to create for make_method.
+
+        Raises:
+            Warning: If make_method is "Existing" and the experiment has no
+                folders
+            ValueError: If a folder of the experiment is not a known data
+                directory
+        """
+        if self.make_method == "All":
+            return list(self.first_level_dirs)
+        if len(self.dir_nodes) == 0:
+            raise Warning(
+                "No directory nodes found. No subdirectories will be"
+                + " created."
+            )
+        names: list[str] = []
+        for node in self.dir_nodes:
+            name: str = node.display_text
+            if name.capitalize() not in self.first_level_dirs:
+                raise ValueError(
+                    f"Invalid subdirectory name: {name}"
+                    + " Please correct in LabArchives"
+                )
+            names.append(name.capitalize())
+        return names
 
     def create_experiment_dirs(self: "TejedaExperiment"):
         """
@@ -239,29 +258,37 @@ class TejedaExperiment:
         assert (
             self.experiment_root_dir.exists()
         ), "Experiment root directory does not exist"
-        if self.make_method == "All":
-            for subdir in self.first_level_dirs:
-                subdir_path = self.experiment_root_dir / subdir
-                subdir_path.mkdir(exist_ok=True)
-        elif self.make_method == "Existing":
-            if len(self.dir_nodes) == 0:
-                raise Warning(
-                    "No directory nodes found. No subdirectories will be"
-                    + " created."
+        for subdir in self._first_level_dirs():
+            subdir_path = self.experiment_root_dir / subdir
+            subdir_path.mkdir(exist_ok=True)
+
+    def desired_directories(self) -> list[str]:
+        """
+        Every directory of the experiment, relative to experiment_root_dir:
+        the data directories, their cohorts and the cohort subdirectories.
+        """
+        directories: list[str] = []
+        for name in self._first_level_dirs():
+            directories.append(name)
+            data_dir: Union[TejedaDataDirectory, None] = getattr(
+                self, name.lower()
+            )
+            if data_dir is not None:
+                directories.extend(
+                    f"{name}/{path}"
+                    for path in data_dir.desired_directories()
                 )
-            else:
-                for node in self.dir_nodes:
-                    name: str | None = node.findtext("display-text")
-                    if isinstance(name, str):
-                        if name.capitalize() in self.first_level_dirs:
-                            subdir_path = self.experiment_root_dir.joinpath(
-                                name.capitalize()
-                            )
-                            subdir_path.mkdir(exist_ok=True)
-                        else:
-                            raise ValueError(
-                                f"Invalid subdirectory name: {name}"
-                                + " Please correct in LabArchives"
-                            )
-                    else:
-                        raise ValueError(f"No display-text for node: {node}")
+        return directories
+
+    def plan(self, max_workers: int = DEFAULT_SCAN_WORKERS) -> MaterializePlan:
+        """
+        Compare the local experiment directory to LabArchives.
+
+        The local tree is scanned once. The plan's report is a dry run,
+        and MaterializePlan.apply creates only the missing directories.
+        """
+        return MaterializePlan.scan(
+            self.experiment_root_dir,
+            self.desired_directories(),
+            max_workers=max_workers,
+        )
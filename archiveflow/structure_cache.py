@@ -0,0 +1,160 @@
+import threading
+import time
+from collections import OrderedDict
+from typing import Callable, Union
+
+from .cache import DEFAULT_TTL
+from .singleflight import SingleFlight
+from .tree import TreeNode, rebase_level
+
+DEFAULT_MAX_NOTEBOOKS: int = 64
+
+
+class NotebookStructureCache:
+    """
+    Process-wide in-memory cache of parsed notebook tree levels.
+
+    Levels are kept per (uid, nbid), so a user only ever gets levels that
+    were fetched with their own permissions, and every client of the
+    process shares them, e.g. all sessions of a Streamlit server through
+    st.cache_resource. Levels expire ttl seconds after they were fetched
+    and the least recently used notebooks are evicted once more than
+    max_notebooks are held. Concurrent misses on the same level wait for
+    the first one to fetch it instead of sending their own request.
+    """
+
+    def __init__(
+        self,
+        ttl: float = DEFAULT_TTL,
+        max_notebooks: int = DEFAULT_MAX_NOTEBOOKS,
+    ) -> None:
+        """
+        Args:
+            ttl: Seconds a level stays fresh
+            max_notebooks: Maximum number of (uid, nbid) structures kept
+        """
+        self.ttl = ttl
+        self.max_notebooks = max_notebooks
+        self.hits: int = 0
+        self.misses: int = 0
+        self._lock: threading.Lock = threading.Lock()
+        # least recently used notebook first
+        self._notebooks: OrderedDict[
+            tuple[str, str], dict[str, tuple[list[TreeNode], float]]
+        ] = OrderedDict()
+        self._flight: SingleFlight = SingleFlight()
+
+    @property
+    def coalesced(self) -> int:
+        """Number of misses that waited for another thread's fetch."""
+        return self._flight.shared
+
+    def _lookup(
+        self, uid: str, nbid: str, parent_tree_id: str
+    ) -> Union[list[TreeNode], None]:
+        # called with the lock held
+        levels = self._notebooks.get((uid, nbid))
+        if levels is None or parent_tree_id not in levels:
+            return None
+        nodes, stored_at = levels[parent_tree_id]
+        if time.time() - stored_at > self.ttl:
+            del levels[parent_tree_id]
+            return None
+        self._notebooks.move_to_end((uid, nbid))
+        return nodes
+
+    def get(
+        self, uid: str, nbid: str, parent: TreeNode
+    ) -> Union[list[TreeNode], None]:
+        """
+        Return the cached level below parent, or None if it is missing or
+        stale.
+        """
+        with self._lock:
+            nodes = self._lookup(uid, nbid, parent.tree_id)
+            if nodes is None:
+                self.misses += 1
+                return None
+            self.hits += 1
+        return rebase_level(nodes, parent)
+
+    def load(
+        self,
+        uid: str,
+        nbid: str,
+        parent: TreeNode,
+        fetch: Callable[[], list[TreeNode]],
+    ) -> list[TreeNode]:
+        """
+        Return the level below parent, calling fetch to get it unless it is
+        cached or another thread is already fetching it.
+
+        Raises:
+            Exception: Whatever fetch raised, also in the waiting threads
+        """
+        key: tuple[str, str, str] = (uid, nbid, parent.tree_id)
+
+        def fetch_and_store() -> list[TreeNode]:
+            # a fetch may have finished since the lookup below
+            with self._lock:
+                nodes: Union[list[TreeNode], None] = self._lookup(*key)
+            if nodes is None:
+                nodes = fetch()
+                with self._lock:
+                    self._store(uid, nbid, parent.tree_id, nodes)
+            return nodes
+
+        with self._lock:
+            nodes: Union[list[TreeNode], None] = self._lookup(*key)
+        if nodes is None:
+            nodes = self._flight.do(key, fetch_and_store)
+        return rebase_level(nodes, parent)
+
+    def _store(
+        self,
+        uid: str,
+        nbid: str,
+        parent_tree_id: str,
+        nodes: list[TreeNode],
+    ) -> None:
+        # called with the lock held
+        levels = self._notebooks.setdefault((uid, nbid), {})
+        levels[parent_tree_id] = (nodes, time.time())
+        self._notebooks.move_to_end((uid, nbid))
+        while len(self._notebooks) > self.max_notebooks:
+            self._notebooks.popitem(last=False)
+
+    def invalidate(
+        self,
+        uid: str,
+        nbid: str,
+        parent_tree_id: Union[str, None] = None,
+    ) -> None:
+        """
+        Drop one cached level, or every level of a notebook if
+        parent_tree_id is None.
+        """
+        with self._lock:
+            if parent_tree_id is None:
+                self._notebooks.pop((uid, nbid), None)
+            else:
+                self._notebooks.get((uid, nbid), {}).pop(
+                    parent_tree_id, None
+                )
+
+    def clear(self) -> None:
+        with self._lock:
+            self._notebooks.clear()
+
+    def __len__(self) -> int:
+        with self._lock:
+            return sum(len(levels) for levels in self._notebooks.values())
+
+    def stats(self) -> dict[str, int]:
+        return {
+            "hits": self.hits,
+            "misses": self.misses,
+            "coalesced": self.coalesced,
+            "notebooks": len(self._notebooks),
+            "size": len(self),
+        }
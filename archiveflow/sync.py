@@ -0,0 +1,327 @@
+import json
+import os
+import time
+from concurrent.futures import ThreadPoolExecutor
+from io import BytesIO
+from pathlib import Path
+from typing import Any, Union
+from xml.etree import ElementTree as ET
+
+from requests import RequestException, Response
+
+from .api import DEFAULT_CRAWL_WORKERS, LAClient
+from .index import NotebookIndex
+from .tree import NODE_STAMP_TAGS, TreeNode, root_node
+
+MANIFEST_VERSION: int = 1
+# get_entries_for_page elements that change whenever an entry is modified
+ENTRY_STAMP_TAGS: list[str] = ["updated-at", "version"]
+
+
+def parse_node_stamp(content: bytes) -> Union[str, None]:
+    """
+    Get the modification stamp of a node from a get_node response.
+
+    Returns:
+        str | None: The first NODE_STAMP_TAGS value found, None if the
+        response carries no modification stamp.
+    """
+    root: ET.Element = ET.parse(BytesIO(content)).getroot()
+    for tag in NODE_STAMP_TAGS:
+        stamp: Union[str, None] = root.findtext(f".//{tag}")
+        if stamp:
+            return stamp
+    return None
+
+
+def parse_attachment_uploaded_at(content: bytes) -> Union[str, None]:
+    """
+    Get the last upload time from an attachment_last_uploaded_at response.
+    """
+    root: ET.Element = ET.parse(BytesIO(content)).getroot()
+    for element in root.iter():
+        if element.tag.endswith("uploaded-at") and element.text:
+            return element.text
+    return None
+
+
+def _checked_content(response: Response) -> bytes:
+    # an error body would parse as a page without entries or stamps
+    response.raise_for_status()
+    return response.content
+
+
+def parse_entry_listing(content: bytes) -> list[dict[str, Any]]:
+    """
+    Parse a get_entries_for_page response into entry summaries.
+
+    Returns:
+        list[dict[str, Any]]: One dict per entry with its "eid",
+        "part_type" and "stamp" (joined ENTRY_STAMP_TAGS values)
+    """
+    root: ET.Element = ET.parse(BytesIO(content)).getroot()
+    listing: list[dict[str, Any]] = []
+    for entry in root.iter("entry"):
+        eid: Union[str, None] = entry.findtext("eid")
+        if eid is None:
+            raise ValueError("Entry is missing eid element!")
+        listing.append(
+            {
+                "eid": eid,
+                "part_type": entry.findtext("part-type"),
+                "stamp": "|".join(
+                    entry.findtext(tag) or "" for tag in ENTRY_STAMP_TAGS
+                ),
+            }
+        )
+    return listing
+
+
+class SyncManifest:
+    """
+    Local record of the pages and entries seen by the last sync.
+
+    The manifest maps each page tree_id to its full_path, its node stamp
+    and the stamp of every entry on it, and is stored as JSON.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.pages: dict[str, dict[str, Any]] = {}
+        self.synced_at: Union[float, None] = None
+        if self.path.exists():
+            with open(self.path) as f:
+                manifest: dict[str, Any] = json.load(f)
+            if manifest.get("version") != MANIFEST_VERSION:
+                raise ValueError(
+                    f"Unsupported sync manifest version in {self.path}"
+                )
+            self.pages = manifest["pages"]
+            self.synced_at = manifest["synced_at"]
+
+    def save(self) -> None:
+        """
+        Write the manifest, replacing the previous one atomically.
+        """
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmp_path: Path = self.path.with_suffix(self.path.suffix + ".tmp")
+        with open(tmp_path, "w") as f:
+            json.dump(
+                {
+                    "version": MANIFEST_VERSION,
+                    "synced_at": self.synced_at,
+                    "pages": self.pages,
+                },
+                f,
+            )
+        os.replace(tmp_path, self.path)
+
+
+class PageChanges:
+    """
+    Entries of one page that changed since the last sync.
+
+    Attributes:
+        tree_id: Tree id of the page
+        full_path: full_path of the page
+        changed: eids of new or modified entries
+        removed: eids of entries no longer on the page
+        response: get_entries_for_page response with entry data, None if
+            only removals happened
+    """
+
+    def __init__(
+        self,
+        tree_id: str,
+        full_path: str,
+        changed: list[str],
+        removed: list[str],
+        response: Union[Response, None],
+    ) -> None:
+        self.tree_id = tree_id
+        self.full_path = full_path
+        self.changed = changed
+        self.removed = removed
+        self.response = response
+
+
+# tree_id, new manifest record and changes of one synced page
+PageSync = tuple[str, dict[str, Any], Union[PageChanges, None]]
+
+
+class SyncResult:
+    def __init__(self) -> None:
+        self.changed_pages: list[PageChanges] = []
+        self.removed_pages: list[str] = []
+        self.unchanged_pages: int = 0
+        # tree_id of each page that could not be synced, and why
+        self.failed_pages: dict[str, str] = {}
+
+
+class NotebookSync:
+    """
+    Incremental sync of a notebook (or subtree) against a SyncManifest.
+
+    Pages whose modification stamp is unchanged are skipped outright. The
+    stamp is taken from the crawled node record when its tree level
+    carries one, so such pages cost no request at all, and from get_node
+    otherwise. For the other pages the entry listing is compared with the
+    manifest, using get_attachment_last_uploaded_time for attachments, and
+    entry data is only downloaded for pages with new or modified entries.
+    """
+
+    def __init__(
+        self,
+        client: LAClient,
+        manifest: Union[SyncManifest, Path, str],
+        max_workers: int = DEFAULT_CRAWL_WORKERS,
+    ) -> None:
+        self.client = client
+        self.manifest: SyncManifest = (
+            manifest
+            if isinstance(manifest, SyncManifest)
+            else SyncManifest(manifest)
+        )
+        self.max_workers = max_workers
+
+    def _sync_page(self, nbid: str, page: TreeNode) -> PageSync:
+        tree_id: str = page.tree_id
+        full_path: str = page.full_path
+        known: dict[str, Any] = self.manifest.pages.get(
+            tree_id, {"node_stamp": None, "entries": {}}
+        )
+        node_stamp: Union[str, None] = page.stamp
+        if node_stamp is None:
+            node_stamp = parse_node_stamp(
+                _checked_content(self.client.get_node_data(nbid, tree_id))
+            )
+        if node_stamp is not None and node_stamp == known["node_stamp"]:
+            return tree_id, known, None
+        listing: list[dict[str, Any]] = parse_entry_listing(
+            _checked_content(self.client.get_entries_for_page(nbid, tree_id))
+        )
+        entries: dict[str, str] = {}
+        changed: list[str] = []
+        for entry in listing:
+            stamp: str = entry["stamp"]
+            if entry["part_type"] == "Attachment":
+                uploaded_at: Union[str, None] = parse_attachment_uploaded_at(
+                    _checked_content(
+                        self.client.get_attachment_last_uploaded_time(
+                            entry["eid"]
+                        )
+                    )
+                )
+                stamp += f"|{uploaded_at or ''}"
+            entries[entry["eid"]] = stamp
+            if known["entries"].get(entry["eid"]) != stamp:
+                changed.append(entry["eid"])
+        removed: list[str] = [
+            eid for eid in known["entries"] if eid not in entries
+        ]
+        record: dict[str, Any] = {
+            "full_path": full_path,
+            "node_stamp": node_stamp,
+            "entries": entries,
+        }
+        if not changed and not removed:
+            return tree_id, record, None
+        response: Union[Response, None] = None
+        if changed:
+            response = self.client.get_entries_for_page(
+                nbid, tree_id, entry_data=True
+            )
+            response.raise_for_status()
+        return (
+            tree_id,
+            record,
+            PageChanges(tree_id, full_path, changed, removed, response),
+        )
+
+    def sync(
+        self,
+        nbid: str,
+        tree_id: str = "0",
+        tree_name: str = "root",
+        parent_tree_name: str = "",
+        index: Union[NotebookIndex, None] = None,
+    ) -> SyncResult:
+        """
+        Sync the pages below tree_id and update the manifest.
+
+        Args:
+            nbid (str): Notebook ID to sync
+            tree_id (str): Tree ID of the subtree to sync, "0" for the
+                whole notebook
+            tree_name (str): Display name of the subtree root
+            parent_tree_name (str): full_path of the subtree root's parent
+            index (NotebookIndex, optional): Index of the notebook whose
+                node records are used instead of crawling the subtree
+
+        Pages whose requests fail are reported in failed_pages and keep
+        their previous manifest record, so the next sync retries them.
+
+        Returns:
+            SyncResult: The pages with changed or removed entries, the
+            pages removed from the notebook since the last sync and the
+            pages that could not be synced
+
+        Raises:
+            ValueError: If index does not hold tree_id
+        """
+        full_path: str = root_node(
+            tree_id, tree_name, parent_tree_name
+        ).full_path
+        pages: list[TreeNode]
+        if index is not None:
+            subtree_root: Union[TreeNode, None] = index.get(tree_id)
+            if subtree_root is None:
+                raise ValueError(f"Tree ID {tree_id} is not in the index")
+            full_path = subtree_root.full_path
+            pages = [
+                page
+                for page in index.pages
+                if page.full_path.startswith(full_path + "/")
+            ]
+        else:
+            pages = self.client.get_all_pages(
+                nbid,
+                tree_id,
+                tree_name,
+                parent_tree_name,
+                max_workers=self.max_workers,
+            )
+        started_at: float = time.time()
+        result: SyncResult = SyncResult()
+
+        def sync_page(page: TreeNode) -> Union[PageSync, str]:
+            # a failed page is reported on its own, the sync goes on
+            try:
+                return self._sync_page(nbid, page)
+            except (RequestException, ET.ParseError, ValueError) as e:
+                return f"{type(e).__name__}: {e}"
+
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            synced = list(executor.map(sync_page, pages))
+        seen: set[str] = set()
+        for page, page_result in zip(pages, synced):
+            seen.add(page.tree_id)
+            if isinstance(page_result, str):
+                result.failed_pages[page.tree_id] = page_result
+                continue
+            page_tree_id, record, changes = page_result
+            self.manifest.pages[page_tree_id] = record
+            if changes is None:
+                result.unchanged_pages += 1
+            else:
+                result.changed_pages.append(changes)
+        # only pages inside the synced subtree can have been removed
+        for page_tree_id, record in list(self.manifest.pages.items()):
+            if page_tree_id not in seen and record["full_path"].startswith(
+                full_path + "/"
+            ):
+                result.removed_pages.append(page_tree_id)
+                del self.manifest.pages[page_tree_id]
+        self.manifest.synced_at = started_at
+        self.manifest.save()
+        return result
@@ -0,0 +1,180 @@
+from io import BytesIO
+from typing import Union
+from xml.etree import ElementTree as ET
+
+# node elements that change whenever a page is modified, by preference
+NODE_STAMP_TAGS: list[str] = ["updated-at", "last-modified-at", "version"]
+
+
+class TreeNode:
+    """
+    A folder or page of a notebook tree.
+
+    Attributes:
+        tree_id: LabArchives tree id of the node
+        display_text: Display name of the node
+        is_page: Whether the node is a page rather than a folder
+        full_path: Display names from the crawl root down to the node,
+            joined by "/"
+        parent: The node's parent folder, None for the crawl root
+        stamp: Modification stamp of the node if its tree level carries
+            one (see NODE_STAMP_TAGS), None otherwise
+    """
+
+    __slots__ = (
+        "tree_id",
+        "display_text",
+        "is_page",
+        "full_path",
+        "parent",
+        "stamp",
+    )
+
+    def __init__(
+        self,
+        tree_id: str,
+        display_text: str,
+        is_page: bool,
+        full_path: str,
+        parent: Union["TreeNode", None] = None,
+        stamp: Union[str, None] = None,
+    ) -> None:
+        self.tree_id = tree_id
+        self.display_text = display_text
+        self.is_page = is_page
+        self.full_path = full_path
+        self.parent = parent
+        self.stamp = stamp
+
+    def __repr__(self) -> str:
+        kind: str = "page" if self.is_page else "folder"
+        return f"TreeNode({kind} {self.tree_id}: {self.full_path!r})"
+
+
+def root_node(
+    tree_id: str = "0", tree_name: str = "root", parent_tree_name: str = ""
+) -> TreeNode:
+    """
+    Folder record of the node a listing or crawl starts from.
+    """
+    full_path: str = (
+        parent_tree_name + "/" + tree_name if parent_tree_name else tree_name
+    )
+    return TreeNode(tree_id, tree_name, False, full_path)
+
+
+def rebase_level(nodes: list[TreeNode], parent: TreeNode) -> list[TreeNode]:
+    """
+    Copy of a parsed level whose full paths start at parent's full path.
+
+    The same level can be reached from parents with different full paths,
+    e.g. get_dir_nodes(tree_id) and a crawl from the notebook root. The
+    nodes are always new objects linked to parent, so levels shared by
+    caches and coalesced calls never hand one caller's nodes to another.
+    """
+    return [
+        TreeNode(
+            node.tree_id,
+            node.display_text,
+            node.is_page,
+            parent.full_path + "/" + node.display_text,
+            parent,
+            node.stamp,
+        )
+        for node in nodes
+    ]
+
+
+def parse_tree_level(content: bytes, parent: TreeNode) -> list[TreeNode]:
+    """
+    Parse a get_tree_level response body into node records.
+
+    Each level-node is read in a single pass over its child elements, and
+    nothing of the XML tree is kept once the records are built.
+
+    Args:
+        content: get_tree_level response body
+        parent: Folder whose level was fetched
+
+    Returns:
+        list[TreeNode]: Every node with display text, in response order
+
+    Raises:
+        ValueError: If a node is missing its tree-id, is-page or
+        display-text element, or has an unknown is-page value
+    """
+    root: ET.Element = ET.parse(BytesIO(content)).getroot()
+    nodes: list[TreeNode] = []
+    for level_node in root.iter("level-node"):
+        tree_id: Union[ET.Element, None] = None
+        display_text: Union[ET.Element, None] = None
+        is_page: Union[ET.Element, None] = None
+        stamps: dict[str, str] = {}
+        for child in level_node:
+            if child.tag == "tree-id":
+                tree_id = child
+            elif child.tag == "display-text":
+                display_text = child
+            elif child.tag == "is-page":
+                is_page = child
+            elif child.tag in NODE_STAMP_TAGS and child.text:
+                stamps[child.tag] = child.text
+        if tree_id is None:
+            raise ValueError("Node is missing tree-id element")
+        if tree_id.text is None:
+            raise ValueError("Node tree_id has no text!")
+        if is_page is None:
+            raise ValueError("Node is missing is-page element!")
+        if is_page.text is None:
+            raise ValueError("Node is-page element text is missing!")
+        if display_text is None:
+            raise ValueError("Node is missing display text!")
+        name: Union[str, None] = display_text.text
+        if not name:
+            continue
+        if is_page.text not in ("true", "false"):
+            raise ValueError(
+                f"Node: {name} has is-page value of {is_page.text}"
+            )
+        nodes.append(
+            TreeNode(
+                tree_id.text,
+                name,
+                is_page.text == "true",
+                parent.full_path + "/" + name,
+                parent,
+                next(
+                    (stamps[tag] for tag in NODE_STAMP_TAGS if tag in stamps),
+                    None,
+                ),
+            )
+        )
+    return nodes
+
+
+def order_crawl(
+    children: dict[str, list[TreeNode]], tree_id: str
+) -> tuple[list[TreeNode], list[TreeNode]]:
+    """
+    Walk crawled tree levels depth-first from tree_id.
+
+    Args:
+        children: Node records of every expanded folder, keyed by the
+            folder's tree id
+        tree_id: Tree id of the node the crawl started from
+
+    Returns:
+        tuple[list[TreeNode], list[TreeNode]]: pages and folders in
+        notebook order
+    """
+    pages: list[TreeNode] = []
+    folders: list[TreeNode] = []
+    stack: list[TreeNode] = list(reversed(children.get(tree_id, [])))
+    while stack:
+        node: TreeNode = stack.pop()
+        if node.is_page:
+            pages.append(node)
+        else:
+            folders.append(node)
+            stack.extend(reversed(children.get(node.tree_id, [])))
+    return pages, folders
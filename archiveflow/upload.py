@@ -0,0 +1,339 @@
+import json
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
+from pathlib import Path
+from typing import Any, Callable, Iterable, Iterator, Literal, Union
+
+import requests
+from requests import Response
+
+from .api import LAClient
+from .utils import parse_attachment_eid
+
+DEFAULT_UPLOAD_WORKERS: int = 4
+
+UploadStatus = Literal["uploaded", "skipped", "failed"]
+
+
+class UploadJob:
+    """
+    One file to upload as an attachment to a notebook page.
+
+    Attributes:
+        path: File to upload
+        nbid: Notebook ID of the page
+        pid: Tree id of the page
+        filename: Name of the attachment, defaults to the file name
+        caption: Optional caption of the entry
+        change_description: Optional description of the change
+    """
+
+    def __init__(
+        self,
+        path: Union[Path, str],
+        nbid: str,
+        pid: str,
+        filename: Union[str, None] = None,
+        caption: Union[str, None] = None,
+        change_description: Union[str, None] = None,
+    ) -> None:
+        self.path = Path(path)
+        self.nbid = nbid
+        self.pid = pid
+        self.filename: str = filename or self.path.name
+        self.caption = caption
+        self.change_description = change_description
+
+    @property
+    def key(self) -> str:
+        """
+        Journal key of the job. A file modified since it was uploaded gets
+        a new key and is uploaded again.
+        """
+        stat = self.path.stat()
+        return (
+            f"{self.nbid}/{self.pid}/{self.filename}"
+            + f"|{self.path.resolve()}|{stat.st_size}|{stat.st_mtime_ns}"
+        )
+
+    def __repr__(self) -> str:
+        return f"UploadJob({str(self.path)!r} -> {self.nbid}/{self.pid})"
+
+
+class UploadResult:
+    """
+    Outcome of one UploadJob.
+
+    Attributes:
+        job: The job
+        status: "uploaded", "skipped" if the journal already held the job,
+            or "failed"
+        eid: Entry id of the new attachment, if the response held one
+        bytes_sent: Bytes of the file sent
+        seconds: Time spent uploading
+        error: Why the upload failed, None unless it did
+    """
+
+    def __init__(
+        self,
+        job: UploadJob,
+        status: UploadStatus,
+        eid: Union[str, None] = None,
+        bytes_sent: int = 0,
+        seconds: float = 0.0,
+        error: Union[str, None] = None,
+    ) -> None:
+        self.job = job
+        self.status = status
+        self.eid = eid
+        self.bytes_sent = bytes_sent
+        self.seconds = seconds
+        self.error = error
+
+    @property
+    def throughput(self) -> float:
+        """Bytes per second of the upload."""
+        return self.bytes_sent / self.seconds if self.seconds > 0 else 0.0
+
+
+class UploadReport:
+    """
+    Results of a bulk upload with aggregate throughput.
+    """
+
+    def __init__(self, results: list[UploadResult], seconds: float) -> None:
+        self.results = results
+        self.seconds = seconds
+
+    def _with_status(self, status: UploadStatus) -> list[UploadResult]:
+        return [result for result in self.results if result.status == status]
+
+    @property
+    def uploaded(self) -> list[UploadResult]:
+        return self._with_status("uploaded")
+
+    @property
+    def skipped(self) -> list[UploadResult]:
+        return self._with_status("skipped")
+
+    @property
+    def failed(self) -> list[UploadResult]:
+        return self._with_status("failed")
+
+    @property
+    def failed_jobs(self) -> list[UploadJob]:
+        """Jobs to pass to BulkUploader.upload again."""
+        return [result.job for result in self.failed]
+
+    @property
+    def bytes_sent(self) -> int:
+        return sum(result.bytes_sent for result in self.uploaded)
+
+    @property
+    def throughput(self) -> float:
+        """Aggregate bytes per second over the whole batch."""
+        return self.bytes_sent / self.seconds if self.seconds > 0 else 0.0
+
+    def summary(self) -> dict[str, Any]:
+        return {
+            "uploaded": len(self.uploaded),
+            "skipped": len(self.skipped),
+            "failed": len(self.failed),
+            "bytes_sent": self.bytes_sent,
+            "seconds": self.seconds,
+            "throughput": self.throughput,
+        }
+
+
+class UploadJournal:
+    """
+    Append-only JSON lines record of completed uploads.
+
+    Every finished upload is appended and flushed as soon as it completes,
+    so a batch that fails or is interrupted can be retried without sending
+    the finished files again.
+    """
+
+    def __init__(self, path: Union[Path, str]) -> None:
+        self.path = Path(path)
+        self.completed: dict[str, Union[str, None]] = {}
+        self._lock: threading.Lock = threading.Lock()
+        if self.path.exists():
+            with open(self.path) as f:
+                for line in f:
+                    # a crash can leave a partial last line
+                    try:
+                        record: dict[str, Any] = json.loads(line)
+                    except json.JSONDecodeError:
+                        continue
+                    self.completed[record["key"]] = record.get("eid")
+
+    def __contains__(self, key: object) -> bool:
+        return key in self.completed
+
+    def record(self, key: str, eid: Union[str, None]) -> None:
+        with self._lock:
+            self.completed[key] = eid
+            self.path.parent.mkdir(parents=True, exist_ok=True)
+            with open(self.path, "a") as f:
+                f.write(
+                    json.dumps(
+                        {"key": key, "eid": eid, "uploaded_at": time.time()}
+                    )
+                    + "\n"
+                )
+
+
+def directory_jobs(
+    directory: Union[Path, str],
+    nbid: str,
+    pid: str,
+    pattern: str = "*",
+    caption: Union[str, None] = None,
+) -> list[UploadJob]:
+    """
+    One UploadJob per file of a directory matching pattern, sorted by name.
+    """
+    return [
+        UploadJob(path, nbid, pid, caption=caption)
+        for path in sorted(Path(directory).glob(pattern))
+        if path.is_file()
+    ]
+
+
+class BulkUploader:
+    """
+    Uploads many files as attachments over a bounded worker pool.
+
+    Each file is streamed from disk, progress is reported per chunk, and
+    completed uploads are recorded in an optional UploadJournal so that
+    retrying a batch skips the files already sent. If the client has a
+    DedupIndex, files whose content is already attached to their page are
+    skipped as well.
+    """
+
+    def __init__(
+        self,
+        client: LAClient,
+        journal: Union[UploadJournal, Path, str, None] = None,
+        max_workers: int = DEFAULT_UPLOAD_WORKERS,
+        progress: Union[Callable[[UploadJob, int, int], None], None] = None,
+    ) -> None:
+        """
+        Args:
+            client: Authenticated client
+            journal: Journal of completed uploads, or its path
+            max_workers: Maximum number of concurrent uploads
+            progress: Called from the workers with the job, the bytes of
+                its file sent so far and the file size after every chunk
+        """
+        self.client = client
+        self.journal: Union[UploadJournal, None] = (
+            UploadJournal(journal)
+            if isinstance(journal, (Path, str))
+            else journal
+        )
+        self.max_workers = max_workers
+        self.progress = progress
+        self.bytes_sent: int = 0
+        self._lock: threading.Lock = threading.Lock()
+
+    def upload_one(self, job: UploadJob) -> UploadResult:
+        """
+        Upload a single job in the calling thread.
+        """
+        try:
+            key: str = job.key
+            size: int = job.path.stat().st_size
+            if self.journal is not None and key in self.journal:
+                return UploadResult(
+                    job, "skipped", eid=self.journal.completed[key]
+                )
+            # content already attached to the page under another path
+            if self.client.dedup is not None:
+                duplicate = self.client.dedup.lookup(
+                    job.path, job.nbid, job.pid
+                )
+                if duplicate is not None:
+                    return UploadResult(job, "skipped", eid=duplicate[1])
+        except OSError as e:
+            return UploadResult(
+                job, "failed", error=f"{type(e).__name__}: {e}"
+            )
+        sent: int = 0
+
+        def on_chunk(chunk_size: int) -> None:
+            nonlocal sent
+            sent += chunk_size
+            with self._lock:
+                self.bytes_sent += chunk_size
+            if self.progress is not None:
+                self.progress(job, sent, size)
+
+        start: float = time.perf_counter()
+        try:
+            response: Union[Response, None] = self.client.add_attachment(
+                job.path,
+                filename=job.filename,
+                caption=job.caption,
+                nbid=job.nbid,
+                pid=job.pid,
+                change_description=job.change_description,
+                progress=on_chunk,
+            )
+        except (OSError, requests.RequestException) as e:
+            return UploadResult(
+                job,
+                "failed",
+                bytes_sent=sent,
+                seconds=time.perf_counter() - start,
+                error=f"{type(e).__name__}: {e}",
+            )
+        seconds: float = time.perf_counter() - start
+        if response is None:
+            return UploadResult(job, "skipped")
+        if not response.ok:
+            return UploadResult(
+                job,
+                "failed",
+                bytes_sent=sent,
+                seconds=seconds,
+                error=f"HTTP {response.status_code}",
+            )
+        eid: Union[str, None] = parse_attachment_eid(response.content)
+        if self.journal is not None:
+            self.journal.record(key, eid)
+        return UploadResult(job, "uploaded", eid, sent, seconds)
+
+    def iter_upload(self, jobs: Iterable[UploadJob]) -> Iterator[UploadResult]:
+        """
+        Upload jobs concurrently, yielding results as they complete.
+        """
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            futures: list[Future[UploadResult]] = [
+                executor.submit(self.upload_one, job) for job in jobs
+            ]
+            try:
+                for future in as_completed(futures):
+                    yield future.result()
+            finally:
+                for future in futures:
+                    future.cancel()
+
+    def upload(self, jobs: Iterable[UploadJob]) -> UploadReport:
+        """
+        Upload jobs concurrently and wait for all of them.
+
+        Returns:
+            UploadReport: Per-file results, in job order, and aggregate
+            throughput
+        """
+        jobs = list(jobs)
+        start: float = time.perf_counter()
+        by_job: dict[int, UploadResult] = {
+            id(result.job): result for result in self.iter_upload(jobs)
+        }
+        return UploadReport(
+            [by_job[id(job)] for job in jobs], time.perf_counter() - start
+        )
@@ -1,9 +1,91 @@
 import xml.etree.ElementTree as ET
 from io import BytesIO
-from typing import Any, Union
+from pathlib import Path
+from typing import Any, BinaryIO, Callable, Iterator, Union
 
 from requests import Response
 
+STREAM_CHUNK_SIZE: int = 64 * 1024
+
+
+class EmptyResults(Exception):
+    def __init__(self, message: str | None):
+        super().__init__(message)
+
+
+class _ChunkReader:
+    """
+    File-like reader over an iterator of byte chunks, for iterparse.
+
+    read(size) returns at most size bytes, keeping the rest of a chunk for
+    the next call, and b"" only once the chunks are exhausted.
+    """
+
+    def __init__(self, chunks: Iterator[bytes]) -> None:
+        self._chunks = chunks
+        self._buffer: bytes = b""
+
+    def read(self, size: int = -1) -> bytes:
+        if size is None or size < 0:
+            data: bytes = self._buffer + b"".join(self._chunks)
+            self._buffer = b""
+            return data
+        while not self._buffer:
+            chunk: Union[bytes, None] = next(self._chunks, None)
+            if chunk is None:
+                return b""
+            self._buffer = chunk
+        data = self._buffer[:size]
+        self._buffer = self._buffer[size:]
+        return data
+
+
+class ProgressReader:
+    """
+    Streams a binary file as a request body, reporting every chunk read.
+
+    requests sends objects with ``__iter__`` and ``__len__`` as a streamed
+    body with a Content-Length header, so the file is never read into
+    memory as a whole.
+
+    Parameters
+    ----------
+    file : BinaryIO
+        The open file to send, positioned at its start.
+    size : int
+        Number of bytes that will be read from the file.
+    progress : Callable[[int], None]
+        Called with the size of every chunk read.
+    chunk_size : int
+        Size of the chunks yielded when iterated.
+    """
+
+    def __init__(
+        self,
+        file: BinaryIO,
+        size: int,
+        progress: Callable[[int], None],
+        chunk_size: int = STREAM_CHUNK_SIZE,
+    ) -> None:
+        self.file = file
+        self.size = size
+        self.progress = progress
+        self.chunk_size = chunk_size
+
+    def __len__(self) -> int:
+        return self.size
+
+    def read(self, size: int = -1) -> bytes:
+        chunk: bytes = self.file.read(size)
+        if chunk:
+            self.progress(len(chunk))
+        return chunk
+
+    def __iter__(self) -> Iterator[bytes]:
+        while chunk := self.read(self.chunk_size):
+            yield chunk
+
+
 USER_ACCESS_ELEMENTS: list[str] = [
     "id",
     "fullname",
@@ -21,14 +103,16 @@ USER_ACCESS_ELEMENTS: list[str] = [
 NOTEBOOK_ELEMENTS: list[str] = ["id", "name", "is-default"]
 
 
-def parse_user_access_info_response(response: Response) -> dict[str, Any]:
+def parse_user_access_info_response(
+    response: Union[Response, bytes],
+) -> dict[str, Any]:
     """
     Parses the user access information from an XML response.
 
     Parameters
     ----------
-    response : Response
-        The HTTP response object containing the XML data.
+    response : Response | bytes
+        The HTTP response object, or its body, containing the XML data.
 
     Returns
     -------
@@ -50,7 +134,10 @@ def parse_user_access_info_response(response: Response) -> dict[str, Any]:
     `NOTEBOOK_ELEMENTS`.
     """
     user_access: dict[str, Any] = {}
-    tree: ET.ElementTree = ET.parse(BytesIO(response.content))
+    content: bytes = (
+        response if isinstance(response, bytes) else response.content
+    )
+    tree: ET.ElementTree = ET.parse(BytesIO(content))
     root: ET.Element = tree.getroot()
     if root.tag == "users":
         for ua_element in USER_ACCESS_ELEMENTS:
@@ -90,3 +177,88 @@ def parse_user_access_info_response(response: Response) -> dict[str, Any]:
         raise ValueError("Root tag was not 'user' in response!")
 
     return user_access
+
+
+def parse_attachment_eid(content: bytes) -> Union[str, None]:
+    """
+    Entry id of the attachment created by an add_attachment request.
+
+    Parameters
+    ----------
+    content : bytes
+        The add_attachment response body.
+
+    Returns
+    -------
+    str | None
+        The eid, None if the body holds none or is not XML.
+    """
+    try:
+        root: ET.Element = ET.parse(BytesIO(content)).getroot()
+    except ET.ParseError:
+        return None
+    return root.findtext(".//eid")
+
+
+def iter_page_entries(
+    source: Union[Response, Path, bytes],
+) -> Iterator[ET.Element]:
+    """
+    Stream the entry elements of a get_entries_for_page response.
+
+    The XML is parsed incrementally, straight from the response stream when
+    the request was made with ``stream=True``, and each entry element is
+    cleared once the consumer moves on to the next one, so peak memory does
+    not grow with the size of the page.
+
+    Parameters
+    ----------
+    source : Response | Path | bytes
+        The get_entries_for_page response, a saved response file or the
+        response body.
+
+    Yields
+    ------
+    ET.Element
+        Each complete entry element that is a child of the entries element.
+
+    Raises
+    ------
+    EmptyResults
+        If the response reports that no entries were returned.
+    ValueError
+        If the response has no entries element.
+    """
+    if isinstance(source, Response):
+        reader: Any = _ChunkReader(source.iter_content(STREAM_CHUNK_SIZE))
+    elif isinstance(source, bytes):
+        reader = BytesIO(source)
+    else:
+        reader = source
+    # entry-data tags also appear outside of entries, so only entries
+    # that are direct children of the entries element are yielded
+    entries: Union[ET.Element, None] = None
+    depth: int = 0
+    entries_depth: int = -1
+    for event, element in ET.iterparse(reader, events=("start", "end")):
+        if event == "start":
+            depth += 1
+            if element.tag == "entries" and entries is None:
+                entries = element
+                entries_depth = depth
+            continue
+        depth -= 1
+        if element.tag == "total-returned" and element.text == "0":
+            raise EmptyResults(
+                "No entries found in get_entries_for_page response!"
+            )
+        if (
+            element.tag == "entry"
+            and entries is not None
+            and depth == entries_depth
+        ):
+            yield element
+            element.clear()
+            entries.clear()
+    if entries is None:
+        raise ValueError("No entries found in response!")
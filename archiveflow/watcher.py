@@ -0,0 +1,326 @@
+import logging
+import os
+import threading
+import time
+from concurrent.futures import Future, ThreadPoolExecutor
+from fnmatch import fnmatch
+from pathlib import Path
+from typing import Callable, Union
+
+from watchdog.events import FileSystemEvent, FileSystemEventHandler
+from watchdog.observers import Observer
+
+from .index import NotebookIndex
+from .tree import TreeNode
+from .upload import BulkUploader, UploadJob, UploadResult
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_DEBOUNCE: float = 2.0
+DEFAULT_STABLE_SECONDS: float = 5.0
+DEFAULT_WATCH_WORKERS: int = 4
+# partial files written by acquisition software and editors
+DEFAULT_IGNORE_PATTERNS: list[str] = [".*", "*.tmp", "*.part", "*~"]
+
+
+class IndexPageResolver:
+    """
+    Maps a local data file to the LabArchives page it belongs to.
+
+    The local experiment directory mirrors the experiment's folders in the
+    notebook, so a file is attached to the nearest of its parent
+    directories that has a page: the page at that path, or else the first
+    page in the folder at that path. Directories that only exist locally
+    are skipped, e.g. Behavior/Cohort 1/Videos/a.mp4 goes to the page of
+    the folder "<experiment>/Behavior/Cohort 1".
+    """
+
+    def __init__(
+        self, index: NotebookIndex, local_root: Path, experiment_path: str
+    ) -> None:
+        """
+        Args:
+            index: Index of the notebook holding the experiment
+            local_root: Local experiment directory
+            experiment_path: full_path of the experiment folder in index
+        """
+        self.index = index
+        self.local_root = local_root.resolve()
+        self.experiment_path = experiment_path.rstrip("/")
+
+    def __call__(self, path: Path) -> Union[TreeNode, None]:
+        try:
+            parts: tuple[str, ...] = (
+                path.resolve().parent.relative_to(self.local_root).parts
+            )
+        except ValueError:
+            return None
+        for depth in range(len(parts), 0, -1):
+            node: Union[TreeNode, None] = self.index.find_path(
+                "/".join((self.experiment_path,) + parts[:depth])
+            )
+            if node is None:
+                continue
+            if node.is_page:
+                return node
+            for child in self.index.children(node):
+                if child.is_page:
+                    return child
+        return None
+
+
+class _PendingFile:
+    __slots__ = ("changed_at", "size", "mtime_ns")
+
+    def __init__(self, changed_at: float) -> None:
+        self.changed_at = changed_at
+        self.size: int = -1
+        self.mtime_ns: int = -1
+
+
+class _EventHandler(FileSystemEventHandler):
+    def __init__(self, watcher: "DataWatcher") -> None:
+        self.watcher = watcher
+
+    def on_created(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.watcher.touch(Path(os.fsdecode(event.src_path)))
+
+    def on_modified(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.watcher.touch(Path(os.fsdecode(event.src_path)))
+
+    def on_closed(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.watcher.touch(Path(os.fsdecode(event.src_path)))
+
+    def on_moved(self, event: FileSystemEvent) -> None:
+        if not event.is_directory:
+            self.watcher.touch(Path(os.fsdecode(event.dest_path)))
+
+
+class DataWatcher:
+    """
+    Watches a local experiment directory and uploads new data files to
+    their LabArchives pages in the background.
+
+    Bursts of events on a file are coalesced: a file is only considered
+    once no event arrived for debounce seconds, and only uploaded after its
+    size and mtime stayed the same for stable_seconds, so files still being
+    written by an acquisition rig are left alone. Uploads run on a pool of
+    max_workers through a BulkUploader, so its journal and the client's
+    dedup index keep files from being uploaded twice.
+    """
+
+    def __init__(
+        self,
+        uploader: BulkUploader,
+        local_root: Union[Path, str],
+        nbid: str,
+        resolve_page: Callable[[Path], Union[TreeNode, None]],
+        debounce: float = DEFAULT_DEBOUNCE,
+        stable_seconds: float = DEFAULT_STABLE_SECONDS,
+        max_workers: int = DEFAULT_WATCH_WORKERS,
+        ignore_patterns: list[str] = DEFAULT_IGNORE_PATTERNS,
+        on_result: Union[Callable[[UploadResult], None], None] = None,
+    ) -> None:
+        """
+        Args:
+            uploader: Uploads the files, with its journal if it has one
+            local_root: Directory to watch recursively
+            nbid: Notebook ID the pages belong to
+            resolve_page: Returns the page a file is attached to, None to
+                skip the file, e.g. an IndexPageResolver
+            debounce: Seconds without events before a file is checked
+            stable_seconds: Seconds a file's size and mtime must stay the
+                same before it is uploaded
+            max_workers: Maximum number of concurrent uploads
+            ignore_patterns: fnmatch patterns of file names never uploaded
+            on_result: Called from the workers with every upload result
+        """
+        self.uploader = uploader
+        self.local_root = Path(local_root)
+        self.nbid = nbid
+        self.resolve_page = resolve_page
+        self.debounce = debounce
+        self.stable_seconds = stable_seconds
+        self.max_workers = max_workers
+        self.ignore_patterns = ignore_patterns
+        self.on_result = on_result
+        self.results: list[UploadResult] = []
+        self.unresolved: list[Path] = []
+        self._pending: dict[Path, _PendingFile] = {}
+        self._in_flight: set[Path] = set()
+        # files changed again while their upload was running
+        self._requeue: set[Path] = set()
+        self._cond: threading.Condition = threading.Condition()
+        self._stopping: bool = False
+        self._observer: Union[Observer, None] = None  # type: ignore
+        self._executor: Union[ThreadPoolExecutor, None] = None
+        self._thread: Union[threading.Thread, None] = None
+
+    def _ignored(self, path: Path) -> bool:
+        return any(
+            fnmatch(path.name, pattern) for pattern in self.ignore_patterns
+        )
+
+    def touch(self, path: Path) -> None:
+        """
+        Register a change to path, postponing its upload by debounce.
+        """
+        if self._ignored(path):
+            return
+        with self._cond:
+            if path in self._in_flight:
+                self._requeue.add(path)
+                return
+            pending: Union[_PendingFile, None] = self._pending.get(path)
+            if pending is None:
+                self._pending[path] = _PendingFile(time.monotonic())
+            else:
+                pending.changed_at = time.monotonic()
+            self._cond.notify()
+
+    def scan(self) -> None:
+        """
+        Queue every file already in the watched directory, e.g. files
+        written while the watcher was not running.
+        """
+        for directory, _, filenames in os.walk(self.local_root):
+            for filename in filenames:
+                self.touch(Path(directory) / filename)
+
+    def start(self, scan: bool = True) -> "DataWatcher":
+        """
+        Start watching, after queueing the existing files if scan is True.
+        """
+        self._stopping = False
+        self._executor = ThreadPoolExecutor(max_workers=self.max_workers)
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+        self._observer = Observer()
+        self._observer.schedule(
+            _EventHandler(self), str(self.local_root), recursive=True
+        )
+        self._observer.start()
+        if scan:
+            self.scan()
+        return self
+
+    def stop(self, wait: bool = True) -> None:
+        """
+        Stop watching. Files not yet stable are left for the next start,
+        uploads already running are waited for if wait is True.
+        """
+        if self._observer is not None:
+            self._observer.stop()
+            self._observer.join()
+            self._observer = None
+        with self._cond:
+            self._stopping = True
+            self._cond.notify_all()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+        if self._executor is not None:
+            self._executor.shutdown(wait=wait, cancel_futures=not wait)
+            self._executor = None
+
+    def __enter__(self) -> "DataWatcher":
+        return self.start()
+
+    def __exit__(self, *exc_info: object) -> None:
+        self.stop()
+
+    def wait_idle(self, timeout: Union[float, None] = None) -> bool:
+        """
+        Wait until no file is pending or uploading.
+
+        Returns:
+            bool: False if the timeout expired first
+        """
+        with self._cond:
+            return self._cond.wait_for(
+                lambda: not self._pending and not self._in_flight, timeout
+            )
+
+    def _ready(self, path: Path, pending: _PendingFile, now: float) -> bool:
+        # called with the lock held, the stat of a settled file is cheap
+        if now - pending.changed_at < self.debounce:
+            return False
+        try:
+            stat = path.stat()
+        except FileNotFoundError:
+            # deleted or renamed away before it settled
+            del self._pending[path]
+            return False
+        if (stat.st_size, stat.st_mtime_ns) != (
+            pending.size,
+            pending.mtime_ns,
+        ):
+            pending.size, pending.mtime_ns = stat.st_size, stat.st_mtime_ns
+            pending.changed_at = now
+            return False
+        return now - pending.changed_at >= self.stable_seconds
+
+    def _run(self) -> None:
+        tick: float = min(self.debounce, self.stable_seconds) / 4 or 0.05
+        while True:
+            ready: list[Path] = []
+            with self._cond:
+                if self._stopping:
+                    return
+                now: float = time.monotonic()
+                for path, pending in list(self._pending.items()):
+                    if self._ready(path, pending, now):
+                        del self._pending[path]
+                        self._in_flight.add(path)
+                        ready.append(path)
+                # wakes up pending waiters when deleted files were dropped
+                self._cond.notify_all()
+            for path in ready:
+                self._submit(path)
+            with self._cond:
+                if not self._stopping:
+                    self._cond.wait(tick)
+
+    def _submit(self, path: Path) -> None:
+        page: Union[TreeNode, None] = self.resolve_page(path)
+        if page is None or self._executor is None:
+            logger.warning(f"No LabArchives page found for {path}")
+            with self._cond:
+                self.unresolved.append(path)
+                self._done(path)
+            return
+        job: UploadJob = UploadJob(path, self.nbid, page.tree_id)
+        future: Future[UploadResult] = self._executor.submit(
+            self.uploader.upload_one, job
+        )
+        future.add_done_callback(lambda done: self._finished(path, done))
+
+    def _finished(self, path: Path, future: Future[UploadResult]) -> None:
+        if future.cancelled():
+            with self._cond:
+                self._done(path)
+            return
+        exception: Union[BaseException, None] = future.exception()
+        if exception is not None:
+            logger.error(f"Uploading {path} failed: {exception!r}")
+        else:
+            result: UploadResult = future.result()
+            if result.status == "failed":
+                logger.error(f"Uploading {path} failed: {result.error}")
+            with self._cond:
+                self.results.append(result)
+            if self.on_result is not None:
+                self.on_result(result)
+        with self._cond:
+            self._done(path)
+
+    def _done(self, path: Path) -> None:
+        # called with the lock held
+        self._in_flight.discard(path)
+        if path in self._requeue:
+            self._requeue.discard(path)
+            self._pending[path] = _PendingFile(time.monotonic())
+        self._cond.notify_all()
@@ -0,0 +1,32 @@
+from typing import Any, Iterator
+
+import pytest
+
+pytest.importorskip("pytest_benchmark")
+
+
+@pytest.fixture
+def mock_notebook() -> Any:
+    """84 folders 3 levels deep, with 168 pages of 4 behavior forms."""
+    from mock_server import MockNotebook
+
+    return MockNotebook(
+        width=4, depth=3, pages_per_folder=2, entries_per_page=4
+    )
+
+
+@pytest.fixture
+def mock_labarchives(mock_notebook: Any) -> Iterator[Any]:
+    """MockLabArchives adding 2 ms of server latency to every response."""
+    from mock_server import MockLabArchives
+
+    with MockLabArchives(mock_notebook, latency=0.002) as server:
+        yield server
+
+
+@pytest.fixture
+def page_content(mock_client: Any, mock_notebook: Any) -> bytes:
+    """get_entries_for_page body of the first page."""
+    return mock_client.get_entries_for_page(
+        mock_notebook.nbid, mock_notebook.pages[0].tree_id, entry_data=True
+    ).content
@@ -0,0 +1,15 @@
+from archiveflow.api import LAClient
+
+
+def test_bench_get_all_pages(benchmark, mock_client: LAClient, mock_notebook):
+    pages = benchmark(mock_client.get_all_pages, mock_notebook.nbid)
+    assert len(pages) == len(mock_notebook.pages)
+
+
+def test_bench_get_all_pages_sequential(
+    benchmark, mock_client: LAClient, mock_notebook
+):
+    pages = benchmark(
+        mock_client.get_all_pages, mock_notebook.nbid, max_workers=1
+    )
+    assert len(pages) == len(mock_notebook.pages)
@@ -0,0 +1,15 @@
+from archiveflow.behavior_widget import (
+    decode_behavior_forms,
+    parse_behavior_widget,
+)
+
+
+def test_bench_parse_behavior_widget(benchmark, page_content: bytes):
+    results = benchmark(parse_behavior_widget, page_content)
+    assert len(results[0]) == 4
+
+
+def test_bench_decode_behavior_forms(benchmark, page_content: bytes):
+    results = parse_behavior_widget(page_content)
+    batch = benchmark(decode_behavior_forms, [results])
+    assert len(batch) == 4
@@ -0,0 +1,22 @@
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+REPO_ROOT = Path(__file__).resolve().parents[2]
+
+
+def _import_archiveflow() -> None:
+    subprocess.run(
+        [
+            sys.executable,
+            "-c",
+            "import archiveflow.api, archiveflow.pipeline, archiveflow.sync",
+        ],
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        check=True,
+    )
+
+
+def test_bench_import(benchmark):
+    benchmark.pedantic(_import_archiveflow, rounds=5, warmup_rounds=1)
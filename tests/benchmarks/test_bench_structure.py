@@ -0,0 +1,41 @@
+from pathlib import Path
+
+import pytest
+from mock_server import MockNotebook
+
+from archiveflow.api import LAClient
+from archiveflow.structure import TejedaExperiment
+
+COHORTS = {f"Cohort {i}": {"Notes": None} for i in range(1, 6)}
+
+
+@pytest.fixture
+def mock_notebook() -> MockNotebook:
+    """One Tejeda lab experiment with 5 cohorts per data directory."""
+    return MockNotebook.from_tree(
+        {
+            "Experiment 1": {
+                "Behavior": COHORTS,
+                "Histology": COHORTS,
+                "Metadata": COHORTS,
+                "Photometry": COHORTS,
+                "Surgeries": COHORTS,
+            }
+        }
+    )
+
+
+def test_bench_tejeda_experiment(
+    benchmark, mock_client: LAClient, mock_notebook, tmp_path: Path
+):
+    experiment = mock_client.get_dir_nodes(mock_notebook.nbid)[0]
+    result = benchmark(
+        TejedaExperiment,
+        tmp_path,
+        mock_client,
+        mock_notebook.nbid,
+        experiment,
+        "All",
+    )
+    assert result.photometry is not None
+    assert len(result.photometry.cohorts) == 5
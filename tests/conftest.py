@@ -0,0 +1,83 @@
+import pickle
+from pathlib import Path
+from typing import Any, Iterator
+
+import pytest
+
+BEHAVIOR_FORMS_PKL: Path = Path(__file__).parent.parent / "behavior_forms.pkl"
+
+
+def form_pairs_from_decoded(form: Any) -> list[dict[str, Any]]:
+    """Rebuild the form_data name/value pairs of a decoded behavior form."""
+    values: list[Any] = list(form.metadata.values())
+    for table in (form.first_table, form.second_table):
+        values.extend(list(table.columns[1:]))
+        values.extend(value for row in table.values for value in row)
+    values.append(form.notes)
+    return [
+        {"name": name, "value": value}
+        for name, value in zip(form.INPUTS, values)
+    ]
+
+
+@pytest.fixture(scope="session")
+def decoded_behavior_forms() -> list[Any]:
+    """Behavior forms decoded from real LabArchives entries."""
+    with open(BEHAVIOR_FORMS_PKL, "rb") as f:
+        return pickle.load(f)
+
+
+@pytest.fixture(scope="session")
+def behavior_form_entries(
+    decoded_behavior_forms: list[Any],
+) -> list[tuple[int, list[dict[str, Any]]]]:
+    """(form_version, form_data) for every pickled behavior form."""
+    return [
+        (form.FORM_VERSION, form_pairs_from_decoded(form))
+        for form in decoded_behavior_forms
+    ]
+
+
+@pytest.fixture
+def mock_notebook() -> Any:
+    """A small generated notebook, 3 folders wide and 2 levels deep."""
+    from mock_server import MockNotebook
+
+    return MockNotebook()
+
+
+@pytest.fixture
+def mock_labarchives(mock_notebook: Any) -> Iterator[Any]:
+    """A running MockLabArchives server for mock_notebook."""
+    from mock_server import MockLabArchives
+
+    with MockLabArchives(mock_notebook) as server:
+        yield server
+
+
+@pytest.fixture
+def slow_labarchives(mock_notebook: Any) -> Iterator[Any]:
+    """A MockLabArchives server for mock_notebook answering after 50 ms."""
+    from mock_server import MockLabArchives
+
+    with MockLabArchives(mock_notebook, latency=0.05) as server:
+        yield server
+
+
+@pytest.fixture
+def mock_client(mock_labarchives: Any) -> Iterator[Any]:
+    """A logged-in LAClient talking to mock_labarchives."""
+    from mock_server import MOCK_AKID, MOCK_AUTH_CODE, MOCK_EMAIL
+    from mock_server import MOCK_PASSWORD
+
+    from archiveflow.api import LAClient
+    from archiveflow.scheduler import RequestScheduler
+
+    with LAClient(
+        api_url=mock_labarchives.url,
+        access_key_id=MOCK_AKID,
+        access_password=MOCK_PASSWORD,
+        scheduler=RequestScheduler(backoff_base=0.001),
+    ) as client:
+        client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+        yield client
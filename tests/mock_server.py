@@ -0,0 +1,448 @@
+"""
+Local stand-in for the LabArchives API, for offline tests and benchmarks.
+
+MockNotebook generates a notebook tree of configurable width and depth
+whose pages hold behavior form entries, and MockLabArchives serves it over
+HTTP on localhost with the same paths, signatures and XML shapes as the
+real API, plus injectable latency and errors.
+"""
+
+import json
+import random
+import socket
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Union
+from urllib.parse import parse_qs, unquote_plus, urlparse
+from xml.sax.saxutils import escape
+
+from archiveflow.api import generate_signature
+from archiveflow.behavior_widget import BEHAVIOR_FORM_V6, FormLayout
+
+MOCK_AKID: str = "mock-akid"
+MOCK_PASSWORD: str = "mock-password"
+MOCK_UID: str = "mock-uid"
+MOCK_NBID: str = "mock-nbid"
+MOCK_EMAIL: str = "user@example.com"
+MOCK_AUTH_CODE: str = "mock-auth-code"
+MOCK_TIMESTAMP: str = "2024-01-02T03:04:05Z"
+
+# a nested dict of display names, None marks a page
+TreeSpec = dict[str, Union["TreeSpec", None]]
+
+
+class MockNode:
+    def __init__(
+        self,
+        tree_id: str,
+        display_text: str,
+        is_page: bool,
+        parent_tree_id: Union[str, None],
+    ) -> None:
+        self.tree_id = tree_id
+        self.display_text = display_text
+        self.is_page = is_page
+        self.parent_tree_id = parent_tree_id
+        self.children: list[str] = []
+        self.version: int = 1
+
+
+def behavior_form_pairs(
+    layout: FormLayout, seed: int, notes_size: int = 0
+) -> list[dict[str, Any]]:
+    """Synthetic form_data name/value pairs for a form layout."""
+    pairs: list[dict[str, Any]] = [
+        {"name": name, "value": f"{name}-{seed}-{i}"}
+        for i, name in enumerate(layout.inputs)
+    ]
+    pairs[layout.metadata_labels.index("Date")]["value"] = "01/02/2024"
+    pairs[-1]["value"] = "n" * notes_size
+    return pairs
+
+
+def entries_response_xml(forms: list[tuple[int, list[dict[str, Any]]]]):
+    """Build a get_entries_for_page body with one entry per form."""
+    entries: str = ""
+    for i, (version, form_pairs) in enumerate(forms):
+        entry_data: str = json.dumps(
+            {
+                "form_id": 20058,
+                "form_version": version,
+                "form_data": json.dumps(form_pairs),
+            }
+        )
+        entries += (
+            f"<entry><eid>{i}</eid><part-type>widget entry</part-type>"
+            + f"<entry-data>{escape(entry_data)}</entry-data></entry>"
+        )
+    return (
+        "<tree-tools><entries>"
+        + entries
+        + "</entries><results><total-returned>"
+        + str(len(forms))
+        + "</total-returned></results></tree-tools>"
+    ).encode()
+
+
+class MockNotebook:
+    """
+    In-memory notebook tree.
+
+    The generated tree has width folders below the root, width subfolders
+    in every folder down to depth levels, and pages_per_folder pages in
+    every folder. Every page holds entries_per_page behavior form entries
+    whose notes are notes_size characters long.
+    """
+
+    def __init__(
+        self,
+        width: int = 3,
+        depth: int = 2,
+        pages_per_folder: int = 2,
+        entries_per_page: int = 1,
+        notes_size: int = 0,
+        nbid: str = MOCK_NBID,
+        name: str = "Mock Notebook",
+        layout: FormLayout = BEHAVIOR_FORM_V6,
+    ) -> None:
+        self.nbid = nbid
+        self.name = name
+        self.entries_per_page = entries_per_page
+        self.notes_size = notes_size
+        self.layout = layout
+        self.nodes: dict[str, MockNode] = {
+            "0": MockNode("0", "root", False, None)
+        }
+        self._entries: dict[str, bytes] = {}
+        self._next_id: int = 1
+        self._lock: threading.Lock = threading.Lock()
+        self._generate("0", width, depth, pages_per_folder)
+
+    @classmethod
+    def from_tree(cls, spec: TreeSpec, **kwargs: Any) -> "MockNotebook":
+        """Notebook with exactly the folders and pages of spec."""
+        notebook = cls(width=0, **kwargs)
+
+        def add(parent_tree_id: str, children: TreeSpec) -> None:
+            for name, grandchildren in children.items():
+                tree_id = notebook.add_node(
+                    parent_tree_id, name, grandchildren is None
+                )
+                if grandchildren is not None:
+                    add(tree_id, grandchildren)
+
+        add("0", spec)
+        return notebook
+
+    def _generate(
+        self, parent_tree_id: str, width: int, depth: int, pages: int
+    ) -> None:
+        if depth <= 0:
+            return
+        for i in range(width):
+            tree_id = self.add_node(parent_tree_id, f"Folder {i + 1}", False)
+            for j in range(pages):
+                self.add_node(tree_id, f"Page {j + 1}", True)
+            self._generate(tree_id, width, depth - 1, pages)
+
+    def add_node(
+        self, parent_tree_id: str, display_text: str, is_page: bool
+    ) -> str:
+        with self._lock:
+            tree_id: str = str(self._next_id)
+            self._next_id += 1
+            self.nodes[tree_id] = MockNode(
+                tree_id, display_text, is_page, parent_tree_id
+            )
+            self.nodes[parent_tree_id].children.append(tree_id)
+            return tree_id
+
+    @property
+    def pages(self) -> list[MockNode]:
+        return [node for node in self.nodes.values() if node.is_page]
+
+    @property
+    def folders(self) -> list[MockNode]:
+        return [
+            node
+            for node in self.nodes.values()
+            if not node.is_page and node.tree_id != "0"
+        ]
+
+    def tree_level_xml(self, parent_tree_id: str) -> bytes:
+        nodes: str = "".join(
+            "<level-node>"
+            + f"<tree-id>{child.tree_id}</tree-id>"
+            + f"<display-text>{escape(child.display_text)}</display-text>"
+            + f'<is-page type="boolean">{str(child.is_page).lower()}'
+            + "</is-page>"
+            + "</level-node>"
+            for child in map(
+                self.nodes.__getitem__,
+                self.nodes[parent_tree_id].children,
+            )
+        )
+        return (
+            f"<tree-tools><level-nodes>{nodes}</level-nodes></tree-tools>"
+        ).encode()
+
+    def node_xml(self, tree_id: str) -> bytes:
+        node: MockNode = self.nodes[tree_id]
+        return (
+            "<tree-tools><node>"
+            + f"<tree-id>{node.tree_id}</tree-id>"
+            + f"<display-text>{escape(node.display_text)}</display-text>"
+            + f'<is-page type="boolean">{str(node.is_page).lower()}'
+            + "</is-page>"
+            + f"<version>{node.version}</version>"
+            + f"<updated-at>{MOCK_TIMESTAMP}</updated-at>"
+            + "</node></tree-tools>"
+        ).encode()
+
+    def entries_xml(self, page_tree_id: str, entry_data: bool) -> bytes:
+        key: str = f"{page_tree_id}:{entry_data}"
+        if key not in self._entries:
+            entries: str = ""
+            for i in range(self.entries_per_page):
+                eid: str = f"{page_tree_id}-{i}"
+                entries += (
+                    f"<entry><eid>{eid}</eid>"
+                    + "<part-type>widget entry</part-type>"
+                    + "<version>1</version>"
+                    + f"<updated-at>{MOCK_TIMESTAMP}</updated-at>"
+                )
+                if entry_data:
+                    form_data: str = json.dumps(
+                        behavior_form_pairs(
+                            self.layout, i, notes_size=self.notes_size
+                        )
+                    )
+                    entries += (
+                        "<entry-data>"
+                        + escape(
+                            json.dumps(
+                                {
+                                    "form_id": self.layout.form_id,
+                                    "form_version": self.layout.form_version,
+                                    "form_data": form_data,
+                                }
+                            )
+                        )
+                        + "</entry-data>"
+                    )
+                entries += "</entry>"
+            self._entries[key] = (
+                f"<tree-tools><entries>{entries}</entries><results>"
+                + f"<total-returned>{self.entries_per_page}</total-returned>"
+                + "</results></tree-tools>"
+            ).encode()
+        return self._entries[key]
+
+
+def user_access_info_xml(notebook: MockNotebook) -> bytes:
+    return (
+        "<users>"
+        + f"<id>{MOCK_UID}</id>"
+        + "<fullname>Mock User</fullname>"
+        + "<first-name>Mock</first-name>"
+        + "<last-name>User</last-name>"
+        + f"<email>{MOCK_EMAIL}</email>"
+        + "<orcid></orcid>"
+        + '<can-own-notebooks type="boolean">true</can-own-notebooks>'
+        + '<is-a-teacher type="boolean">false</is-a-teacher>'
+        + '<is-a-student type="boolean">false</is-a-student>'
+        + '<is-a-researcher type="boolean">true</is-a-researcher>'
+        + "<suborganization></suborganization>"
+        + "<notebooks><notebook>"
+        + f"<id>{notebook.nbid}</id>"
+        + f"<name>{escape(notebook.name)}</name>"
+        + '<is-default type="boolean">true</is-default>'
+        + "</notebook></notebooks>"
+        + "</users>"
+    ).encode()
+
+
+class MockLabArchives:
+    """
+    HTTP server answering LabArchives API calls for a MockNotebook.
+
+    Args:
+        notebook: Notebook to serve, a default MockNotebook if None
+        latency: Seconds every response is delayed by
+        error_rate: Fraction of requests answered with error_status
+        error_status: HTTP status of injected errors
+        seed: Seed of the error injection
+    """
+
+    def __init__(
+        self,
+        notebook: Union[MockNotebook, None] = None,
+        latency: float = 0.0,
+        error_rate: float = 0.0,
+        error_status: int = 503,
+        seed: int = 0,
+    ) -> None:
+        self.notebook = notebook if notebook is not None else MockNotebook()
+        self.latency = latency
+        self.error_rate = error_rate
+        self.error_status = error_status
+        self.requests: Counter[str] = Counter()
+        self.uploads: list[tuple[dict[str, str], bytes]] = []
+        self._failures: dict[str, list[int]] = {}
+        self._random: random.Random = random.Random(seed)
+        self._lock: threading.Lock = threading.Lock()
+        self._server: Union[ThreadingHTTPServer, None] = None
+
+    @property
+    def url(self) -> str:
+        if self._server is None:
+            raise ValueError("Mock server is not running")
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}"
+
+    def start(self) -> "MockLabArchives":
+        self._server = ThreadingHTTPServer(
+            ("127.0.0.1", 0), _make_handler(self)
+        )
+        self._server.daemon_threads = True
+        threading.Thread(
+            target=self._server.serve_forever,
+            kwargs={"poll_interval": 0.05},
+            daemon=True,
+        ).start()
+        return self
+
+    def stop(self) -> None:
+        if self._server is not None:
+            self._server.shutdown()
+            self._server.server_close()
+            self._server = None
+
+    def __enter__(self) -> "MockLabArchives":
+        return self.start()
+
+    def __exit__(self, *exc_info: Any) -> None:
+        self.stop()
+
+    def fail_next(
+        self, api_method: str, count: int = 1, status: int = 503
+    ) -> None:
+        """Answer the next count calls of api_method with status."""
+        with self._lock:
+            self._failures.setdefault(api_method, []).extend(
+                [status] * count
+            )
+
+    def _injected_error(self, api_method: str) -> Union[int, None]:
+        with self._lock:
+            self.requests[api_method] += 1
+            failures: list[int] = self._failures.get(api_method, [])
+            if failures:
+                return failures.pop(0)
+            if self.error_rate and self._random.random() < self.error_rate:
+                return self.error_status
+        return None
+
+    def handle(
+        self, http_method: str, path: str, body: bytes
+    ) -> tuple[int, bytes]:
+        parsed = urlparse(path)
+        api_method: str = parsed.path.rsplit("/", 1)[-1]
+        params: dict[str, str] = {
+            key: values[0]
+            for key, values in parse_qs(parsed.query).items()
+        }
+        if self.latency:
+            time.sleep(self.latency)
+        status: Union[int, None] = self._injected_error(api_method)
+        if status is not None:
+            return status, b"<error>injected</error>"
+        expected_sig: str = unquote_plus(
+            generate_signature(
+                MOCK_AKID,
+                api_method,
+                int(params.get("expires", "0")),
+                MOCK_PASSWORD,
+            )
+        )
+        if (
+            params.get("akid") != MOCK_AKID
+            or params.get("sig") != expected_sig
+        ):
+            return 401, b"<error>invalid signature</error>"
+        notebook: MockNotebook = self.notebook
+        try:
+            if api_method == "user_access_info":
+                if params.get("password") != MOCK_AUTH_CODE:
+                    return 401, b"<error>invalid auth code</error>"
+                return 200, user_access_info_xml(notebook)
+            if api_method == "get_tree_level":
+                return 200, notebook.tree_level_xml(params["parent_tree_id"])
+            if api_method == "get_node":
+                return 200, notebook.node_xml(params["tree_id"])
+            if api_method == "get_entries_for_page":
+                return 200, notebook.entries_xml(
+                    params["page_tree_id"],
+                    params.get("entry_data") == "true",
+                )
+            if api_method == "insert_node":
+                tree_id = notebook.add_node(
+                    params["parent_tree_id"],
+                    params["display_text"],
+                    params["is_folder"] != "true",
+                )
+                return 200, notebook.node_xml(tree_id)
+            if api_method == "add_attachment" and http_method == "POST":
+                with self._lock:
+                    self.uploads.append((params, body))
+                    eid: str = f"attachment-{len(self.uploads)}"
+                return 200, (
+                    f"<entries><entry><eid>{eid}</eid>"
+                    + "<part-type>Attachment</part-type>"
+                    + f"<created-at>{MOCK_TIMESTAMP}</created-at>"
+                    + "</entry></entries>"
+                ).encode()
+            if api_method == "attachment_last_uploaded_at":
+                return 200, (
+                    f"<entries><entry><eid>{params['eid']}</eid>"
+                    + f"<last-uploaded-at>{MOCK_TIMESTAMP}"
+                    + "</last-uploaded-at></entry></entries>"
+                ).encode()
+        except KeyError as e:
+            return 400, f"<error>unknown {e}</error>".encode()
+        return 404, b"<error>unknown api method</error>"
+
+
+def _make_handler(mock: MockLabArchives) -> type[BaseHTTPRequestHandler]:
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def setup(self) -> None:
+            super().setup()
+            # headers and body are written separately, so without
+            # TCP_NODELAY keep-alive responses stall on delayed ACKs
+            self.connection.setsockopt(
+                socket.IPPROTO_TCP, socket.TCP_NODELAY, 1
+            )
+
+        def _respond(self, body: bytes) -> None:
+            status, content = mock.handle(self.command, self.path, body)
+            self.send_response(status)
+            self.send_header("Content-Type", "text/xml")
+            self.send_header("Content-Length", str(len(content)))
+            self.end_headers()
+            self.wfile.write(content)
+
+        def do_GET(self) -> None:
+            self._respond(b"")
+
+        def do_POST(self) -> None:
+            length: int = int(self.headers.get("Content-Length", 0))
+            self._respond(self.rfile.read(length))
+
+        def log_message(self, format: str, *args: Any) -> None:
+            pass
+
+    return Handler
@@ -1,4 +1,9 @@
-from archiveflow.api import generate_signature
+from pathlib import Path
+
+import pytest
+
+from archiveflow.api import LAClient, generate_signature
+from archiveflow.tree import TreeNode, parse_tree_level, root_node
 
 # from LabArchives API documentation
 test_akid: str = "0234wedkfjrtfd34er"
@@ -18,3 +23,107 @@ def test_generate_signature():
         )
         == test_signature
     )
+
+
+def test_client_uses_pooled_session(tmp_path: Path):
+    cer_filepath = tmp_path / "ca.cer"
+    cer_filepath.touch()
+    client = LAClient(
+        api_url="https://api.example.com",
+        access_key_id=test_akid,
+        access_password=test_access_password,
+        cer_filepath=cer_filepath,
+        pool_maxsize=4,
+    )
+    adapter = client.session.get_adapter("https://api.example.com")
+    assert adapter._pool_maxsize == 4  # type: ignore
+    assert client.session.verify == str(cer_filepath)
+    with client:
+        pass
+    assert len(adapter.poolmanager.pools) == 0  # type: ignore
+
+
+def test_missing_certificate_uses_default_verification(tmp_path: Path):
+    client = LAClient(
+        api_url="https://api.example.com",
+        access_key_id=test_akid,
+        access_password=test_access_password,
+        cer_filepath=tmp_path / "missing.cer",
+    )
+    assert client.session.verify is True
+
+
+class FakeTreeClient(LAClient):
+    """LAClient serving get_tree_level levels from an in-memory tree."""
+
+    def __init__(self, tree: dict[str, list[tuple[str, str, bool]]]):
+        super().__init__(
+            api_url="https://api.example.com",
+            access_key_id=test_akid,
+            access_password=test_access_password,
+        )
+        self.tree = tree
+        self.is_auth = True
+        self.email = "user@example.com"
+
+    def _get_tree_level(self, nbid: str, parent: TreeNode) -> list[TreeNode]:
+        return parse_tree_level(
+            tree_level_xml(self.tree.get(parent.tree_id, [])), parent
+        )
+
+
+def tree_level_xml(nodes: list[tuple[str, str, bool]]) -> bytes:
+    level_nodes: str = "".join(
+        f"<level-node><tree-id>{node_id}</tree-id>"
+        + f"<display-text>{name}</display-text>"
+        + f'<is-page type="boolean">{str(is_page).lower()}</is-page>'
+        + "<user-access><can-read>true</can-read></user-access>"
+        + "</level-node>"
+        for node_id, name, is_page in nodes
+    )
+    return (
+        f"<tree-tools><level-nodes>{level_nodes}</level-nodes></tree-tools>"
+    ).encode()
+
+
+def test_parse_tree_level_builds_records():
+    parent = root_node("7", "Behavior", "root/Exp A")
+    nodes = parse_tree_level(
+        tree_level_xml([("8", "Cohort 1", False), ("9", "", True)]), parent
+    )
+    assert len(nodes) == 1
+    assert nodes[0].tree_id == "8"
+    assert nodes[0].full_path == "root/Exp A/Behavior/Cohort 1"
+    assert nodes[0].parent is parent
+    assert not nodes[0].is_page
+    with pytest.raises(ValueError, match="is-page value"):
+        parse_tree_level(
+            b"<level-nodes><level-node><tree-id>1</tree-id>"
+            + b"<display-text>A</display-text><is-page>yes</is-page>"
+            + b"</level-node></level-nodes>",
+            parent,
+        )
+
+
+def test_crawl_tree_is_depth_first_ordered():
+    client = FakeTreeClient(
+        {
+            "0": [("1", "Exp A", False), ("2", "Notes", True)],
+            "1": [("3", "Behavior", False), ("4", "Summary", True)],
+            "3": [("5", "Cohort 1", True)],
+        }
+    )
+    pages, folders = client.crawl_tree("nb", max_workers=4)
+    assert [page.full_path for page in pages] == [
+        "root/Exp A/Behavior/Cohort 1",
+        "root/Exp A/Summary",
+        "root/Notes",
+    ]
+    assert [folder.tree_id for folder in folders] == ["1", "3"]
+    assert pages[0].parent is folders[1]
+    assert [page.full_path for page in client.get_all_pages("nb")] == [
+        page.full_path for page in pages
+    ]
+    assert [
+        node.display_text for node in client.get_dir_nodes("nb")
+    ] == ["Exp A"]
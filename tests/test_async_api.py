@@ -0,0 +1,126 @@
+import asyncio
+from pathlib import Path
+
+import pytest
+from mock_server import MOCK_AKID, MOCK_AUTH_CODE, MOCK_EMAIL
+from mock_server import MOCK_PASSWORD, MockLabArchives, MockNotebook
+
+from archiveflow.api import LAClient
+from archiveflow.utils import iter_page_entries
+
+aiohttp = pytest.importorskip("aiohttp")
+from archiveflow.async_api import AsyncLAClient  # noqa: E402
+
+
+def async_client(server: MockLabArchives) -> AsyncLAClient:
+    return AsyncLAClient(
+        api_url=server.url,
+        access_key_id=MOCK_AKID,
+        access_password=MOCK_PASSWORD,
+    )
+
+
+def test_async_login(mock_labarchives: MockLabArchives):
+    async def login() -> AsyncLAClient:
+        async with async_client(mock_labarchives) as client:
+            await client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+            return client
+
+    client = asyncio.run(login())
+    assert client.is_auth
+    assert client.ua_info["id"] == "mock-uid"
+
+    async def bad_login() -> None:
+        async with async_client(mock_labarchives) as client:
+            await client.login(auth_code="wrong", email=MOCK_EMAIL)
+
+    with pytest.raises(aiohttp.ClientResponseError, match="401"):
+        asyncio.run(bad_login())
+
+
+def test_async_crawl_matches_client(
+    mock_labarchives: MockLabArchives,
+    mock_notebook: MockNotebook,
+    mock_client: LAClient,
+):
+    async def crawl():
+        async with async_client(mock_labarchives) as client:
+            await client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+            return (
+                await client.crawl_tree(mock_notebook.nbid, max_workers=4),
+                await client.get_dir_nodes(mock_notebook.nbid),
+            )
+
+    (pages, folders), dir_nodes = asyncio.run(crawl())
+    expected_pages, expected_folders = mock_client.crawl_tree(
+        mock_notebook.nbid
+    )
+    assert [page.full_path for page in pages] == [
+        page.full_path for page in expected_pages
+    ]
+    assert [folder.tree_id for folder in folders] == [
+        folder.tree_id for folder in expected_folders
+    ]
+    assert [node.tree_id for node in dir_nodes] == [
+        node.tree_id
+        for node in mock_client.get_dir_nodes(mock_notebook.nbid)
+    ]
+
+
+def test_async_get_entries_for_page(
+    mock_labarchives: MockLabArchives,
+    mock_notebook: MockNotebook,
+    mock_client: LAClient,
+):
+    page_tree_id: str = mock_notebook.pages[0].tree_id
+
+    async def entries() -> bytes:
+        async with async_client(mock_labarchives) as client:
+            await client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+            return await client.get_entries_for_page(
+                mock_notebook.nbid, page_tree_id, entry_data=True
+            )
+
+    content = asyncio.run(entries())
+    assert content == (
+        mock_client.get_entries_for_page(
+            mock_notebook.nbid, page_tree_id, entry_data=True
+        ).content
+    )
+    assert len(list(iter_page_entries(content))) == (
+        mock_notebook.entries_per_page
+    )
+
+
+def test_async_add_attachment(
+    tmp_path: Path, mock_labarchives: MockLabArchives
+):
+    path = tmp_path / "data.csv"
+    path.write_bytes(b"a,b\n1,2\n")
+
+    async def upload() -> bytes:
+        async with async_client(mock_labarchives) as client:
+            await client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+            return await client.add_attachment(path, nbid="nb", pid="7")
+
+    content = asyncio.run(upload())
+    assert b"<eid>attachment-1</eid>" in content
+    [(params, body)] = mock_labarchives.uploads
+    assert (params["filename"], params["pid"]) == ("data.csv", "7")
+    assert body == path.read_bytes()
+
+
+def test_async_missing_certificate_uses_default_verification(
+    tmp_path: Path, mock_labarchives: MockLabArchives
+):
+    async def login() -> bool:
+        async with AsyncLAClient(
+            api_url=mock_labarchives.url,
+            access_key_id=MOCK_AKID,
+            access_password=MOCK_PASSWORD,
+            cer_filepath=tmp_path / "missing.cer",
+        ) as client:
+            await client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+            return client.is_auth
+
+    assert asyncio.run(login())
@@ -0,0 +1,128 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from mock_server import entries_response_xml
+
+from archiveflow.behavior_widget import (
+    BEHAVIOR_FORM_V6,
+    FORM_LAYOUTS,
+    BehaviorFormV6,
+    EmptyResults,
+    FormLayout,
+    decode_behavior_forms,
+    parse_behavior_widget,
+    recontruct_behavior_form,
+    register_form_layout,
+    table_inputs,
+)
+
+
+def test_parse_behavior_widget_round_trip(
+    decoded_behavior_forms: list[Any],
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+    tmp_path: Path,
+):
+    content = entries_response_xml(behavior_form_entries)
+    response_path = tmp_path / "entries.xml"
+    response_path.write_bytes(content)
+    for source in (content, response_path):
+        forms_metadata, forms = parse_behavior_widget(source)
+        assert [meta["form_version"] for meta in forms_metadata] == [
+            version for version, _ in behavior_form_entries
+        ]
+        assert forms == [pairs for _, pairs in behavior_form_entries]
+    for i, expected in enumerate(decoded_behavior_forms):
+        form = recontruct_behavior_form(
+            forms_metadata[i : i + 1], forms[i : i + 1]
+        )
+        assert type(form) is type(expected)
+        assert form.metadata == expected.metadata
+        for table, expected_table in (
+            (form.first_table, expected.first_table),
+            (form.second_table, expected.second_table),
+        ):
+            assert list(table.columns) == list(expected_table.columns)
+            assert table.values.tolist() == expected_table.values.tolist()
+        assert form.notes == expected.notes
+
+
+def test_registered_form_layout_decodes():
+    layout = register_form_layout(
+        FormLayout(
+            form_id=1,
+            form_version=1,
+            metadata={"date": "Date"},
+            first_table_headers=["h1"],
+            first_table=table_inputs(["m1", "m2"], 1, lambda i, j: f"a{i}"),
+            second_table_headers=["h1"],
+            second_table=table_inputs(["m1"], 1, lambda i, j: f"b{i}"),
+        )
+    )
+    values = ["01/01/2025", "Freezing", "M1", 1, "M2", 2, "Time", "M1", 3]
+    form_pairs = [
+        {"name": name, "value": value}
+        for name, value in zip(layout.inputs, values + ["ok"])
+    ]
+    form = recontruct_behavior_form(
+        [{"form_id": 1, "form_version": 1}], [form_pairs]
+    )
+    assert form.metadata == {"Date": "01/01/2025"}
+    assert form.first_table.values.tolist() == [["M1", 1], ["M2", 2]]
+    assert list(form.second_table.columns) == ["Mouse", "Time"]
+    assert form.notes == "ok"
+    assert (form.FORM_ID, form.FORM_VERSION) == (1, 1)
+    with pytest.raises(ValueError, match="do not match"):
+        recontruct_behavior_form(
+            [{"form_id": 1, "form_version": 1}], [form_pairs[1:]]
+        )
+    del FORM_LAYOUTS[layout.key]
+
+
+def test_form_class_attributes():
+    assert BehaviorFormV6.FORM_ID == 20058
+    assert BehaviorFormV6.FORM_VERSION == 6
+    assert BehaviorFormV6.INPUTS == BEHAVIOR_FORM_V6.inputs
+    assert BehaviorFormV6.FORM_METADATA["date_date"] == "Date"
+
+
+def test_parse_behavior_widget_empty_results():
+    content = (
+        b"<tree-tools><entries/><results>"
+        + b"<total-returned>0</total-returned></results></tree-tools>"
+    )
+    with pytest.raises(EmptyResults):
+        parse_behavior_widget(content)
+
+
+def test_decode_behavior_forms_batch(
+    decoded_behavior_forms: list[Any],
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+):
+    content = entries_response_xml(behavior_form_entries)
+    # the same page decoded twice as two results
+    batch = decode_behavior_forms(
+        [parse_behavior_widget(content), parse_behavior_widget(content)]
+    )
+    num_forms = len(decoded_behavior_forms)
+    assert len(batch) == 2 * num_forms
+    # eids are unique per page, the forms are grouped by layout
+    form = decoded_behavior_forms[3]
+    metadata = batch.metadata[batch.metadata["form_key"] == "3"]
+    assert len(metadata) == 2
+    assert metadata.iloc[0]["Experiment"] == form.metadata["Experiment"]
+    assert metadata.iloc[0]["Notes"] == form.notes
+    first_table = batch.first_table[batch.first_table["form_key"] == "3"]
+    rows, cols = form.first_table.shape
+    assert len(first_table) == 2 * rows * (cols - 1)
+    first_copy = first_table.iloc[: rows * (cols - 1)]
+    values = first_copy["value"].to_numpy(dtype=object)
+    assert values.reshape(rows, cols - 1).tolist() == (
+        form.first_table.values[:, 1:].tolist()
+    )
+    assert first_copy["Mouse"].values[:: cols - 1].tolist() == (
+        form.first_table["Mouse"].tolist()
+    )
+    assert first_copy["column"].values[: cols - 1].tolist() == list(
+        form.first_table.columns[1:]
+    )
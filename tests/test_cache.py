@@ -0,0 +1,42 @@
+import time
+from pathlib import Path
+
+from archiveflow.cache import TreeLevelCache
+
+
+def test_tree_level_cache_persists_and_counts(tmp_path: Path):
+    cache = TreeLevelCache(tmp_path / "cache.sqlite")
+    assert cache.get("u1", "nb", "0") is None
+    cache.put("u1", "nb", "0", b"<tree-tools/>")
+    cache.close()
+
+    cache = TreeLevelCache(tmp_path / "cache.sqlite")
+    assert cache.get("u1", "nb", "0") == b"<tree-tools/>"
+    # keys are per user
+    assert cache.get("u2", "nb", "0") is None
+    assert cache.stats() == {"hits": 1, "misses": 1, "size": 1}
+
+
+def test_tree_level_cache_ttl_and_lru_eviction():
+    cache = TreeLevelCache(":memory:", ttl=0.05, max_entries=2)
+    cache.put("u1", "nb", "1", b"1")
+    cache.put("u1", "nb", "2", b"2")
+    time.sleep(0.01)
+    assert cache.get("u1", "nb", "1") == b"1"
+    cache.put("u1", "nb", "3", b"3")
+    # "2" was the least recently used entry
+    assert cache.get("u1", "nb", "2") is None
+    assert len(cache) == 2
+    time.sleep(0.06)
+    assert cache.get("u1", "nb", "3") is None
+
+
+def test_tree_level_cache_invalidate():
+    cache = TreeLevelCache(":memory:")
+    cache.put("u1", "nb", "1", b"1")
+    cache.put("u1", "nb", "2", b"2")
+    cache.invalidate("u1", "nb", "1")
+    assert cache.get("u1", "nb", "1") is None
+    assert cache.get("u1", "nb", "2") == b"2"
+    cache.invalidate("u1", "nb")
+    assert len(cache) == 0
@@ -0,0 +1,143 @@
+import json
+from pathlib import Path
+
+import pytest
+from mock_server import (
+    MOCK_AKID,
+    MOCK_AUTH_CODE,
+    MOCK_EMAIL,
+    MOCK_PASSWORD,
+    MockNotebook,
+)
+
+from archiveflow.cli import main
+from archiveflow.config import config
+from archiveflow.index import NotebookIndex
+
+COHORTS = {"Cohort 1": {"Session 1": None}, "Cohort 2": {}}
+
+
+@pytest.fixture
+def mock_notebook() -> MockNotebook:
+    return MockNotebook.from_tree(
+        {
+            "Experiments": {
+                "Experiment 1": {"Behavior": COHORTS, "Photometry": COHORTS},
+                "Experiment 2": {"Behavior": COHORTS},
+            },
+            "Uploads": None,
+        }
+    )
+
+
+@pytest.fixture
+def run(mock_labarchives, monkeypatch, capsys):
+    monkeypatch.setattr(config, "access_key_id", MOCK_AKID)
+    monkeypatch.setattr(config, "access_password", MOCK_PASSWORD)
+
+    def run(*argv: str) -> tuple[int, dict]:
+        status = main(
+            [
+                "--api-url",
+                mock_labarchives.url,
+                "--email",
+                MOCK_EMAIL,
+                "--auth-code",
+                MOCK_AUTH_CODE,
+                "--workers",
+                "4",
+                *argv,
+            ]
+        )
+        return status, json.loads(capsys.readouterr().out)
+
+    return run
+
+
+def test_cli_crawl_materialize_harvest_upload(
+    run, mock_notebook, mock_labarchives, tmp_path: Path
+):
+    index_path = tmp_path / "index.json"
+    status, report = run("crawl", mock_notebook.nbid, str(index_path))
+    assert status == 0
+    assert report["result"]["nodes"] == len(mock_notebook.nodes) - 1
+    assert report["seconds"] > 0
+    assert report["metrics"]["requests"]["get_tree_level"]["statuses"]
+    assert len(NotebookIndex.load(index_path)) == report["result"]["nodes"]
+
+    # materialize every experiment, reusing the saved index
+    argv = [
+        "--index",
+        str(index_path),
+        "materialize",
+        mock_notebook.nbid,
+        str(tmp_path / "data"),
+        "--experiment",
+        "root/Experiments/*",
+    ]
+    status, report = run(*argv, "--dry-run")
+    assert status == 0
+    assert [r["create"] for r in report["result"]["experiments"]] == [12, 5]
+    assert not (tmp_path / "data").exists()
+    status, report = run(*argv)
+    assert status == 0
+    assert (tmp_path / "data/Experiment 1/Photometry/Cohort 2/Tanks").is_dir()
+    assert (tmp_path / "data/Experiment 2/Behavior/Cohort 1/Videos").is_dir()
+    status, report = run(*argv, "--dry-run")
+    assert all(r["up_to_date"] for r in report["result"]["experiments"])
+
+    status, report = run(
+        "harvest", mock_notebook.nbid, "--decode-workers", "0"
+    )
+    assert status == 0
+    assert report["result"]["pages"] == len(mock_notebook.pages)
+    assert report["result"]["forms"] == len(mock_notebook.pages)
+
+    (tmp_path / "upload").mkdir()
+    for i in range(3):
+        (tmp_path / "upload" / f"{i}.csv").write_text(f"{i}\n")
+    status, report = run(
+        "upload",
+        mock_notebook.nbid,
+        str(tmp_path / "upload"),
+        "--page",
+        "root/Uploads",
+    )
+    assert status == 0
+    assert report["result"]["uploaded"] == 3
+    assert len(mock_labarchives.uploads) == 3
+
+
+def test_cli_reports_errors(run):
+    status, report = run("crawl", "No Such Notebook", "index.json")
+    assert status == 1
+    assert report["status"] == "error"
+    assert report["error"] == "Notebook not found: No Such Notebook"
+
+
+def test_cli_reports_item_failures(
+    run, mock_notebook, mock_labarchives, tmp_path: Path
+):
+    mock_labarchives.fail_next("get_entries_for_page", status=403)
+    status, report = run(
+        "harvest", mock_notebook.nbid, "--decode-workers", "0"
+    )
+    assert status == 1
+    assert report["status"] == "failed"
+    assert list(report["result"]["errors"].values()) == [
+        "HTTP 403: Forbidden"
+    ]
+    assert report["result"]["forms"] == len(mock_notebook.pages) - 1
+
+    # a file where the experiment directories should go
+    (tmp_path / "data").write_text("")
+    status, report = run(
+        "materialize",
+        mock_notebook.nbid,
+        str(tmp_path / "data"),
+        "--experiment",
+        "root/Experiments/Experiment 2",
+    )
+    assert status == 1
+    [result] = report["result"]["experiments"]
+    assert result["error"].startswith(("FileExistsError", "NotADirectory"))
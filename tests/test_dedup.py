@@ -0,0 +1,55 @@
+import os
+from pathlib import Path
+
+from archiveflow.dedup import DedupIndex
+from archiveflow.upload import BulkUploader, UploadJob
+
+
+def test_dedup_index_fast_path(tmp_path: Path):
+    index = DedupIndex(":memory:")
+    video = tmp_path / "video.mp4"
+    video.write_bytes(b"frame" * 1000)
+    digest, size = index.file_hash(video)
+    assert size == 5000
+    assert index.file_hash(video) == (digest, size)
+    assert index.hashed == 1
+
+    index.record(video, "nb", "page-1", "eid-1")
+    assert index.lookup(video, "nb", "page-1") == (digest, "eid-1")
+    assert index.lookup(video, "nb", "page-2") is None
+    # the same content under another name is still a duplicate
+    copy = tmp_path / "copy.mp4"
+    copy.write_bytes(video.read_bytes())
+    assert index.lookup(copy, "nb", "page-1") == (digest, "eid-1")
+
+    video.write_bytes(b"other" * 1000)
+    os.utime(video, ns=(1, 1))
+    assert index.lookup(video, "nb", "page-1") is None
+    assert index.hashed == 3
+
+
+def test_add_attachment_skips_duplicates(
+    mock_client, mock_labarchives, tmp_path: Path
+):
+    mock_client.dedup = DedupIndex(tmp_path / "dedup.sqlite")
+    tank = tmp_path / "tank.tev"
+    tank.write_bytes(b"\x00" * 50_000)
+    response = mock_client.add_attachment(tank, nbid="mock-nbid", pid="7")
+    assert response is not None and response.ok
+    assert mock_client.add_attachment(tank, nbid="mock-nbid", pid="7") is None
+    assert len(mock_labarchives.uploads) == 1
+
+    renamed = tmp_path / "renamed.tev"
+    renamed.write_bytes(tank.read_bytes())
+    report = BulkUploader(mock_client).upload(
+        [
+            UploadJob(renamed, "mock-nbid", "7"),
+            UploadJob(renamed, "mock-nbid", "8"),
+        ]
+    )
+    assert [result.status for result in report.results] == [
+        "skipped",
+        "uploaded",
+    ]
+    assert report.results[0].eid == "attachment-1"
+    assert len(mock_labarchives.uploads) == 2
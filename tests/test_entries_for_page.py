@@ -1,7 +1,13 @@
 import pytest
 from pytest import LogCaptureFixture
 from archiveflow.api import LAClient
+from archiveflow.index import NotebookIndex
+from archiveflow.utils import STREAM_CHUNK_SIZE, _ChunkReader
+from archiveflow.utils import iter_page_entries
+from mock_server import MOCK_AKID, MOCK_AUTH_CODE, MOCK_EMAIL
+from mock_server import MOCK_PASSWORD, MockLabArchives, MockNotebook
 import logging
+import xml.etree.ElementTree as ET
 
 
 @pytest.fixture
@@ -34,53 +40,67 @@ def test_get_entries_for_page(
         nbid is not None
     ), f"Could not find notebook with name: {notebook_name}"
 
-    pages = client.get_all_pages(nbid)
+    index = NotebookIndex.build(client, nbid)
 
     # Find the 'API Test' page
-    api_test_page = None
-    for page in pages:
-        display_text = page.find("display-text")
-        if display_text is not None and display_text.text == "API Test":
-            api_test_page = page
-            break
-
-    assert api_test_page is not None, "Could not find 'API Test' page"
-
-    # Get the tree_id for the API Test page
-    tree_id = api_test_page.find("tree-id")
-    assert tree_id is not None, "Could not find tree-id for API Test page"
-    assert tree_id.text is not None, "tree-id element has no text content"
+    api_test_pages = index.find_name("API Test", is_page=True)
+    assert api_test_pages, "Could not find 'API Test' page"
 
     # Get entries for the page
     response = client.get_entries_for_page(
         nbid=nbid,
-        page_tree_id=tree_id.text,  # Now safe because we checked it's not None
+        page_tree_id=api_test_pages[0].tree_id,
         entry_data=True,
         comment_data=True,
+        stream=True,
     )
 
     # Verify the response
     assert response.status_code == 200, "Failed to get entries for page"
-    assert response.content, "Response content is empty"
-
-    # Parse and verify the XML response
-    from io import BytesIO
-    from xml.etree import ElementTree as ET
-
-    tree = ET.parse(BytesIO(response.content))
-    root = tree.getroot()
-
-    # Verify the response structure
-    entries = root.findall(".//entry")
-    assert entries is not None, "No entries found in response"
 
-    # Replace print statements with logging
+    # Parse the XML response one entry at a time
     caplog.set_level("INFO")  # type: ignore
-    logging.info(f"\nFound {len(entries)} entries on the API Test page")
-    for entry in entries:
+    entry_ids = []
+    for entry in iter_page_entries(response):
         entry_id = entry.find("id")
         if entry_id is not None and entry_id.text:
+            entry_ids.append(entry_id.text)
             logging.info(f"Entry ID: {entry_id.text}")
+    logging.info(f"\nFound {len(entry_ids)} entries on the API Test page")
+
+
+def test_chunk_reader_honours_size():
+    reader = _ChunkReader(iter([b"abcde", b"", b"fg"]))
+    assert reader.read(2) == b"ab"
+    assert reader.read(10) == b"cde"
+    assert reader.read(1) == b"f"
+    assert reader.read() == b"g"
+    assert reader.read(4) == b""
+
+
+def test_streamed_entries_match_parsed_entries():
+    # entries large enough to span several stream chunks
+    notebook = MockNotebook(entries_per_page=3, notes_size=STREAM_CHUNK_SIZE)
+    with MockLabArchives(notebook) as server, LAClient(
+        api_url=server.url,
+        access_key_id=MOCK_AKID,
+        access_password=MOCK_PASSWORD,
+    ) as client:
+        client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+        page_tree_id = notebook.pages[0].tree_id
+        content = client.get_entries_for_page(
+            notebook.nbid, page_tree_id, entry_data=True
+        ).content
+        response = client.get_entries_for_page(
+            notebook.nbid, page_tree_id, entry_data=True, stream=True
+        )
+        streamed = [
+            ET.tostring(entry) for entry in iter_page_entries(response)
+        ]
+    parsed = [ET.tostring(entry) for entry in iter_page_entries(content)]
+    assert len(content) > 2 * STREAM_CHUNK_SIZE
+    assert len(streamed) == 3
+    assert streamed == parsed
 
 
 if __name__ == "__main__":
@@ -0,0 +1,110 @@
+from pathlib import Path
+from typing import Any
+
+import pytest
+from mock_server import entries_response_xml
+
+from archiveflow.behavior_widget import (
+    decode_behavior_forms,
+    parse_behavior_widget,
+)
+from archiveflow.pipeline import PageForms
+from archiveflow.tree import TreeNode
+
+ds = pytest.importorskip("pyarrow.dataset")
+from archiveflow.export import (  # noqa: E402
+    export_harvest,
+    read_behavior_dataset,
+    write_behavior_dataset,
+)
+
+
+def test_write_behavior_dataset_appends_once(
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+    tmp_path: Path,
+):
+    batch = decode_behavior_forms(
+        [parse_behavior_widget(entries_response_xml(behavior_form_entries))]
+    )
+    page_path = "root/Exp/Behavior/Cohort 2/Sessions"
+    assert write_behavior_dataset(batch, tmp_path, page_path=page_path) == (
+        len(batch)
+    )
+    assert write_behavior_dataset(batch, tmp_path, page_path=page_path) == 0
+
+    metadata = read_behavior_dataset(tmp_path, "metadata")
+    # the second write found every form already written
+    assert len(metadata) == len(batch)
+    assert set(metadata["cohort"]) == {"Cohort 2"}
+    date = str(metadata["date"].iloc[0])
+    first_table = read_behavior_dataset(
+        tmp_path,
+        "first_table",
+        columns=["form_key", "value"],
+        filter=ds.field("date") == metadata["date"].iloc[0],
+    )
+    assert list(first_table.columns) == ["form_key", "value"]
+    form_keys = metadata.loc[metadata["date"].astype(str) == date]
+    assert set(first_table["form_key"]) == set(form_keys["form_key"])
+
+    write_behavior_dataset(
+        batch, tmp_path, page_path=page_path, mode="overwrite"
+    )
+    assert len(read_behavior_dataset(tmp_path, "metadata")) == len(batch)
+
+
+def test_export_harvest_overwrites_once_per_run(
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+    tmp_path: Path,
+):
+    batch = decode_behavior_forms(
+        [parse_behavior_widget(entries_response_xml(behavior_form_entries))]
+    )
+    # two pages of one cohort write to the same partitions
+    pages = [
+        PageForms(
+            TreeNode(name, name, True, f"root/Exp/Cohort 1/{name}"),
+            batch,
+            None,
+        )
+        for name in ("Day 1", "Day 2")
+    ]
+    for _ in range(2):
+        written = export_harvest(pages, tmp_path, mode="overwrite")
+        assert written == 2 * len(batch)
+        metadata = read_behavior_dataset(tmp_path, "metadata")
+        assert len(metadata) == 2 * len(batch)
+    first_table = read_behavior_dataset(tmp_path, "first_table")
+    assert len(first_table) == 2 * len(batch.first_table)
+
+
+def test_forms_without_eid_are_keyed_by_content(tmp_path: Path):
+    from mock_server import behavior_form_pairs
+
+    from archiveflow.behavior_widget import BEHAVIOR_FORM_V6
+
+    def batch_of(*seeds: int):
+        forms = []
+        for seed in seeds:
+            pairs = behavior_form_pairs(BEHAVIOR_FORM_V6, seed)
+            # every form records the same session
+            start_time = BEHAVIOR_FORM_V6.metadata_labels.index("Start Time")
+            pairs[start_time]["value"] = "10:00"
+            forms.append(pairs)
+        metadata = [
+            {
+                "form_id": BEHAVIOR_FORM_V6.form_id,
+                "form_version": BEHAVIOR_FORM_V6.form_version,
+            }
+        ] * len(forms)
+        return decode_behavior_forms([(metadata, forms)])
+
+    first, second = batch_of(1), batch_of(2)
+    assert list(first.metadata["form_key"]) != list(
+        second.metadata["form_key"]
+    )
+    assert batch_of(1, 1).metadata["form_key"].nunique() == 2
+    assert write_behavior_dataset(first, tmp_path) == 1
+    # a different form at the same position is not taken for a duplicate
+    assert write_behavior_dataset(second, tmp_path) == 1
+    assert write_behavior_dataset(batch_of(1), tmp_path) == 0
@@ -0,0 +1,63 @@
+import json
+import os
+import subprocess
+import sys
+from pathlib import Path
+
+# modules a short-lived worker only pays for when it decodes or logs in
+HEAVY_MODULES = ["pandas", "numpy", "dotenv", "http.server", "webbrowser"]
+REPO_ROOT = Path(__file__).resolve().parents[1]
+
+
+def test_import_has_no_side_effects(tmp_path: Path):
+    code = (
+        "import json, logging, sys\n"
+        "import archiveflow.api, archiveflow.behavior_widget\n"
+        "import archiveflow.pipeline, archiveflow.sync, archiveflow.upload\n"
+        "import archiveflow.index, archiveflow.config\n"
+        "print(json.dumps({\n"
+        f"    'loaded': [m for m in {HEAVY_MODULES!r} if m in sys.modules],\n"
+        "    'handlers': len(logging.getLogger().handlers),\n"
+        "}))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert json.loads(result.stdout) == {"loaded": [], "handlers": 0}
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_config_loads_on_first_access(tmp_path: Path, monkeypatch):
+    from archiveflow.config import Config
+
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.setenv("app_host", "localhost:8501")
+    monkeypatch.delenv("tree_cache", raising=False)
+    settings = Config(None, None, None, None, None, "cache.sqlite")
+    assert "app_host" not in vars(settings)
+    assert settings.app_host == "localhost:8501"
+    assert settings.tree_cache == "cache.sqlite"
+
+
+def test_configure_logging_once(tmp_path: Path):
+    code = (
+        "import logging\n"
+        "from archiveflow.api import CallbackHandler, configure_logging\n"
+        "configure_logging(log_file='app.log')\n"
+        "configure_logging(log_file='app.log')\n"
+        "print(len(logging.getLogger().handlers))\n"
+    )
+    result = subprocess.run(
+        [sys.executable, "-c", code],
+        cwd=tmp_path,
+        env={**os.environ, "PYTHONPATH": str(REPO_ROOT)},
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    assert result.stdout.strip() == "2"
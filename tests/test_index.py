@@ -0,0 +1,51 @@
+from pathlib import Path
+
+from archiveflow.index import NotebookIndex
+
+
+def test_notebook_index_lookups(mock_client, mock_notebook, tmp_path: Path):
+    index = NotebookIndex.build(mock_client, mock_notebook.nbid)
+    assert len(index) == len(mock_notebook.nodes) - 1
+    assert [node.full_path for node in index.pages] == [
+        page.full_path for page in mock_client.get_all_pages("mock-nbid")
+    ]
+
+    folder = index.find_path("root/Folder 2/Folder 3")
+    assert folder is not None and not folder.is_page
+    assert index.get(folder.tree_id) is folder
+    assert [node.display_text for node in index.children(folder)] == [
+        "Page 1",
+        "Page 2",
+    ]
+    assert index.parent(folder) is index.find_path("root/Folder 2")
+    assert [node.full_path for node in index.ancestors(folder)] == [
+        "root/Folder 2",
+        "root",
+    ]
+    assert len(index.find_name("page 1", is_page=True)) == 12
+    assert len(index.find_name("FOLDER 1", is_page=False)) == 4
+    assert [node.full_path for node in index.prefix("root/Folder 3/")] == [
+        "root/Folder 3/Folder 1",
+        "root/Folder 3/Folder 1/Page 1",
+        "root/Folder 3/Folder 1/Page 2",
+        "root/Folder 3/Folder 2",
+        "root/Folder 3/Folder 2/Page 1",
+        "root/Folder 3/Folder 2/Page 2",
+        "root/Folder 3/Folder 3",
+        "root/Folder 3/Folder 3/Page 1",
+        "root/Folder 3/Folder 3/Page 2",
+        "root/Folder 3/Page 1",
+        "root/Folder 3/Page 2",
+    ]
+    assert len(index.glob("root/*/Page 2", is_page=True)) == 12
+    assert len(index.glob("root/Folder 1/Folder ?/Page 1")) == 3
+
+    index.save(tmp_path / "index.json")
+    loaded = NotebookIndex.load(tmp_path / "index.json")
+    assert loaded.nbid == "mock-nbid"
+    assert [node.full_path for node in loaded] == [
+        node.full_path for node in index
+    ]
+    loaded_folder = loaded.get(folder.tree_id)
+    assert loaded_folder is not None
+    assert loaded_folder.parent is loaded.find_path("root/Folder 2")
@@ -0,0 +1,51 @@
+import threading
+from pathlib import Path
+
+from archiveflow.jobs import Job, JobManager
+from archiveflow.materialize import MaterializePlan
+
+
+def test_job_manager_progress_and_cancel(tmp_path: Path):
+    manager = JobManager(max_workers=1)
+    plan = MaterializePlan.scan(tmp_path, [f"d{i}" for i in range(3)])
+
+    def build(job: Job) -> MaterializePlan:
+        job.report(0, message="planning")
+        plan.apply(progress=job.report)
+        return plan
+
+    job = manager.submit("build", build, owner="uid", key="build")
+    assert job.wait(timeout=10)
+    assert job.status == "succeeded"
+    assert job.result is plan
+    assert (job.done, job.total, job.fraction) == (3, 3, 1.0)
+    assert (tmp_path / "d2").is_dir()
+
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow(job: Job) -> None:
+        started.set()
+        release.wait(10)
+        job.report(1)
+
+    running = manager.submit("slow", slow, owner="uid", key="slow")
+    # the same work submitted again, e.g. by a rerun, joins the first job
+    assert manager.submit("slow", slow, key="slow") is running
+    pending = manager.submit("pending", slow, owner="other")
+    assert started.wait(10)
+    assert running.status == "running"
+    assert pending.status == "pending"
+    pending.cancel()
+    running.cancel()
+    release.set()
+    assert running.wait(timeout=10) and pending.wait(timeout=10)
+    assert running.status == "cancelled"
+    assert pending.status == "cancelled"
+    assert [j.name for j in manager.jobs(owner="uid")] == ["slow", "build"]
+
+    failing = manager.submit("failing", lambda job: 1 / 0)
+    assert failing.wait(timeout=10)
+    assert failing.status == "failed"
+    assert failing.error == "ZeroDivisionError: division by zero"
+    manager.shutdown()
@@ -0,0 +1,80 @@
+from pathlib import Path
+
+from archiveflow.index import NotebookIndex
+from archiveflow.materialize import (
+    MaterializePlan,
+    index_directories,
+    scan_directories,
+)
+
+
+def test_materialize_plan_diff_and_apply(tmp_path: Path):
+    (tmp_path / "Behavior" / "cohort 1" / "Videos").mkdir(parents=True)
+    (tmp_path / "Behavior" / "cohort 1" / "Videos" / "a.mp4").write_text("")
+    (tmp_path / "Behavior" / "Old").mkdir()
+    # data below the leaves is neither scanned nor extra
+    (tmp_path / "Histology" / "Slides" / "2024").mkdir(parents=True)
+    (tmp_path / "Behavior" / "cohort 1" / "Videos" / "Day 1").mkdir()
+    desired = [
+        "Behavior",
+        "Behavior/Cohort 1",
+        "Behavior/Cohort 1/Videos",
+        "Behavior/Cohort 2",
+        "Behavior/Cohort 2/Videos",
+        "Histology",
+    ]
+    plan = MaterializePlan.scan(tmp_path, desired)
+    assert plan.renamed == [("Behavior/cohort 1", "Behavior/Cohort 1")]
+    assert plan.missing == ["Behavior/Cohort 2", "Behavior/Cohort 2/Videos"]
+    assert plan.extra == ["Behavior/Old"]
+    assert plan.report().splitlines() == [
+        "~ Behavior/cohort 1 -> Behavior/Cohort 1",
+        "+ Behavior/Cohort 2",
+        "+ Behavior/Cohort 2/Videos",
+        "? Behavior/Old",
+    ]
+    # the plan is a dry run until applied
+    assert not (tmp_path / "Behavior" / "Cohort 2").exists()
+
+    assert "Behavior/cohort 1/Videos/Day 1" not in plan.existing
+    assert "Histology/Slides" in plan.existing
+
+    plan.apply()
+    assert scan_directories(tmp_path, max_depth=3) == set(desired) | {
+        "Behavior/Old",
+        "Histology/Slides",
+        "Histology/Slides/2024",
+    }
+    assert (tmp_path / "Behavior/Cohort 1/Videos/a.mp4").exists()
+    assert MaterializePlan.scan(tmp_path, desired).up_to_date
+
+
+def test_materialize_plan_creates_missing_root(tmp_path: Path):
+    plan = MaterializePlan.scan(tmp_path / "Experiment", ["A", "A/B"])
+    assert plan.summary()["create"] == 2
+    assert plan.summary()["create_root"]
+    assert plan.report().splitlines()[0] == f"+ {tmp_path / 'Experiment'}"
+    plan.apply()
+    assert scan_directories(tmp_path / "Experiment") == {"A", "A/B"}
+
+
+def test_apply_tolerates_directories_created_since_plan(tmp_path: Path):
+    plan = MaterializePlan.scan(tmp_path, ["A", "A/B", "C"])
+    (tmp_path / "A" / "B").mkdir(parents=True)
+    plan.apply()
+    assert scan_directories(tmp_path) == {"A", "A/B", "C"}
+
+
+def test_index_directories(mock_client, mock_notebook):
+    index = NotebookIndex.build(mock_client, mock_notebook.nbid)
+    folder = index.find_path("root/Folder 2")
+    assert index_directories(index, folder) == [
+        "Folder 1",
+        "Folder 2",
+        "Folder 3",
+    ]
+    assert index_directories(index, folder, include_pages=True)[:3] == [
+        "Page 1",
+        "Page 2",
+        "Folder 1",
+    ]
@@ -0,0 +1,78 @@
+import json
+from io import BytesIO
+
+import requests
+from requests import Response
+
+from archiveflow.api import LAClient
+from archiveflow.metrics import ClientMetrics
+from archiveflow.scheduler import RequestScheduler
+from archiveflow.tree import root_node
+
+TREE_LEVEL: bytes = (
+    b"<tree-tools><level-nodes><level-node><tree-id>1</tree-id>"
+    + b"<display-text>Cohort 1</display-text><is-page>false</is-page>"
+    + b"</level-node></level-nodes></tree-tools>"
+)
+
+
+def test_metrics_exports():
+    metrics = ClientMetrics()
+    metrics.record_request("get_node", "200", 0.02, bytes_received=100)
+    metrics.record_request("get_node", "503", 0.3)
+    metrics.record_retry("get_node")
+    metrics.record_cache(True)
+    metrics.record_cache(False)
+    with metrics.timer("parse_tree_level"):
+        pass
+
+    summary = json.loads(metrics.to_json())
+    get_node = summary["requests"]["get_node"]
+    assert get_node["statuses"] == {"200": 1, "503": 1}
+    assert get_node["latency"]["count"] == 2
+    assert get_node["latency"]["buckets"]["0.025"] == 1
+    assert get_node["bytes_received"] == 100
+    assert get_node["retries"] == 1
+    assert summary["cache"] == {"hits": 1, "misses": 1}
+    assert summary["structure_cache"] == {"hits": 0, "misses": 0}
+    assert summary["timers"]["parse_tree_level"]["count"] == 1
+
+    text = metrics.to_prometheus()
+    assert (
+        'archiveflow_requests_total{api_method="get_node",status="503"} 1'
+        in text
+    )
+    assert (
+        'archiveflow_request_duration_seconds_bucket{api_method="get_node",'
+        + 'le="+Inf"} 2'
+        in text
+    )
+    assert 'archiveflow_tree_cache_requests_total{result="hit"} 1' in text
+
+
+def test_client_records_requests(monkeypatch):
+    client = LAClient(
+        api_url="https://api.example.com",
+        access_key_id="akid",
+        access_password="password",
+        scheduler=RequestScheduler(backoff_base=0.001),
+    )
+    client.ua_info = {"id": "uid"}
+    statuses = iter([503, 200])
+
+    def request(method: str, url: str, **kwargs) -> Response:
+        response = Response()
+        response.status_code = next(statuses)
+        response.raw = BytesIO(TREE_LEVEL)
+        response.request = requests.Request(method, url).prepare()
+        return response
+
+    monkeypatch.setattr(client.session, "request", request)
+    assert len(client._get_tree_level("nb", root_node())) == 1
+
+    summary = client.metrics.snapshot()
+    tree_level = summary["requests"]["get_tree_level"]
+    assert tree_level["statuses"] == {"503": 1, "200": 1}
+    assert tree_level["retries"] == 1
+    assert tree_level["bytes_received"] == 2 * len(TREE_LEVEL)
+    assert summary["timers"]["parse_tree_level"]["count"] == 1
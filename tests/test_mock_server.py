@@ -0,0 +1,32 @@
+import requests
+
+from archiveflow.sync import parse_node_stamp
+
+
+def test_mock_client_crawls_generated_notebook(mock_client, mock_notebook):
+    assert mock_client.ua_info["id"] == "mock-uid"
+    pages, folders = mock_client.crawl_tree(mock_notebook.nbid)
+    # 3 + 9 folders with 2 pages each
+    assert len(folders) == 12
+    assert len(pages) == 24
+    assert pages[0].full_path == "root/Folder 1/Page 1"
+    response = mock_client.get_node_data(mock_notebook.nbid, "1")
+    assert parse_node_stamp(response.content) is not None
+
+
+def test_mock_server_injects_errors(mock_client, mock_labarchives):
+    mock_labarchives.fail_next("get_node", count=2)
+    response = mock_client.get_node_data("mock-nbid", "1")
+    assert response.ok
+    assert mock_labarchives.requests["get_node"] == 3
+    assert mock_client.metrics.snapshot()["requests"]["get_node"][
+        "retries"
+    ] == 2
+
+
+def test_mock_server_rejects_bad_signatures(mock_labarchives):
+    response = requests.get(
+        mock_labarchives.url
+        + "/api/tree_tools/get_node?uid=u&akid=mock-akid&expires=1&sig=x"
+    )
+    assert response.status_code == 401
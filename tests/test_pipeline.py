@@ -0,0 +1,91 @@
+from types import SimpleNamespace
+from typing import Any
+
+import pytest
+from mock_server import entries_response_xml
+
+from archiveflow.metrics import ClientMetrics
+from archiveflow.pipeline import decode_page, harvest_behavior_forms
+from archiveflow.tree import TreeNode
+
+
+class FakeEntriesClient:
+    def __init__(self, pages: dict[str, bytes]) -> None:
+        self.pages = pages
+        self.metrics = ClientMetrics()
+
+    def get_all_pages(self, nbid: str, *args: Any, **kwargs: Any):
+        pages: list[TreeNode] = []
+        for tree_id in self.pages:
+            pages.append(TreeNode(tree_id, tree_id, True, f"root/{tree_id}"))
+        return pages
+
+    def get_entries_for_page(
+        self, nbid: str, tree_id: str, entry_data: bool = False
+    ):
+        if tree_id == "forbidden":
+            return SimpleNamespace(
+                ok=False, status_code=403, reason="Forbidden", content=b""
+            )
+        return SimpleNamespace(ok=True, content=self.pages[tree_id])
+
+
+@pytest.mark.parametrize("decode_workers", [0, 2])
+def test_harvest_behavior_forms_in_page_order(
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+    decode_workers: int,
+):
+    text_page = (
+        b"<tree-tools><entries><entry><eid>1</eid>"
+        + b"<entry-data>&lt;p&gt;notes&lt;/p&gt;</entry-data>"
+        + b"</entry></entries></tree-tools>"
+    )
+    pages = {
+        str(i): entries_response_xml(behavior_form_entries[i : i + 2])
+        for i in range(0, len(behavior_form_entries), 2)
+    }
+    pages["text"] = text_page
+    client = FakeEntriesClient(pages)
+    results = list(
+        harvest_behavior_forms(
+            client,  # type: ignore
+            "nb",
+            fetch_workers=3,
+            decode_workers=decode_workers,
+        )
+    )
+    assert [result.tree_id for result in results] == list(pages)
+    for result in results[:-1]:
+        assert result.error is None
+        assert result.batch is not None
+        assert len(result.batch) == len(
+            behavior_form_entries[int(result.tree_id) :][:2]  # type: ignore
+        )
+    # a page without behavior forms is no error
+    assert results[-1].batch is None
+    assert results[-1].error is None
+    timers = client.metrics.snapshot()["timers"]
+    assert timers["parse_behavior_widget"]["count"] == len(pages)
+    assert timers["decode_behavior_forms"]["count"] == len(pages) - 1
+
+
+def test_harvest_reports_failed_pages(
+    behavior_form_entries: list[tuple[int, list[dict[str, Any]]]],
+):
+    pages = {
+        "forbidden": b"",
+        "truncated": entries_response_xml(behavior_form_entries[:1])[:-20],
+        "ok": entries_response_xml(behavior_form_entries[:1]),
+    }
+    results = list(
+        harvest_behavior_forms(
+            FakeEntriesClient(pages),  # type: ignore
+            "nb",
+            decode_workers=0,
+        )
+    )
+    errors = {result.tree_id: result.error for result in results}
+    assert errors["forbidden"] == "HTTP 403: Forbidden"
+    assert errors["truncated"].startswith("ParseError")  # type: ignore
+    assert errors["ok"] is None
+    assert decode_page(b"<tree-tools><entries>")[1] is not None
@@ -0,0 +1,56 @@
+import time
+from io import BytesIO
+
+import pytest
+import requests
+from requests import Response
+
+from archiveflow.scheduler import RequestScheduler, TokenBucket
+
+
+def make_response(status_code: int) -> Response:
+    response = Response()
+    response.status_code = status_code
+    response.raw = BytesIO()
+    return response
+
+
+def test_scheduler_retries_idempotent_requests():
+    scheduler = RequestScheduler(max_retries=3, backoff_base=0.001)
+    statuses = iter([503, 429, 200])
+    calls: list[int] = []
+
+    def send() -> Response:
+        calls.append(1)
+        return make_response(next(statuses))
+
+    assert scheduler.execute("get_tree_level", send).status_code == 200
+    assert len(calls) == 3
+
+    calls.clear()
+    statuses = iter([503, 200])
+    response = scheduler.execute("insert_node", send, idempotent=False)
+    assert response.status_code == 503
+    assert len(calls) == 1
+
+
+def test_scheduler_raises_after_retries_exhausted():
+    scheduler = RequestScheduler(max_retries=1, backoff_base=0.001)
+    calls: list[int] = []
+
+    def send() -> Response:
+        calls.append(1)
+        raise requests.ConnectionError("reset")
+
+    with pytest.raises(requests.ConnectionError):
+        scheduler.execute("get_node", send)
+    assert len(calls) == 2
+
+
+def test_token_bucket_limits_rate():
+    bucket = TokenBucket(rate=100, burst=2)
+    start = time.monotonic()
+    for _ in range(7):
+        bucket.acquire()
+    # 2 burst tokens, then 5 tokens at 100 per second
+    assert time.monotonic() - start >= 0.045
@@ -0,0 +1,117 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from typing import Iterator
+
+import pytest
+from mock_server import MOCK_AKID, MOCK_AUTH_CODE, MOCK_EMAIL
+from mock_server import MOCK_PASSWORD, MockLabArchives, MockNotebook
+
+from archiveflow.api import LAClient
+from archiveflow.singleflight import SingleFlight
+
+
+@pytest.fixture
+def slow_client(slow_labarchives: MockLabArchives) -> Iterator[LAClient]:
+    with LAClient(
+        api_url=slow_labarchives.url,
+        access_key_id=MOCK_AKID,
+        access_password=MOCK_PASSWORD,
+    ) as client:
+        client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+        yield client
+
+
+def test_single_flight_shares_result_and_errors():
+    flight = SingleFlight()
+    started = threading.Event()
+    release = threading.Event()
+
+    def slow() -> object:
+        started.set()
+        release.wait()
+        return object()
+
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        leader = executor.submit(flight.do, "key", slow)
+        started.wait()
+        waiters = [executor.submit(flight.do, "key", slow) for _ in range(3)]
+        while flight.shared < 3:
+            time.sleep(0.001)
+        release.set()
+        results = {id(leader.result())} | {
+            id(waiter.result()) for waiter in waiters
+        }
+    assert len(results) == 1
+    assert (flight.calls, flight.shared, flight.in_flight()) == (1, 3, 0)
+
+    def fail() -> object:
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        flight.do("key", fail)
+    # nothing is cached once the call finished
+    assert flight.do("key", lambda: 1) == 1
+    assert flight.calls == 3
+
+
+def test_client_coalesces_tree_levels(
+    slow_client: LAClient,
+    slow_labarchives: MockLabArchives,
+    mock_notebook: MockNotebook,
+):
+    folder = slow_client.get_dir_nodes(mock_notebook.nbid)[0]
+    slow_labarchives.requests.clear()
+    with ThreadPoolExecutor(max_workers=6) as executor:
+        levels = list(
+            executor.map(
+                lambda i: slow_client.get_dir_nodes(
+                    mock_notebook.nbid,
+                    folder.tree_id,
+                    folder.display_text,
+                    "root" if i % 2 else "",
+                ),
+                range(6),
+            )
+        )
+    assert slow_labarchives.requests["get_tree_level"] == 1
+    # every caller gets the paths below its own parent
+    assert {level[0].full_path.split("/")[0] for level in levels} == {
+        "root",
+        folder.display_text,
+    }
+    snapshot = slow_client.metrics.snapshot()
+    assert snapshot["requests"]["get_tree_level"]["coalesced"] == 5
+
+
+def test_client_coalesces_entries_but_not_streams(
+    slow_client: LAClient,
+    slow_labarchives: MockLabArchives,
+    mock_notebook: MockNotebook,
+):
+    page = mock_notebook.pages[0]
+    slow_labarchives.requests.clear()
+    with ThreadPoolExecutor(max_workers=4) as executor:
+        responses = list(
+            executor.map(
+                lambda _: slow_client.get_entries_for_page(
+                    mock_notebook.nbid, page.tree_id, entry_data=True
+                ),
+                range(4),
+            )
+        )
+    assert slow_labarchives.requests["get_entries_for_page"] == 1
+    assert all(response is responses[0] for response in responses)
+
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        streams = list(
+            executor.map(
+                lambda _: slow_client.get_entries_for_page(
+                    mock_notebook.nbid, page.tree_id, stream=True
+                ),
+                range(2),
+            )
+        )
+    assert streams[0] is not streams[1]
+    assert streams[0].content == streams[1].content
+    assert slow_labarchives.requests["get_entries_for_page"] == 3
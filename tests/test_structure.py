@@ -0,0 +1,70 @@
+from pathlib import Path
+
+import pytest
+from mock_server import MockNotebook
+
+from archiveflow.structure import TejedaExperiment
+
+
+@pytest.fixture
+def mock_notebook() -> MockNotebook:
+    return MockNotebook.from_tree(
+        {
+            "Experiment 1": {
+                "Behavior": {"Cohort 1": {}, "Cohort 2": {}},
+                "Photometry": {"Cohort 1": {}, "Notes": None},
+                "Surgeries": {},
+                "Protocol": None,
+            }
+        }
+    )
+
+
+def test_tejeda_experiment_single_crawl(
+    mock_client, mock_notebook, mock_labarchives, tmp_path: Path
+):
+    experiment = mock_client.get_dir_nodes(mock_notebook.nbid)[0]
+    mock_labarchives.requests.clear()
+    exp = TejedaExperiment(
+        tmp_path, mock_client, mock_notebook.nbid, experiment, "Existing"
+    )
+    # the experiment level, then its three folders concurrently
+    assert mock_labarchives.requests["get_tree_level"] == 4
+    assert [node.display_text for node in exp.dir_nodes] == [
+        "Behavior",
+        "Photometry",
+        "Surgeries",
+    ]
+    assert exp.behavior is not None
+    assert exp.behavior.cohorts == ["Cohort 1", "Cohort 2"]
+    assert exp.photometry is not None
+    assert exp.photometry.cohorts == ["Cohort 1"]
+    assert exp.surgeries is not None and exp.surgeries.cohorts == []
+    assert exp.histology is None
+
+    exp.create_experiment_dirs()
+    exp.behavior.create_cohorts()
+    assert (tmp_path / "Behavior" / "Cohort 2" / "Videos").is_dir()
+    assert not (tmp_path / "Histology").exists()
+
+
+def test_tejeda_experiment_plan(
+    mock_client, mock_notebook, mock_labarchives, tmp_path: Path
+):
+    experiment = mock_client.get_dir_nodes(mock_notebook.nbid)[0]
+    (tmp_path / "Behavior" / "Cohort 1" / "Videos").mkdir(parents=True)
+    exp = TejedaExperiment(
+        tmp_path, mock_client, mock_notebook.nbid, experiment, "Existing"
+    )
+    plan = exp.plan()
+    assert plan.missing == [
+        "Photometry",
+        "Surgeries",
+        "Behavior/Cohort 2",
+        "Photometry/Cohort 1",
+        "Behavior/Cohort 2/Videos",
+        "Photometry/Cohort 1/Analysis",
+        "Photometry/Cohort 1/Tanks",
+    ]
+    plan.apply()
+    assert exp.plan().up_to_date
@@ -0,0 +1,152 @@
+from concurrent.futures import ThreadPoolExecutor
+from typing import Union
+
+import pytest
+import requests
+from mock_server import MOCK_AKID, MOCK_AUTH_CODE, MOCK_EMAIL
+from mock_server import MOCK_PASSWORD, MockLabArchives, MockNotebook
+
+from archiveflow.api import LAClient
+from archiveflow.cache import TreeLevelCache
+from archiveflow.structure_cache import NotebookStructureCache
+from archiveflow.tree import TreeNode, root_node
+
+
+def make_client(
+    server: MockLabArchives,
+    structure_cache: NotebookStructureCache,
+    cache: Union[TreeLevelCache, None] = None,
+) -> LAClient:
+    client = LAClient(
+        api_url=server.url,
+        access_key_id=MOCK_AKID,
+        access_password=MOCK_PASSWORD,
+        cache=cache,
+        structure_cache=structure_cache,
+    )
+    client.login(auth_code=MOCK_AUTH_CODE, email=MOCK_EMAIL)
+    return client
+
+
+def test_sessions_share_one_request(
+    slow_labarchives: MockLabArchives, mock_notebook: MockNotebook
+):
+    structure_cache = NotebookStructureCache()
+    clients = [
+        make_client(slow_labarchives, structure_cache) for _ in range(2)
+    ]
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        levels = list(
+            executor.map(
+                lambda i: clients[i % 2].get_dir_nodes(mock_notebook.nbid),
+                range(8),
+            )
+        )
+    assert slow_labarchives.requests["get_tree_level"] == 1
+    assert structure_cache.coalesced > 0
+    assert all(
+        [node.tree_id for node in level]
+        == [node.tree_id for node in levels[0]]
+        for level in levels
+    )
+    # a later session reads the cached level
+    make_client(slow_labarchives, structure_cache).get_dir_nodes(
+        mock_notebook.nbid
+    )
+    assert slow_labarchives.requests["get_tree_level"] == 1
+    assert structure_cache.hits >= 1
+    for client in clients:
+        client.close()
+
+
+def test_insert_node_invalidates_level(
+    mock_labarchives: MockLabArchives, mock_notebook: MockNotebook
+):
+    structure_cache = NotebookStructureCache()
+    with make_client(mock_labarchives, structure_cache) as client:
+        before = client.get_dir_nodes(mock_notebook.nbid)
+        client.insert_node(mock_notebook.nbid, "0", "New Folder", "true")
+        after = client.get_dir_nodes(mock_notebook.nbid)
+    assert len(after) == len(before) + 1
+    assert mock_labarchives.requests["get_tree_level"] == 2
+
+
+def test_rebase_to_parent_path():
+    structure_cache = NotebookStructureCache()
+    crawled = TreeNode("5", "Experiment", False, "root/Experiment")
+    fetched = [
+        TreeNode("6", "Behavior", False, "root/Experiment/Behavior", crawled)
+    ]
+    structure_cache.load("uid", "nbid", crawled, lambda: fetched)
+
+    nodes = structure_cache.get(
+        "uid", "nbid", root_node("5", "Experiment", "")
+    )
+    assert nodes is not None
+    assert nodes[0].full_path == "Experiment/Behavior"
+    assert structure_cache.get("other uid", "nbid", crawled) is None
+
+
+def test_evicts_least_recently_used_notebook():
+    structure_cache = NotebookStructureCache(max_notebooks=2)
+    root = root_node()
+    for nbid in ("a", "b"):
+        structure_cache.load("uid", nbid, root, lambda: [])
+    assert structure_cache.get("uid", "a", root) == []
+    structure_cache.load("uid", "c", root, lambda: [])
+    assert structure_cache.get("uid", "b", root) is None
+    assert structure_cache.get("uid", "a", root) == []
+    assert structure_cache.stats()["notebooks"] == 2
+
+
+def test_failed_fetch_is_not_cached():
+    structure_cache = NotebookStructureCache()
+    root = root_node()
+
+    def fail() -> list[TreeNode]:
+        raise ConnectionError("down")
+
+    with pytest.raises(ConnectionError):
+        structure_cache.load("uid", "nbid", root, fail)
+    assert structure_cache.load("uid", "nbid", root, lambda: []) == []
+
+
+def test_error_response_is_not_cached(
+    mock_labarchives: MockLabArchives, mock_notebook: MockNotebook
+):
+    structure_cache = NotebookStructureCache()
+    mock_labarchives.fail_next("get_tree_level", status=403)
+    with make_client(mock_labarchives, structure_cache) as client:
+        with pytest.raises(requests.HTTPError):
+            client.get_dir_nodes(mock_notebook.nbid)
+        nodes = client.get_dir_nodes(mock_notebook.nbid)
+    assert len(nodes) > 0
+    assert mock_labarchives.requests["get_tree_level"] == 2
+
+
+def test_sessions_get_their_own_nodes(
+    mock_labarchives: MockLabArchives, mock_notebook: MockNotebook
+):
+    structure_cache = NotebookStructureCache()
+    cache = TreeLevelCache(":memory:")
+    with make_client(mock_labarchives, structure_cache, cache) as first:
+        nodes = first.get_dir_nodes(mock_notebook.nbid)
+        display_text = nodes[0].display_text
+        nodes[0].display_text = "changed"
+        with make_client(
+            mock_labarchives, structure_cache, cache
+        ) as second:
+            again = second.get_dir_nodes(mock_notebook.nbid)
+    assert again[0] is not nodes[0]
+    assert again[0].display_text == display_text
+    # each cache layer is counted on its own
+    assert first.metrics.snapshot()["structure_cache"] == {
+        "hits": 0,
+        "misses": 1,
+    }
+    assert first.metrics.snapshot()["cache"] == {"hits": 0, "misses": 1}
+    assert second.metrics.snapshot()["structure_cache"] == {
+        "hits": 1,
+        "misses": 0,
+    }
+    assert second.metrics.snapshot()["cache"] == {"hits": 0, "misses": 0}
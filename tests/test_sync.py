@@ -0,0 +1,143 @@
+from pathlib import Path
+from types import SimpleNamespace
+from typing import Any
+
+from mock_server import MockLabArchives, MockNotebook
+
+from archiveflow.api import LAClient
+from archiveflow.index import NotebookIndex
+from archiveflow.sync import NotebookSync, SyncManifest
+from archiveflow.tree import TreeNode, parse_tree_level, root_node
+
+
+def fake_response(content: str) -> SimpleNamespace:
+    return SimpleNamespace(
+        content=content.encode(), raise_for_status=lambda: None
+    )
+
+
+class FakeSyncClient:
+    """Serves pages, node stamps and entry listings from dicts."""
+
+    def __init__(self) -> None:
+        self.node_stamps: dict[str, str] = {"p1": "1", "p2": "1"}
+        self.entries: dict[str, list[tuple[str, str]]] = {
+            "p1": [("e1", "1"), ("e2", "1")],
+            "p2": [("e3", "1")],
+        }
+        self.calls: list[tuple[str, ...]] = []
+
+    def get_all_pages(self, nbid: str, *args: Any, **kwargs: Any):
+        pages: list[TreeNode] = []
+        for tree_id in self.entries:
+            pages.append(TreeNode(tree_id, tree_id, True, f"root/{tree_id}"))
+        return pages
+
+    def get_node_data(self, nbid: str, tree_id: str):
+        self.calls.append(("get_node", tree_id))
+        content = (
+            "<tree-tools><node><updated-at>"
+            + self.node_stamps[tree_id]
+            + "</updated-at></node></tree-tools>"
+        )
+        return fake_response(content)
+
+    def get_entries_for_page(
+        self, nbid: str, tree_id: str, entry_data: bool = False
+    ):
+        self.calls.append(("get_entries_for_page", tree_id, str(entry_data)))
+        entries = "".join(
+            f"<entry><eid>{eid}</eid><part-type>text entry</part-type>"
+            + f"<version>{version}</version></entry>"
+            for eid, version in self.entries[tree_id]
+        )
+        content = f"<tree-tools><entries>{entries}</entries></tree-tools>"
+        return fake_response(content)
+
+
+def test_sync_only_fetches_changes(tmp_path: Path):
+    client = FakeSyncClient()
+    manifest_path = tmp_path / "manifest.json"
+    first = NotebookSync(client, manifest_path).sync("nb")  # type: ignore
+    assert [page.tree_id for page in first.changed_pages] == ["p1", "p2"]
+
+    client.calls.clear()
+    client.node_stamps["p1"] = "2"
+    client.entries["p1"] = [("e1", "2")]
+    second = NotebookSync(client, manifest_path).sync("nb")  # type: ignore
+    assert second.unchanged_pages == 1
+    [changes] = second.changed_pages
+    assert (changes.changed, changes.removed) == (["e1"], ["e2"])
+    # p2 was skipped on its node stamp alone
+    assert ("get_entries_for_page", "p2", "False") not in client.calls
+    assert SyncManifest(manifest_path).pages["p1"]["entries"] == {"e1": "|2"}
+
+    del client.entries["p2"]
+    third = NotebookSync(client, manifest_path).sync("nb")  # type: ignore
+    assert third.removed_pages == ["p2"]
+    assert third.changed_pages == []
+
+
+def test_sync_uses_index_stamps(tmp_path: Path):
+    client = FakeSyncClient()
+    root = TreeNode("0", "root", False, "root")
+    pages = [
+        TreeNode(tree_id, tree_id, True, f"root/{tree_id}", root, "1")
+        for tree_id in client.entries
+    ]
+    index = NotebookIndex("nb", root, {"0": pages})
+    manifest_path = tmp_path / "manifest.json"
+    sync = NotebookSync(client, manifest_path)  # type: ignore
+    assert len(sync.sync("nb", index=index).changed_pages) == 2
+
+    client.calls.clear()
+    second = NotebookSync(client, manifest_path).sync(  # type: ignore
+        "nb", index=index
+    )
+    assert second.unchanged_pages == 2
+    # the stamps came with the node records
+    assert client.calls == []
+
+
+def test_parse_tree_level_keeps_stamp():
+    content = (
+        b"<tree-tools><level-nodes><level-node><tree-id>1</tree-id>"
+        + b"<display-text>Page</display-text>"
+        + b'<is-page type="boolean">true</is-page><version>3</version>'
+        + b"<updated-at>2024-01-01</updated-at></level-node>"
+        + b"</level-nodes></tree-tools>"
+    )
+    [node] = parse_tree_level(content, root_node())
+    assert node.stamp == "2024-01-01"
+
+
+def test_failed_page_keeps_manifest_record(
+    tmp_path: Path,
+    mock_client: LAClient,
+    mock_labarchives: MockLabArchives,
+    mock_notebook: MockNotebook,
+):
+    manifest_path = tmp_path / "manifest.json"
+    NotebookSync(mock_client, manifest_path).sync(mock_notebook.nbid)
+    manifest = SyncManifest(manifest_path)
+    tree_id: str = mock_notebook.pages[0].tree_id
+    # the page was modified, its entries have to be listed again
+    manifest.pages[tree_id]["node_stamp"] = "stale"
+    manifest.save()
+    known = manifest.pages[tree_id]
+
+    mock_labarchives.fail_next("get_entries_for_page", status=403)
+    failed = NotebookSync(mock_client, manifest_path).sync(mock_notebook.nbid)
+    assert list(failed.failed_pages) == [tree_id]
+    assert failed.failed_pages[tree_id].startswith("HTTPError: 403")
+    assert failed.changed_pages == failed.removed_pages == []
+    assert SyncManifest(manifest_path).pages[tree_id] == known
+
+    retried = NotebookSync(mock_client, manifest_path).sync(
+        mock_notebook.nbid
+    )
+    assert retried.failed_pages == {}
+    assert retried.changed_pages == []
+    assert SyncManifest(manifest_path).pages[tree_id]["entries"] == (
+        known["entries"]
+    )
@@ -0,0 +1,48 @@
+from pathlib import Path
+
+from archiveflow.upload import BulkUploader, directory_jobs
+
+
+def test_bulk_upload_resumes_from_journal(
+    mock_client, mock_labarchives, tmp_path: Path
+):
+    videos = tmp_path / "Videos"
+    videos.mkdir()
+    for i in range(5):
+        (videos / f"video_{i}.mp4").write_bytes(bytes([i]) * (100_000 + i))
+    jobs = directory_jobs(videos, "mock-nbid", "7", pattern="*.mp4")
+    progress: dict[str, int] = {}
+
+    def on_progress(job, sent: int, total: int) -> None:
+        progress[job.filename] = sent
+        assert sent <= total
+
+    uploader = BulkUploader(
+        mock_client,
+        journal=tmp_path / "journal.jsonl",
+        max_workers=3,
+        progress=on_progress,
+    )
+    mock_labarchives.fail_next("add_attachment", count=2, status=500)
+    report = uploader.upload(jobs)
+    assert len(report.uploaded) == 3
+    assert len(report.failed) == 2
+    assert report.failed[0].error == "HTTP 500"
+    assert report.bytes_sent == sum(
+        result.job.path.stat().st_size for result in report.uploaded
+    )
+    assert report.uploaded[0].eid is not None
+    assert progress[report.uploaded[0].job.filename] == (
+        report.uploaded[0].bytes_sent
+    )
+
+    # a fresh uploader only sends the files the journal has not recorded
+    retry = BulkUploader(mock_client, journal=tmp_path / "journal.jsonl")
+    report = retry.upload(jobs)
+    assert len(report.skipped) == 3
+    assert len(report.uploaded) == 2
+    assert len(mock_labarchives.uploads) == 5
+    assert sorted(body for _, body in mock_labarchives.uploads) == sorted(
+        job.path.read_bytes() for job in jobs
+    )
+    assert {params["pid"] for params, _ in mock_labarchives.uploads} == {"7"}
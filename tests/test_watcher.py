@@ -0,0 +1,79 @@
+import time
+from pathlib import Path
+
+from archiveflow.index import NotebookIndex
+from archiveflow.tree import TreeNode
+from archiveflow.upload import BulkUploader
+from archiveflow.watcher import DataWatcher, IndexPageResolver
+
+
+def test_data_watcher_uploads_settled_files(
+    mock_client, mock_notebook, mock_labarchives, tmp_path: Path
+):
+    index = NotebookIndex.build(mock_client, mock_notebook.nbid)
+    local_root = tmp_path / "Folder 1"
+    (local_root / "Page 1").mkdir(parents=True)
+    (local_root / "Folder 2" / "Page 2").mkdir(parents=True)
+    (local_root / "Unknown").mkdir()
+    # already there when the watcher starts
+    (local_root / "Page 1" / "session_1.csv").write_text("a,b\n1,2\n")
+
+    watcher = DataWatcher(
+        BulkUploader(mock_client),
+        local_root,
+        mock_notebook.nbid,
+        IndexPageResolver(index, local_root, "root/Folder 1"),
+        debounce=0.1,
+        stable_seconds=0.1,
+    )
+    with watcher:
+        video = local_root / "Folder 2" / "Page 2" / "video.mp4"
+        # a burst of writes is uploaded once, after the file settled
+        with open(video, "wb") as f:
+            for _ in range(5):
+                f.write(b"\0" * 10_000)
+                f.flush()
+                time.sleep(0.02)
+        (local_root / "Page 1" / "session_2.csv.part").write_text("partial")
+        (local_root / "Unknown" / "notes.txt").write_text("no page")
+        time.sleep(0.05)
+        assert watcher.wait_idle(timeout=10)
+
+    uploads = {
+        params["filename"]: (params["pid"], body)
+        for params, body in mock_labarchives.uploads
+    }
+    assert len(mock_labarchives.uploads) == 2
+    assert uploads["session_1.csv"][0] == (
+        index.find_path("root/Folder 1/Page 1").tree_id
+    )
+    assert uploads["video.mp4"] == (
+        index.find_path("root/Folder 1/Folder 2/Page 2").tree_id,
+        b"\0" * 50_000,
+    )
+    assert watcher.unresolved == [local_root / "Unknown" / "notes.txt"]
+    assert {result.status for result in watcher.results} == {"uploaded"}
+
+
+def test_resolver_uses_nearest_folder_page(tmp_path: Path):
+    root = TreeNode("0", "root", False, "root")
+    experiment = TreeNode("1", "Exp", False, "root/Exp", root)
+    behavior = TreeNode(
+        "2", "Behavior", False, "root/Exp/Behavior", experiment
+    )
+    cohort = TreeNode(
+        "3", "Cohort 1", False, "root/Exp/Behavior/Cohort 1", behavior
+    )
+    page = TreeNode(
+        "4", "Sessions", True, "root/Exp/Behavior/Cohort 1/Sessions", cohort
+    )
+    index = NotebookIndex(
+        "nb",
+        root,
+        {"0": [experiment], "1": [behavior], "2": [cohort], "3": [page]},
+    )
+    resolve = IndexPageResolver(index, tmp_path, "root/Exp")
+    # Videos only exists locally
+    video = tmp_path / "Behavior" / "Cohort 1" / "Videos" / "a.mp4"
+    assert resolve(video) is page
+    assert resolve(tmp_path / "Behavior" / "notes.txt") is None